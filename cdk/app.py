@@ -1,29 +1,43 @@
 #!/usr/bin/env python3
 import os
+import sys
+from pathlib import Path
+
 import aws_cdk as cdk
 
-try:
-    from cdk.stacks.network_stack import NetworkStack
-    from cdk.stacks.database_stack import DatabaseStack
-    from cdk.stacks.compute_stack import ComputeStack
-    from cdk.stacks.storage_stack import StorageStack
-    from cdk.stacks.security_stack import SecurityStack
-    from cdk.stacks.monitoring_stack import MonitoringStack
-    from cdk.config import get_domain_name
-except ModuleNotFoundError:
-    from stacks.network_stack import NetworkStack
-    from stacks.database_stack import DatabaseStack
-    from stacks.compute_stack import ComputeStack
-    from stacks.storage_stack import StorageStack
-    from stacks.security_stack import SecurityStack
-    from stacks.monitoring_stack import MonitoringStack
-    from config import get_domain_name
+# `cdk synth` runs this file from the cdk/ directory. Put the repository root
+# on sys.path so the stacks are always imported as the cdk.stacks package.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+# cdk.stacks loads each stack module lazily, on first attribute access, so only
+# the stacks selected below are imported.
+from cdk import stacks as cdk_stacks
+from cdk.config import (
+    STACK_DEPENDENCIES,
+    get_capacity_profile,
+    get_domain_name,
+    incomplete_stacks,
+    resolve_stack_selection,
+)
 
 app = cdk.App()
 
-# Get environment from context or default to 'dev'
+# Get environment from context or default to 'dev'. Only used for the
+# Environment tag: deployments without the context have always been tagged dev.
 environment = app.node.try_get_context("environment") or "dev"
 
+# Sizing: -c capacity_profile=..., else -c environment=..., else ENVIRONMENT
+capacity = get_capacity_profile(
+    app.node.try_get_context("capacity_profile")
+    or app.node.try_get_context("environment")
+)
+# -c cpu_architecture=ARM64 runs tasks on Graviton and converts OpenSearch
+# nodes to the matching Graviton instance types
+cpu_architecture = app.node.try_get_context("cpu_architecture")
+if cpu_architecture:
+    capacity = capacity.with_architecture(cpu_architecture)
+
 # Get domain name with priority: context > env var > config
 context_domain = app.node.try_get_context("domain_name")
 domain_name = get_domain_name(context_domain)
@@ -34,37 +48,71 @@ env = None
 if cdk_account:
     env = cdk.Environment(account=cdk_account, region="us-east-1")
 
+# Only construct the requested stacks (plus their dependencies), e.g.
+# `cdk synth -c stacks=Database` builds NetworkStack and DatabaseStack only.
+selected = resolve_stack_selection(app.node.try_get_context("stacks"))
+
 # Create stacks. Pass env only when available to avoid context provider lookups
-if env:
-    network_stack = NetworkStack(app, "NetworkStack", env=env, domain_name=domain_name)
-    database_stack = DatabaseStack(
-        app, "DatabaseStack", env=env, network_stack=network_stack
+stack_kwargs = {"env": env} if env else {}
+stacks: dict[str, cdk.Stack] = {}
+
+if "NetworkStack" in selected:
+    if env:
+        stacks["NetworkStack"] = cdk_stacks.NetworkStack(
+            app, "NetworkStack", domain_name=domain_name, **stack_kwargs
+        )
+    else:
+        # Without env, don't pass domain_name to avoid hosted zone lookups - for unit tests
+        stacks["NetworkStack"] = cdk_stacks.NetworkStack(app, "NetworkStack")
+if "SecurityStack" in selected:
+    stacks["SecurityStack"] = cdk_stacks.SecurityStack(
+        app, "SecurityStack", **stack_kwargs
+    )
+if "StorageStack" in selected:
+    stacks["StorageStack"] = cdk_stacks.StorageStack(
+        app, "StorageStack", **stack_kwargs
     )
-    compute_stack = ComputeStack(
-        app, "ComputeStack", env=env, network_stack=network_stack
+if "DatabaseStack" in selected:
+    stacks["DatabaseStack"] = cdk_stacks.DatabaseStack(
+        app,
+        "DatabaseStack",
+        network_stack=stacks["NetworkStack"],
+        capacity=capacity,
+        **stack_kwargs,
     )
-    storage_stack = StorageStack(app, "StorageStack", env=env)
-    security_stack = SecurityStack(app, "SecurityStack", env=env)
-    monitoring_stack = MonitoringStack(
-        app, "MonitoringStack", env=env, logs_bucket=storage_stack.logs_bucket
+if "ComputeStack" in selected:
+    stacks["ComputeStack"] = cdk_stacks.ComputeStack(
+        app,
+        "ComputeStack",
+        network_stack=stacks["NetworkStack"],
+        capacity=capacity,
+        # -c agent_image_tag=v1.4.2 (or a sha256: digest) of bidopsai/agent;
+        # without it the agent service is deployed with zero tasks
+        agent_image_tag=app.node.try_get_context("agent_image_tag"),
+        **stack_kwargs,
     )
-else:
-    # Without env, don't pass domain_name to avoid hosted zone lookups - for unit tests
-    network_stack = NetworkStack(app, "NetworkStack")
-    database_stack = DatabaseStack(app, "DatabaseStack", network_stack=network_stack)
-    compute_stack = ComputeStack(app, "ComputeStack", network_stack=network_stack)
-    storage_stack = StorageStack(app, "StorageStack")
-    security_stack = SecurityStack(app, "SecurityStack")
-    monitoring_stack = MonitoringStack(
-        app, "MonitoringStack", logs_bucket=storage_stack.logs_bucket
+if "MonitoringStack" in selected:
+    stacks["MonitoringStack"] = cdk_stacks.MonitoringStack(
+        app,
+        "MonitoringStack",
+        logs_bucket=stacks["StorageStack"].logs_bucket,
+        capacity=capacity,
+        **stack_kwargs,
     )
 
 # Add dependencies between stacks
-database_stack.add_dependency(network_stack)
-compute_stack.add_dependency(network_stack)
-storage_stack.add_dependency(network_stack)
-security_stack.add_dependency(network_stack)
-monitoring_stack.add_dependency(network_stack)
+for stack_name, stack in stacks.items():
+    for dependency in STACK_DEPENDENCIES[stack_name]:
+        stack.add_dependency(stacks[dependency])
+
+# A partial selection drops the exports that unselected stacks import. The
+# error stops the cdk CLI from deploying these stacks (or pulling them in as
+# dependencies); the selected stacks can still be deployed with --exclusively.
+for stack_name in incomplete_stacks(selected):
+    cdk.Annotations.of(stacks[stack_name]).add_error(
+        f"{stack_name} is missing exports of stacks left out by the 'stacks' "
+        "context; deploy it from a full synth"
+    )
 
 # Apply resource tags per FR-009 requirement
 # All four tags (Project, Environment, Owner, CostCenter) are required
@@ -1,6 +1,9 @@
 # Configuration for CDK deployments
 
 import os
+import re
+from dataclasses import dataclass, field, replace
+from datetime import datetime
 
 # Environment settings
 ENVIRONMENT = os.getenv("ENVIRONMENT", "test")
@@ -14,9 +17,32 @@ STACK_NAMES = {
     "database": "DatabaseStack",
     "compute": "ComputeStack",
     "storage": "StorageStack",
+    "security": "SecurityStack",
     "monitoring": "MonitoringStack",
 }
 
+# Stack dependencies, as wired in app.py (constructor arguments such as
+# network_stack= / logs_bucket= plus explicit add_dependency calls).
+# Ordered so that every stack appears after its dependencies.
+STACK_DEPENDENCIES = {
+    "NetworkStack": [],
+    "SecurityStack": ["NetworkStack"],
+    "StorageStack": ["NetworkStack"],
+    "DatabaseStack": ["NetworkStack"],
+    "ComputeStack": ["NetworkStack"],
+    "MonitoringStack": ["NetworkStack", "StorageStack"],
+}
+
+# ECS names, fixed so MonitoringStack can build Container Insights widgets
+# without importing values from ComputeStack
+ECS_CLUSTER_NAME = "hackathon-cluster"
+ECS_SERVICE_NAMES = {
+    "app": "hackathon-app",
+    "agent": "hackathon-agent-worker",
+}
+# Service Connect name of the app service: other services call http://app
+APP_DISCOVERY_NAME = "app"
+
 # Domain configuration per environment
 # Public domain names are safe to commit (already publicly visible in DNS)
 # Can be overridden with DOMAIN_NAME env var or --context domain_name=...
@@ -55,6 +81,678 @@ def get_domain_name(context_domain: str | None = None) -> str | None:
     return DOMAIN_CONFIG.get(ENVIRONMENT)
 
 
+def _normalize_stack_name(name: str) -> str:
+    key = name.strip().lower()
+    if key.endswith("stack"):
+        key = key[: -len("stack")]
+    if key not in STACK_NAMES:
+        valid = ", ".join(sorted(STACK_NAMES))
+        raise ValueError(f"Unknown stack {name!r}; expected one of: {valid}")
+    return STACK_NAMES[key]
+
+
+def resolve_stack_selection(selection: str | list[str] | None = None) -> list[str]:
+    """
+    Resolve a stack selection to the stacks that must be constructed.
+
+    The selection comes from CDK context (-c stacks=Network,Database) and may
+    be a comma-separated string or a list. Names are case-insensitive and the
+    "Stack" suffix is optional. Transitive dependencies are always included.
+
+    Args:
+        selection: Requested stacks; None, empty, "all" or "*" selects every stack
+
+    Returns:
+        Stack names in dependency order (dependencies first)
+    """
+    if isinstance(selection, str):
+        selection = [part for part in selection.split(",") if part.strip()]
+    if not selection or any(part.strip().lower() in ("all", "*") for part in selection):
+        return list(STACK_DEPENDENCIES)
+
+    required: set[str] = set()
+    pending = [_normalize_stack_name(part) for part in selection]
+    while pending:
+        name = pending.pop()
+        if name not in required:
+            required.add(name)
+            pending.extend(STACK_DEPENDENCIES[name])
+
+    return [name for name in STACK_DEPENDENCIES if name in required]
+
+
+def incomplete_stacks(selected: list[str]) -> list[str]:
+    """
+    Stacks in a partial selection whose templates differ from the full app's.
+
+    CDK only generates the exports that constructed stacks import, so a stack
+    built without all of its dependents synthesizes without their exports.
+    Deploying it would try to delete exports that are still in use.
+
+    Args:
+        selected: Constructed stacks, as returned by resolve_stack_selection()
+
+    Returns:
+        Selected stacks that some unselected stack depends on
+    """
+    return [
+        name
+        for name in selected
+        if any(
+            name in dependencies
+            for dependent, dependencies in STACK_DEPENDENCIES.items()
+            if dependent not in selected
+        )
+    ]
+
+
+# Capacity profiles
+# Sizing for every stack, per environment. Stacks take a `capacity=` kwarg and
+# fall back to the profile for ENVIRONMENT. Profiles are frozen so a stack
+# cannot change sizing another stack relies on; derive variants with
+# dataclasses.replace().
+
+# Valid Fargate task memory (MiB) per task CPU unit setting
+FARGATE_TASK_SIZES = {
+    256: (512, 1024, 2048),
+    512: tuple(range(1024, 4097, 1024)),
+    1024: tuple(range(2048, 8193, 1024)),
+    2048: tuple(range(4096, 16385, 1024)),
+    4096: tuple(range(8192, 30721, 1024)),
+}
+
+
+@dataclass(frozen=True)
+class FargateCapacity:
+    """ECS Fargate task size and service task counts."""
+
+    cpu: int = 256
+    memory_limit_mib: int = 512
+    container_cpu: int = 128
+    container_memory_limit_mib: int = 256
+    desired_count: int = 1
+    min_tasks: int = 1
+    max_tasks: int = 2
+    # Target-tracking autoscaling targets
+    target_requests_per_task: int = 500
+    target_cpu_percent: int = 60
+    # Capacity provider strategy: the first on_demand_base tasks run on
+    # FARGATE; the rest are split between FARGATE and FARGATE_SPOT by weight.
+    on_demand_base: int = 1
+    on_demand_weight: int = 1
+    spot_weight: int = 0
+
+    def __post_init__(self) -> None:
+        if self.memory_limit_mib not in FARGATE_TASK_SIZES.get(self.cpu, ()):
+            raise ValueError(
+                f"Unsupported Fargate task size: cpu={self.cpu}, "
+                f"memory={self.memory_limit_mib}"
+            )
+        if (
+            self.container_cpu > self.cpu
+            or self.container_memory_limit_mib > self.memory_limit_mib
+        ):
+            raise ValueError("Container size exceeds the Fargate task size")
+        if not 0 < self.target_cpu_percent <= 100:
+            raise ValueError("target_cpu_percent must be between 1 and 100")
+        if min(self.on_demand_base, self.on_demand_weight, self.spot_weight) < 0:
+            raise ValueError("Capacity provider base and weights cannot be negative")
+        if not self.on_demand_weight and not self.spot_weight:
+            raise ValueError("At least one capacity provider weight must be positive")
+        if not 0 <= self.min_tasks <= self.desired_count <= self.max_tasks:
+            raise ValueError(
+                "Fargate task counts must satisfy min <= desired <= max, got "
+                f"{self.min_tasks}/{self.desired_count}/{self.max_tasks}"
+            )
+
+
+@dataclass(frozen=True)
+class AgentWorkerCapacity:
+    """Queue-driven agent worker task size, task counts and job queue settings."""
+
+    cpu: int = 512
+    memory_limit_mib: int = 1024
+    # The backlog-per-task metric divides by the running task count, so at
+    # least one worker always runs
+    min_tasks: int = 1
+    max_tasks: int = 4
+    # Target-tracking target: visible queue messages per running task
+    target_backlog_per_task: int = 5
+    # Must cover the longest job; an unfinished job becomes visible again
+    visibility_timeout_minutes: int = 15
+    # Receives before a job is moved to the dead-letter queue
+    max_receive_count: int = 3
+    # Interrupted Spot tasks leave their job on the queue to be retried
+    on_demand_base: int = 0
+    on_demand_weight: int = 0
+    spot_weight: int = 1
+
+    def __post_init__(self) -> None:
+        if self.memory_limit_mib not in FARGATE_TASK_SIZES.get(self.cpu, ()):
+            raise ValueError(
+                f"Unsupported Fargate task size: cpu={self.cpu}, "
+                f"memory={self.memory_limit_mib}"
+            )
+        if not 1 <= self.min_tasks <= self.max_tasks:
+            raise ValueError(
+                "Agent worker task counts must satisfy 1 <= min <= max, got "
+                f"{self.min_tasks}/{self.max_tasks}"
+            )
+        if self.target_backlog_per_task < 1:
+            raise ValueError("target_backlog_per_task must be positive")
+        # SQS caps the visibility timeout at 12 hours
+        if not 1 <= self.visibility_timeout_minutes <= 720:
+            raise ValueError("visibility_timeout_minutes must be between 1 and 720")
+        if self.max_receive_count < 1:
+            raise ValueError("max_receive_count must be positive")
+        if min(self.on_demand_base, self.on_demand_weight, self.spot_weight) < 0:
+            raise ValueError("Capacity provider base and weights cannot be negative")
+        if not self.on_demand_weight and not self.spot_weight:
+            raise ValueError("At least one capacity provider weight must be positive")
+
+
+# Enhanced Monitoring intervals RDS accepts, in seconds
+MONITORING_INTERVALS = (0, 1, 5, 10, 15, 30, 60)
+
+# Aurora PostgreSQL instance classes with local NVMe storage (Optimized Reads)
+OPTIMIZED_READS_INSTANCE_TYPE = r"^(r6gd|r6id|r8gd)\.(large|\d*xlarge)$"
+
+
+@dataclass(frozen=True)
+class AuroraCapacity:
+    """Aurora Serverless v2 capacity range (ACUs) and readers."""
+
+    # min_acu=0 lets idle instances auto-pause (scale to zero)
+    min_acu: float = 0.5
+    max_acu: float = 2
+    readers: int = 1
+    # Readers in promotion tiers 0-1 scale with the writer, so a failover
+    # lands on an instance that is already sized for the write load. The rest
+    # scale on their own read load.
+    failover_readers: int = 1
+    # Idle time before a min_acu=0 instance pauses
+    seconds_until_auto_pause: int = 300
+    # Name of an aws_rds.PerformanceInsightRetention member (DEFAULT is 7 days)
+    performance_insights_retention: str = "DEFAULT"
+    # Enhanced Monitoring OS metrics granularity; 0 turns it off
+    monitoring_interval_seconds: int = 60
+    # Name of an aws_rds.DBClusterStorageType member. AURORA_IOPT1
+    # (I/O-Optimized) has no per-request I/O charges, for I/O-heavy workloads.
+    storage_type: str = "AURORA"
+    # Provisioned NVMe-backed class (e.g. "r6gd.xlarge") for the readers, which
+    # turns on Optimized Reads; None keeps them on Serverless v2
+    optimized_reads_instance_type: str | None = None
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.min_acu <= self.max_acu <= 256 or self.max_acu < 1:
+            raise ValueError(
+                "Aurora ACUs must satisfy 0 <= min <= max <= 256 and max >= 1, got "
+                f"{self.min_acu}-{self.max_acu}"
+            )
+        if (self.min_acu * 2) % 1 or (self.max_acu * 2) % 1:
+            raise ValueError("Aurora ACUs must be in 0.5 increments")
+        if self.readers < 0:
+            raise ValueError("Aurora reader count cannot be negative")
+        if not 0 <= self.failover_readers <= self.readers:
+            raise ValueError(
+                f"failover_readers must be between 0 and readers ({self.readers})"
+            )
+        if not 300 <= self.seconds_until_auto_pause <= 86400:
+            raise ValueError("seconds_until_auto_pause must be between 300 and 86400")
+        if not re.match(
+            r"^(DEFAULT|LONG_TERM|MONTHS_([1-9]|1\d|2[0-3]))$",
+            self.performance_insights_retention,
+        ):
+            raise ValueError(
+                "Unknown Performance Insights retention "
+                f"{self.performance_insights_retention!r}"
+            )
+        if self.monitoring_interval_seconds not in MONITORING_INTERVALS:
+            raise ValueError(
+                f"monitoring_interval_seconds must be one of {MONITORING_INTERVALS}"
+            )
+        if self.storage_type not in ("AURORA", "AURORA_IOPT1"):
+            raise ValueError(f"Unknown Aurora storage type {self.storage_type!r}")
+        if self.optimized_reads_instance_type is not None:
+            if not re.match(
+                OPTIMIZED_READS_INSTANCE_TYPE, self.optimized_reads_instance_type
+            ):
+                raise ValueError(
+                    "Optimized Reads needs an NVMe instance class (r6gd, r6id, "
+                    f"r8gd), got {self.optimized_reads_instance_type!r}"
+                )
+            # The tiered cache half of Optimized Reads is I/O-Optimized only
+            if self.storage_type != "AURORA_IOPT1":
+                raise ValueError("Optimized Reads requires storage_type AURORA_IOPT1")
+            if self.auto_pause:
+                raise ValueError(
+                    "Provisioned readers cannot auto-pause; use min_acu > 0"
+                )
+
+    @property
+    def auto_pause(self) -> bool:
+        return self.min_acu == 0
+
+
+@dataclass(frozen=True)
+class PostgresTuning:
+    """Aurora PostgreSQL parameter group baseline.
+
+    Timeouts and thresholds are in milliseconds; 0 disables a timeout.
+    """
+
+    # Per sort/hash operation; a query can use several multiples of it
+    work_mem_mb: int = 4
+    # SSD-backed Aurora storage: random reads cost little more than sequential
+    random_page_cost: float = 1.1
+    statement_timeout_ms: int = 60000
+    idle_in_transaction_timeout_ms: int = 300000
+    # Statements (and auto_explain plans) slower than this are logged
+    slow_query_ms: int = 1000
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.work_mem_mb <= 2048:
+            raise ValueError("work_mem_mb must be between 1 and 2048")
+        if self.random_page_cost <= 0:
+            raise ValueError("random_page_cost must be positive")
+        if min(self.statement_timeout_ms, self.idle_in_transaction_timeout_ms) < 0:
+            raise ValueError("PostgreSQL timeouts cannot be negative")
+        if self.slow_query_ms < 0:
+            raise ValueError("slow_query_ms cannot be negative")
+
+
+# pgvector index access methods
+VECTOR_INDEX_TYPES = ("hnsw", "ivfflat")
+
+
+@dataclass(frozen=True)
+class VectorIndexTuning:
+    """pgvector embeddings table and vector index build settings.
+
+    Changing the index type or its build options rebuilds the index on the
+    next deploy. embedding_dimensions is fixed once the table exists.
+    """
+
+    # Amazon Titan Text Embeddings v2 default output size
+    embedding_dimensions: int = 1024
+    # "hnsw", or "ivfflat": faster to build and smaller, but its lists are
+    # trained on the rows present at build time, so only use it on a loaded
+    # table
+    index_type: str = "hnsw"
+    # Graph links per node: higher improves recall, costs memory and build time
+    hnsw_m: int = 16
+    # Candidate list size while building; pgvector needs at least 2 * m
+    hnsw_ef_construction: int = 64
+    # IVFFlat clusters; pgvector suggests rows / 1000 up to 1M rows
+    ivfflat_lists: int = 100
+
+    def __post_init__(self) -> None:
+        # Both index types cover the vector type up to 2000 dimensions
+        if not 1 <= self.embedding_dimensions <= 2000:
+            raise ValueError("embedding_dimensions must be between 1 and 2000")
+        if self.index_type not in VECTOR_INDEX_TYPES:
+            raise ValueError(
+                f"Unknown vector index type {self.index_type!r}; expected one of: "
+                f"{', '.join(VECTOR_INDEX_TYPES)}"
+            )
+        if not 2 <= self.hnsw_m <= 100:
+            raise ValueError("hnsw_m must be between 2 and 100")
+        if not 2 * self.hnsw_m <= self.hnsw_ef_construction <= 1000:
+            raise ValueError(
+                "hnsw_ef_construction must be between 2 * hnsw_m and 1000, got "
+                f"{self.hnsw_ef_construction}"
+            )
+        if not 1 <= self.ivfflat_lists <= 32768:
+            raise ValueError("ivfflat_lists must be between 1 and 32768")
+
+
+@dataclass(frozen=True)
+class ProxyCapacity:
+    """RDS Proxy connection pool settings and pool health alarm thresholds."""
+
+    # Share of the database's max_connections the pool may open
+    max_connections_percent: int = 90
+    # Share of the pool kept open while idle, ready for a scale-out burst
+    max_idle_connections_percent: int = 50
+    # How long a client waits for a pooled connection before an error
+    borrow_timeout_seconds: int = 30
+    idle_client_timeout_seconds: int = 1800
+    # SQL run on every new database connection, e.g. "SET work_mem = '16MB'".
+    # RDS Proxy for PostgreSQL has no session pinning filters, so session SETs
+    # belong here: issued by clients, they pin the session to its connection.
+    init_query: str | None = None
+    # Alarm thresholds
+    borrow_latency_alarm_ms: int = 100
+    pinned_sessions_alarm: int = 10
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.max_connections_percent <= 100:
+            raise ValueError("max_connections_percent must be between 1 and 100")
+        if not 0 <= self.max_idle_connections_percent <= self.max_connections_percent:
+            raise ValueError(
+                "max_idle_connections_percent must be between 0 and "
+                "max_connections_percent"
+            )
+        if not 0 <= self.borrow_timeout_seconds <= 3600:
+            raise ValueError("borrow_timeout_seconds must be between 0 and 3600")
+        if not 1 <= self.idle_client_timeout_seconds <= 28800:
+            raise ValueError("idle_client_timeout_seconds must be between 1 and 28800")
+        if self.borrow_latency_alarm_ms < 1 or self.pinned_sessions_alarm < 1:
+            raise ValueError("Proxy alarm thresholds must be positive")
+
+
+@dataclass(frozen=True)
+class OpenSearchCapacity:
+    """OpenSearch data and dedicated master nodes."""
+
+    data_node_instance_type: str = "t3.small.search"
+    data_nodes: int = 2
+    master_node_instance_type: str | None = None
+    master_nodes: int = 0
+
+    def __post_init__(self) -> None:
+        # The domain is zone-aware across two AZs
+        if self.data_nodes < 2 or self.data_nodes % 2:
+            raise ValueError(
+                f"OpenSearch needs an even number of data nodes, got {self.data_nodes}"
+            )
+        if self.master_nodes not in (0, 3, 5):
+            raise ValueError("OpenSearch dedicated master nodes must be 0, 3 or 5")
+        if self.master_nodes and not self.master_node_instance_type:
+            raise ValueError("master_node_instance_type is required with masters")
+
+
+CPU_ARCHITECTURES = ("X86_64", "ARM64")
+
+# x86 instance family -> Graviton family of the same class
+GRAVITON_FAMILIES = {
+    "t3": "t4g",
+    "m5": "m6g",
+    "m6i": "m6g",
+    "r5": "r6g",
+    "r6i": "r6g",
+    "c5": "c6g",
+    "c6i": "c6g",
+}
+
+
+def is_graviton(instance_type: str) -> bool:
+    """True for Graviton instance types such as t4g.small.search or r6gd.large."""
+    return re.match(r"^[a-z]+\d+g", instance_type) is not None
+
+
+def graviton_instance_type(instance_type: str) -> str:
+    """
+    Get the Graviton equivalent of an instance type.
+
+    Args:
+        instance_type: Instance type, e.g. "t3.small.search"
+
+    Returns:
+        The same size in the Graviton family, e.g. "t4g.small.search"
+    """
+    if is_graviton(instance_type):
+        return instance_type
+    family, _, size = instance_type.partition(".")
+    if family not in GRAVITON_FAMILIES:
+        raise ValueError(f"No Graviton equivalent known for {instance_type!r}")
+    return f"{GRAVITON_FAMILIES[family]}.{size}"
+
+
+# Application Auto Scaling schedule: cron(<6 fields>) or a one-off at(<UTC time>)
+SCHEDULE_EXPRESSION = re.compile(
+    r"^(cron\((\S+ ){5}\S+\)|at\(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\))$"
+)
+
+
+@dataclass(frozen=True)
+class ScalingWindow:
+    """Capacity held for a known traffic window, e.g. a submission deadline.
+
+    At ``start`` the app service task range (and the Aurora reader count, if
+    set) is raised to the window's values; at ``end`` it returns to the
+    profile's. Schedules are evaluated in UTC. Windows must not overlap: the
+    end of one window restores the base capacity. CapacityProfile rejects
+    overlapping ``at()`` windows; recurring ``cron()`` windows are not checked.
+    """
+
+    name: str
+    start: str
+    end: str
+    min_tasks: int
+    max_tasks: int
+    aurora_readers: int | None = None
+
+    def __post_init__(self) -> None:
+        if not re.match(r"^[A-Za-z0-9-]+$", self.name):
+            raise ValueError(f"Scaling window name {self.name!r} must be alphanumeric")
+        for schedule in (self.start, self.end):
+            if not SCHEDULE_EXPRESSION.match(schedule):
+                raise ValueError(
+                    f"Invalid schedule {schedule!r}; expected cron(...) or "
+                    "at(yyyy-mm-ddThh:mm:ss)"
+                )
+        if self.interval and self.interval[0] >= self.interval[1]:
+            raise ValueError(f"Scaling window {self.name} must end after it starts")
+        if not 1 <= self.min_tasks <= self.max_tasks:
+            raise ValueError(
+                f"Scaling window {self.name} must satisfy 1 <= min <= max tasks"
+            )
+        # Aurora clusters have at most 15 readers
+        if self.aurora_readers is not None and not 0 <= self.aurora_readers <= 15:
+            raise ValueError("aurora_readers must be between 0 and 15")
+
+    @property
+    def interval(self) -> tuple[datetime, datetime] | None:
+        """(start, end) of a one-off window; None if either end is a cron()."""
+        if not (self.start.startswith("at(") and self.end.startswith("at(")):
+            return None
+        return (
+            datetime.fromisoformat(self.start[3:-1]),
+            datetime.fromisoformat(self.end[3:-1]),
+        )
+
+
+@dataclass(frozen=True)
+class CapacityProfile:
+    name: str
+    fargate: FargateCapacity = field(default_factory=FargateCapacity)
+    agent: AgentWorkerCapacity = field(default_factory=AgentWorkerCapacity)
+    aurora: AuroraCapacity = field(default_factory=AuroraCapacity)
+    proxy: ProxyCapacity = field(default_factory=ProxyCapacity)
+    postgres: PostgresTuning = field(default_factory=PostgresTuning)
+    opensearch: OpenSearchCapacity = field(default_factory=OpenSearchCapacity)
+    vector: VectorIndexTuning = field(default_factory=VectorIndexTuning)
+    # Name of an aws_logs.RetentionDays member
+    log_retention: str = "ONE_WEEK"
+    # CPU architecture for Fargate tasks. With ARM64, OpenSearch nodes must be
+    # Graviton too; use with_architecture() to convert a profile.
+    cpu_architecture: str = "X86_64"
+    # Scheduled capacity windows, applied on top of target tracking
+    scaling_windows: tuple[ScalingWindow, ...] = ()
+
+    def __post_init__(self) -> None:
+        if self.cpu_architecture not in CPU_ARCHITECTURES:
+            raise ValueError(
+                f"Unknown CPU architecture {self.cpu_architecture!r}; "
+                f"expected one of: {', '.join(CPU_ARCHITECTURES)}"
+            )
+        names = [window.name for window in self.scaling_windows]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate scaling window names: {names}")
+        one_off = sorted(
+            (window.interval, window.name)
+            for window in self.scaling_windows
+            if window.interval
+        )
+        # Windows that touch overlap too: both actions fire at the same time
+        for (earlier, earlier_name), (later, later_name) in zip(one_off, one_off[1:]):
+            if later[0] <= earlier[1]:
+                raise ValueError(
+                    f"Scaling windows {earlier_name} and {later_name} overlap"
+                )
+        for window in self.scaling_windows:
+            if window.min_tasks < self.fargate.min_tasks:
+                raise ValueError(
+                    f"Scaling window {window.name} lowers min tasks below the "
+                    f"profile's {self.fargate.min_tasks}"
+                )
+            if (
+                window.aurora_readers is not None
+                and window.aurora_readers < self.aurora.readers
+            ):
+                raise ValueError(
+                    f"Scaling window {window.name} has fewer Aurora readers than "
+                    f"the profile's {self.aurora.readers}"
+                )
+        if self.arm64:
+            node_types = [
+                self.opensearch.data_node_instance_type,
+                self.opensearch.master_node_instance_type,
+            ]
+            x86_types = [t for t in node_types if t and not is_graviton(t)]
+            if x86_types:
+                raise ValueError(f"ARM64 profile uses x86 instance types: {x86_types}")
+
+    @property
+    def arm64(self) -> bool:
+        return self.cpu_architecture == "ARM64"
+
+    def with_architecture(self, cpu_architecture: str) -> "CapacityProfile":
+        """Copy of the profile on another architecture (Graviton for ARM64)."""
+        cpu_architecture = cpu_architecture.upper()
+        opensearch = self.opensearch
+        if cpu_architecture == "ARM64":
+            master_type = opensearch.master_node_instance_type
+            opensearch = replace(
+                opensearch,
+                data_node_instance_type=graviton_instance_type(
+                    opensearch.data_node_instance_type
+                ),
+                master_node_instance_type=(
+                    graviton_instance_type(master_type) if master_type else None
+                ),
+            )
+        return replace(self, cpu_architecture=cpu_architecture, opensearch=opensearch)
+
+
+CAPACITY_PROFILES = {
+    # Past the single on-demand task, dev and test bursts run on Spot only.
+    # Their Aurora instances pause after 5 idle minutes.
+    "dev": CapacityProfile(
+        name="dev",
+        fargate=FargateCapacity(on_demand_weight=0, spot_weight=1),
+        aurora=AuroraCapacity(min_acu=0, max_acu=2),
+    ),
+    "test": CapacityProfile(
+        name="test",
+        fargate=FargateCapacity(on_demand_weight=0, spot_weight=1),
+        aurora=AuroraCapacity(min_acu=0, max_acu=2),
+    ),
+    "staging": CapacityProfile(
+        name="staging",
+        fargate=FargateCapacity(
+            cpu=512,
+            memory_limit_mib=1024,
+            container_cpu=512,
+            container_memory_limit_mib=1024,
+            desired_count=2,
+            min_tasks=2,
+            max_tasks=4,
+            on_demand_base=1,
+            on_demand_weight=1,
+            spot_weight=3,
+        ),
+        agent=AgentWorkerCapacity(
+            cpu=1024,
+            memory_limit_mib=2048,
+            max_tasks=6,
+            on_demand_base=1,
+            on_demand_weight=1,
+            spot_weight=3,
+        ),
+        aurora=AuroraCapacity(min_acu=0.5, max_acu=8),
+        proxy=ProxyCapacity(max_idle_connections_percent=60),
+        postgres=PostgresTuning(work_mem_mb=8),
+        opensearch=OpenSearchCapacity(data_node_instance_type="m6g.large.search"),
+        log_retention="ONE_MONTH",
+    ),
+    "prod": CapacityProfile(
+        name="prod",
+        fargate=FargateCapacity(
+            cpu=1024,
+            memory_limit_mib=2048,
+            container_cpu=1024,
+            container_memory_limit_mib=2048,
+            desired_count=2,
+            min_tasks=2,
+            max_tasks=10,
+            target_requests_per_task=1000,
+            # Keep the baseline on-demand; burst capacity is half Spot
+            on_demand_base=2,
+            on_demand_weight=1,
+            spot_weight=1,
+        ),
+        agent=AgentWorkerCapacity(
+            cpu=1024,
+            memory_limit_mib=4096,
+            min_tasks=2,
+            max_tasks=20,
+            visibility_timeout_minutes=30,
+            on_demand_base=2,
+            on_demand_weight=1,
+            spot_weight=3,
+        ),
+        # One failover reader sized with the writer, one for read load
+        aurora=AuroraCapacity(
+            min_acu=2,
+            max_acu=32,
+            readers=2,
+            failover_readers=1,
+            performance_insights_retention="MONTHS_1",
+            monitoring_interval_seconds=15,
+            storage_type="AURORA_IOPT1",
+        ),
+        # Keep most of the pool warm for scale-out bursts; fail fast rather
+        # than queue requests behind a saturated pool
+        proxy=ProxyCapacity(
+            max_idle_connections_percent=75,
+            borrow_timeout_seconds=10,
+            borrow_latency_alarm_ms=50,
+            pinned_sessions_alarm=25,
+        ),
+        postgres=PostgresTuning(
+            work_mem_mb=16, statement_timeout_ms=30000, slow_query_ms=500
+        ),
+        opensearch=OpenSearchCapacity(
+            data_node_instance_type="r6g.large.search",
+            master_node_instance_type="m6g.large.search",
+            master_nodes=3,
+        ),
+        # Better recall on the larger prod corpus, at a slower index build
+        vector=VectorIndexTuning(hnsw_m=24, hnsw_ef_construction=128),
+        log_retention="THREE_MONTHS",
+    ),
+}
+
+
+def get_capacity_profile(environment: str | None = None) -> CapacityProfile:
+    """
+    Get the capacity profile for an environment.
+
+    Args:
+        environment: Profile name (dev, test, staging, prod); defaults to ENVIRONMENT
+
+    Returns:
+        The CapacityProfile for the environment
+    """
+    name = (environment or ENVIRONMENT).strip().lower()
+    if name not in CAPACITY_PROFILES:
+        valid = ", ".join(CAPACITY_PROFILES)
+        raise ValueError(f"Unknown capacity profile {name!r}; expected one of: {valid}")
+    return CAPACITY_PROFILES[name]
+
+
 # Test environment settings
 if ENVIRONMENT == "test":
     # Use test-specific settings
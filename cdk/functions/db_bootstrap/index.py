@@ -0,0 +1,235 @@
+"""Bootstrap the hackathon database for vector search.
+
+Runs as the DatabaseStack ``Custom::DbBootstrap`` handler (behind the CDK
+Provider framework) on every create and update. It connects through the RDS
+Proxy, enables pgvector, applies the numbered MIGRATIONS not yet recorded in
+``schema_migrations`` and then makes sure the embedding index has the
+requested type (HNSW or IVFFlat) and build options. Every step is idempotent,
+so reruns and concurrent deploys are safe.
+"""
+
+import json
+import logging
+import os
+import ssl
+import time
+
+import boto3
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+PHYSICAL_RESOURCE_ID = "hackathon-db-bootstrap"
+# pg_advisory_lock key serializing concurrent bootstrap runs
+LOCK_KEY = 72_616_901
+HNSW_INDEX = "document_chunks_embedding_hnsw"
+IVFFLAT_INDEX = "document_chunks_embedding_ivfflat"
+VECTOR_INDEXES = {"hnsw": HNSW_INDEX, "ivfflat": IVFFLAT_INDEX}
+
+# (version, description, statements). Append only: applied versions are
+# skipped, so editing one does not change environments that already ran it.
+# Statements may use {embedding_dimensions}.
+MIGRATIONS: list[tuple[int, str, tuple[str, ...]]] = [
+    (1, "enable pgvector", ("CREATE EXTENSION IF NOT EXISTS vector",)),
+    (
+        2,
+        "document chunks with embeddings",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS document_chunks (
+                id bigserial PRIMARY KEY,
+                document_id text NOT NULL,
+                chunk_index integer NOT NULL,
+                content text NOT NULL,
+                metadata jsonb NOT NULL DEFAULT '{{}}',
+                embedding vector({embedding_dimensions}) NOT NULL,
+                created_at timestamptz NOT NULL DEFAULT now(),
+                UNIQUE (document_id, chunk_index)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS document_chunks_metadata "
+            "ON document_chunks USING gin (metadata)",
+        ),
+    ),
+]
+
+
+def handler(event, _context):
+    request_type = event["RequestType"]
+    logger.info("%s request", request_type)
+    # Deleting the stack deletes the cluster; the schema needs no cleanup
+    if request_type == "Delete":
+        return {"PhysicalResourceId": event["PhysicalResourceId"]}
+
+    props = event["ResourceProperties"]
+    # CloudFormation passes custom resource properties as strings
+    settings = {
+        "embedding_dimensions": int(props["EmbeddingDimensions"]),
+        "index_type": props["IndexType"],
+        "hnsw_m": int(props["HnswM"]),
+        "hnsw_ef_construction": int(props["HnswEfConstruction"]),
+        "ivfflat_lists": int(props["IvfflatLists"]),
+    }
+    conn = connect()
+    try:
+        applied = bootstrap(conn, settings)
+    finally:
+        conn.close()
+    return {
+        "PhysicalResourceId": PHYSICAL_RESOURCE_ID,
+        "Data": {
+            "SchemaVersion": str(MIGRATIONS[-1][0]),
+            "AppliedMigrations": ",".join(str(version) for version in applied),
+        },
+    }
+
+
+def connect(attempts: int = 6, delay_seconds: float = 10):
+    """Connect through the proxy as the cluster's master user.
+
+    Retries while an auto-paused instance resumes or the proxy target is
+    still registering.
+    """
+    # Bundled with the function; imported here so the migration logic can be
+    # tested without the driver installed
+    import pg8000.native  # pylint: disable=import-outside-toplevel
+
+    secret = json.loads(
+        boto3.client("secretsmanager").get_secret_value(
+            SecretId=os.environ["SECRET_ARN"]
+        )["SecretString"]
+    )
+    attempt = 1
+    while True:
+        try:
+            return pg8000.native.Connection(
+                user=secret["username"],
+                password=secret["password"],
+                host=os.environ["PROXY_ENDPOINT"],
+                port=int(os.environ.get("DB_PORT", "5432")),
+                database=os.environ["DB_NAME"],
+                # The proxy requires TLS; its certificate is publicly trusted
+                ssl_context=ssl.create_default_context(),
+                timeout=60,
+            )
+        except (pg8000.native.InterfaceError, pg8000.native.DatabaseError) as e:
+            if attempt == attempts:
+                raise
+            logger.warning("Connection attempt %d failed: %s", attempt, e)
+            attempt += 1
+            time.sleep(delay_seconds)
+
+
+def bootstrap(conn, settings: dict) -> list[int]:
+    """Apply pending migrations and converge the embedding index.
+
+    Returns the migration versions applied by this run.
+    """
+    # Index builds outlive the cluster's statement_timeout. Session settings
+    # and the advisory lock pin this connection in the proxy, which is fine
+    # for a one-off admin session.
+    conn.run("SET statement_timeout = 0")
+    conn.run("SELECT pg_advisory_lock(:key)", key=LOCK_KEY)
+    try:
+        applied = apply_migrations(conn, settings)
+        if settings["index_type"] == "ivfflat":
+            options = {"lists": settings["ivfflat_lists"]}
+        else:
+            options = {
+                "m": settings["hnsw_m"],
+                "ef_construction": settings["hnsw_ef_construction"],
+            }
+        ensure_vector_index(conn, settings["index_type"], options)
+    finally:
+        conn.run("SELECT pg_advisory_unlock(:key)", key=LOCK_KEY)
+    return applied
+
+
+def apply_migrations(conn, settings: dict) -> list[int]:
+    """Run each migration missing from schema_migrations in its own transaction."""
+    conn.run("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version integer PRIMARY KEY,
+            description text NOT NULL,
+            applied_at timestamptz NOT NULL DEFAULT now()
+        )
+        """)
+    done = {row[0] for row in conn.run("SELECT version FROM schema_migrations")}
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        if version in done:
+            continue
+        logger.info("Applying migration %d: %s", version, description)
+        conn.run("START TRANSACTION")
+        try:
+            for statement in statements:
+                conn.run(statement.format(**settings))
+            conn.run(
+                "INSERT INTO schema_migrations (version, description) "
+                "VALUES (:version, :description)",
+                version=version,
+                description=description,
+            )
+        except Exception:
+            conn.run("ROLLBACK")
+            raise
+        conn.run("COMMIT")
+        applied.append(version)
+    return applied
+
+
+def ensure_vector_index(conn, index_type: str, options: dict[str, int]) -> bool:
+    """Create or rebuild the embedding index with the given type and options.
+
+    Returns True if the index was (re)built. A rebuild builds the new index
+    next to the old one, and an index of the other type is only dropped once
+    its replacement exists, so similarity search keeps working meanwhile.
+    """
+    name = VECTOR_INDEXES[index_type]
+    desired = sorted(f"{key}={value}" for key, value in options.items())
+    rows = _index_state(conn, name)
+    if rows and not rows[0][1]:
+        # Left invalid by an interrupted first build
+        conn.run(f"DROP INDEX CONCURRENTLY {name}")
+        rows = []
+    built = not rows or sorted(rows[0][0] or []) != desired
+    if built:
+        _build_index(conn, name, index_type, options, replace=bool(rows))
+
+    for other in VECTOR_INDEXES.values():
+        if other != name and _index_state(conn, other):
+            logger.info("Dropping %s, replaced by %s", other, name)
+            conn.run(f"DROP INDEX CONCURRENTLY {other}")
+    return built
+
+
+def _index_state(conn, name: str) -> list:
+    """[[reloptions, indisvalid]] for the index, or [] if it does not exist."""
+    return conn.run(
+        "SELECT c.reloptions, i.indisvalid FROM pg_class c "
+        "JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name",
+        name=name,
+    )
+
+
+def _build_index(
+    conn, name: str, index_type: str, options: dict[str, int], replace: bool
+) -> None:
+    # Cosine distance (<=>), the operator the agent queries with
+    with_options = ", ".join(f"{key} = {value}" for key, value in options.items())
+    build = (
+        "CREATE INDEX CONCURRENTLY {name} ON document_chunks "
+        f"USING {index_type} (embedding vector_cosine_ops) WITH ({with_options})"
+    )
+    if not replace:
+        logger.info("Building %s (%s)", name, with_options)
+        conn.run(build.format(name=name))
+        return
+
+    logger.info("Rebuilding %s with %s", name, with_options)
+    staging = f"{name}_rebuild"
+    # Left invalid by an interrupted rebuild
+    conn.run(f"DROP INDEX CONCURRENTLY IF EXISTS {staging}")
+    conn.run(build.format(name=staging))
+    conn.run(f"DROP INDEX CONCURRENTLY {name}")
+    conn.run(f"ALTER INDEX {staging} RENAME TO {name}")
@@ -1,15 +1,42 @@
-from .network_stack import NetworkStack
-from .database_stack import DatabaseStack
-from .compute_stack import ComputeStack
-from .storage_stack import StorageStack
-from .security_stack import SecurityStack
-from .monitoring_stack import MonitoringStack
-
-__all__ = [
-    "NetworkStack",
-    "DatabaseStack",
-    "ComputeStack",
-    "StorageStack",
-    "SecurityStack",
-    "MonitoringStack",
-]
+"""CDK stack classes.
+
+Stack modules are imported lazily on first attribute access (PEP 562), so
+``from cdk.stacks import StorageStack`` loads storage_stack.py only, and
+``import cdk.stacks`` alone does not load the AWS construct library.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+_STACK_MODULES = {
+    "NetworkStack": ".network_stack",
+    "DatabaseStack": ".database_stack",
+    "ComputeStack": ".compute_stack",
+    "StorageStack": ".storage_stack",
+    "SecurityStack": ".security_stack",
+    "MonitoringStack": ".monitoring_stack",
+}
+
+__all__ = list(_STACK_MODULES)
+
+if TYPE_CHECKING:
+    from .network_stack import NetworkStack
+    from .database_stack import DatabaseStack
+    from .compute_stack import ComputeStack
+    from .storage_stack import StorageStack
+    from .security_stack import SecurityStack
+    from .monitoring_stack import MonitoringStack
+
+
+def __getattr__(name: str):
+    module_name = _STACK_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    stack_cls = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache on the package so later lookups bypass __getattr__
+    globals()[name] = stack_cls
+    return stack_cls
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
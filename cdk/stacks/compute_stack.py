@@ -1,18 +1,54 @@
+from typing import cast
+
 from aws_cdk import (
     Stack,
+    Duration,
+    RemovalPolicy,
+    aws_applicationautoscaling as appscaling,
+    aws_ecr as ecr,
     aws_ecs as ecs,
     aws_ec2 as ec2,
+    aws_elasticloadbalancingv2 as elbv2,
+    aws_iam as iam,
+    aws_logs as logs,
+    aws_servicediscovery as servicediscovery,
+    aws_sqs as sqs,
     CfnOutput,
 )
 from constructs import Construct
 
+from ..config import (
+    APP_DISCOVERY_NAME,
+    ECS_CLUSTER_NAME,
+    ECS_SERVICE_NAMES,
+    get_capacity_profile,
+)
+
+APP_CONTAINER_PORT = 80
+SERVICE_CONNECT_NAMESPACE = "hackathon.internal"
+# Created by StorageStack; looked up by name so ComputeStack does not depend on it
+AGENT_REPOSITORY_NAME = "bidopsai/agent"
+AGENT_IMAGE_PLACEHOLDER_TAG = "unset"
+# ECR pull-through cache: <prefix>/<upstream repository> in this account's
+# registry mirrors the upstream registry
+PULL_THROUGH_CACHE_RULES = {"ecr-public": "public.ecr.aws"}
+# Placeholder app image, the official nginx image mirrored from ECR Public
+APP_IMAGE_REPOSITORY = "ecr-public/nginx/nginx"
+
 
 class ComputeStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         # Get VPC from network stack
         network_stack = kwargs.pop("network_stack", None)
+        # Task sizes and counts from the environment's capacity profile
+        capacity = kwargs.pop("capacity", None) or get_capacity_profile()
+        # Tag or digest of the agent image in bidopsai/agent (immutable tags);
+        # until one is supplied the agent service runs no tasks
+        agent_image_tag = kwargs.pop("agent_image_tag", None)
 
         super().__init__(scope, construct_id, **kwargs)
+        self.capacity = capacity
+        self.agent_image_tag = agent_image_tag
         if network_stack:
             vpc = network_stack.vpc
         else:
@@ -21,23 +57,87 @@ class ComputeStack(Stack):
 
         # ECS Cluster
         self.cluster = ecs.Cluster(
-            self, "EcsCluster", vpc=vpc, cluster_name="hackathon-cluster"
+            self,
+            "EcsCluster",
+            vpc=vpc,
+            cluster_name=ECS_CLUSTER_NAME,
+            enable_fargate_capacity_providers=True,
+            # Cloud Map namespace that services join through Service Connect
+            default_cloud_map_namespace=ecs.CloudMapNamespaceOptions(
+                name=SERVICE_CONNECT_NAMESPACE,
+                type=servicediscovery.NamespaceType.HTTP,
+                use_for_service_connect=True,
+            ),
         )
 
+        # Upstream images are pulled once into this registry and then served
+        # from in-region ECR through the VPC endpoints, not through the NAT
+        self.pull_through_cache_rules = [
+            ecr.CfnPullThroughCacheRule(
+                self,
+                f"PullThroughCache-{prefix}",
+                ecr_repository_prefix=prefix,
+                upstream_registry_url=upstream,
+            )
+            for prefix, upstream in PULL_THROUGH_CACHE_RULES.items()
+        ]
+
+        # Container Insights with enhanced observability: per-task and
+        # per-container CPU, memory, network and storage metrics in
+        # ECS/ContainerInsights, including the RunningTaskCount used by the
+        # agent backlog-per-task scaling. CDK only models "enabled", so the
+        # setting is made on the CloudFormation resource.
+        cfn_cluster = cast(ecs.CfnCluster, self.cluster.node.default_child)
+        cfn_cluster.cluster_settings = [
+            ecs.CfnCluster.ClusterSettingsProperty(
+                name="containerInsights", value="enhanced"
+            )
+        ]
+
         # Task Definition
         self.task_definition = ecs.FargateTaskDefinition(
-            self, "TaskDefinition", cpu=256, memory_limit_mib=512
+            self,
+            "TaskDefinition",
+            family=ECS_SERVICE_NAMES["app"],
+            cpu=capacity.fargate.cpu,
+            memory_limit_mib=capacity.fargate.memory_limit_mib,
+            runtime_platform=ecs.RuntimePlatform(
+                cpu_architecture=(
+                    ecs.CpuArchitecture.ARM64
+                    if capacity.arm64
+                    else ecs.CpuArchitecture.X86_64
+                ),
+                operating_system_family=ecs.OperatingSystemFamily.LINUX,
+            ),
         )
 
         # Add a placeholder container
-        self.task_definition.add_container(
+        self.app_container = self.task_definition.add_container(
             "AppContainer",
-            image=ecs.ContainerImage.from_registry("nginx:latest"),
-            memory_limit_mib=256,
-            cpu=128,
+            image=self._cached_image(
+                self.task_definition, "AppImageRepository", APP_IMAGE_REPOSITORY
+            ),
+            memory_limit_mib=capacity.fargate.container_memory_limit_mib,
+            cpu=capacity.fargate.container_cpu,
             essential=True,
+            port_mappings=[
+                ecs.PortMapping(
+                    name=APP_DISCOVERY_NAME,
+                    container_port=APP_CONTAINER_PORT,
+                    # Lets Service Connect report HTTP request/response metrics
+                    app_protocol=ecs.AppProtocol.http,
+                )
+            ],
         )
 
+        # The services need the public ALB listener and the PrivateAgent subnets
+        # from NetworkStack; the standalone test VPC has neither.
+        self.service = None
+        self.agent_service = None
+        if network_stack:
+            self._create_service(network_stack, capacity)
+            self._create_agent_service(capacity)
+
         # Outputs
         CfnOutput(
             self,
@@ -46,3 +146,385 @@ class ComputeStack(Stack):
             description="ECS cluster name",
             export_name="EcsClusterName",
         )
+
+    def _cached_image(
+        self, task_definition, construct_id: str, repository_name: str
+    ) -> ecs.ContainerImage:
+        """Image served through a pull-through cache rule of this registry.
+
+        The cache repository is created on the first pull, so the execution
+        role may also import upstream images and create repositories under
+        the rule prefixes.
+        """
+        image = ecs.ContainerImage.from_ecr_repository(
+            ecr.Repository.from_repository_name(self, construct_id, repository_name),
+            tag="latest",
+        )
+        # The first task launch pulls through the rule
+        task_definition.node.add_dependency(*self.pull_through_cache_rules)
+        task_definition.add_to_execution_role_policy(
+            iam.PolicyStatement(
+                actions=["ecr:BatchImportUpstreamImage", "ecr:CreateRepository"],
+                resources=[
+                    self.format_arn(
+                        service="ecr",
+                        resource="repository",
+                        resource_name=f"{prefix}/*",
+                    )
+                    for prefix in PULL_THROUGH_CACHE_RULES
+                ],
+            )
+        )
+        return image
+
+    @staticmethod
+    def _capacity_provider_strategies(fargate) -> list:
+        """FARGATE carries the on-demand base; FARGATE_SPOT only takes weight."""
+        strategies = [
+            ecs.CapacityProviderStrategy(
+                capacity_provider="FARGATE",
+                base=fargate.on_demand_base,
+                weight=fargate.on_demand_weight,
+            )
+        ]
+        if fargate.spot_weight:
+            strategies.append(
+                ecs.CapacityProviderStrategy(
+                    capacity_provider="FARGATE_SPOT", weight=fargate.spot_weight
+                )
+            )
+        return strategies
+
+    def _create_service(self, network_stack, capacity) -> None:
+        """Run the task definition behind the public ALB with autoscaling."""
+        vpc = network_stack.vpc
+
+        self.service = ecs.FargateService(
+            self,
+            "AppService",
+            service_name=ECS_SERVICE_NAMES["app"],
+            cluster=self.cluster,
+            task_definition=self.task_definition,
+            desired_count=capacity.fargate.desired_count,
+            capacity_provider_strategies=self._capacity_provider_strategies(
+                capacity.fargate
+            ),
+            # One PrivateApp subnet per AZ; ECS spreads Fargate tasks across them
+            vpc_subnets=ec2.SubnetSelection(subnet_group_name="PrivateApp"),
+            assign_public_ip=False,
+            health_check_grace_period=Duration.seconds(60),
+            circuit_breaker=ecs.DeploymentCircuitBreaker(rollback=True),
+            service_connect_configuration=ecs.ServiceConnectProps(
+                services=[
+                    ecs.ServiceConnectService(
+                        port_mapping_name=APP_DISCOVERY_NAME,
+                        dns_name=APP_DISCOVERY_NAME,
+                        port=APP_CONTAINER_PORT,
+                    )
+                ],
+                log_driver=ecs.LogDrivers.aws_logs(
+                    stream_prefix="service-connect",
+                    log_group=logs.LogGroup(
+                        self,
+                        "ServiceConnectLogGroup",
+                        log_group_name="/hackathon/service-connect",
+                        retention=logs.RetentionDays[capacity.log_retention],
+                        removal_policy=RemovalPolicy.DESTROY,
+                    ),
+                ),
+            ),
+        )
+
+        # Target group and listener rule live in this stack and reference the
+        # NetworkStack listener, so NetworkStack never depends on ComputeStack.
+        self.target_group = elbv2.ApplicationTargetGroup(
+            self,
+            "AppTargetGroup",
+            vpc=vpc,
+            port=APP_CONTAINER_PORT,
+            protocol=elbv2.ApplicationProtocol.HTTP,
+            target_type=elbv2.TargetType.IP,
+            targets=[
+                self.service.load_balancer_target(
+                    container_name="AppContainer",
+                    container_port=APP_CONTAINER_PORT,
+                )
+            ],
+            health_check=elbv2.HealthCheck(
+                path="/", healthy_http_codes="200-399", interval=Duration.seconds(30)
+            ),
+            deregistration_delay=Duration.seconds(30),
+        )
+
+        self.listener_rule = elbv2.ApplicationListenerRule(
+            self,
+            "AppListenerRule",
+            listener=network_stack.app_listener,
+            priority=100,
+            conditions=[elbv2.ListenerCondition.path_patterns(["/*"])],
+            action=elbv2.ListenerAction.forward([self.target_group]),
+        )
+
+        self.service.connections.allow_from(
+            network_stack.alb_security_group,
+            ec2.Port.tcp(APP_CONTAINER_PORT),
+            "Allow traffic from the public ALB",
+        )
+
+        # Target-tracking autoscaling on request rate and CPU
+        self.scaling = self.service.auto_scale_task_count(
+            min_capacity=capacity.fargate.min_tasks,
+            max_capacity=capacity.fargate.max_tasks,
+        )
+        self.scaling.scale_on_request_count(
+            "RequestCountScaling",
+            requests_per_target=capacity.fargate.target_requests_per_task,
+            target_group=self.target_group,
+            scale_in_cooldown=Duration.seconds(120),
+            scale_out_cooldown=Duration.seconds(60),
+        )
+        self.scaling.scale_on_cpu_utilization(
+            "CpuScaling",
+            target_utilization_percent=capacity.fargate.target_cpu_percent,
+            scale_in_cooldown=Duration.seconds(120),
+            scale_out_cooldown=Duration.seconds(60),
+        )
+        # Known traffic windows: raise the task range ahead of the spike so
+        # target tracking starts from warm capacity, then restore it
+        for window in capacity.scaling_windows:
+            self.scaling.scale_on_schedule(
+                f"{window.name}-start",
+                schedule=appscaling.Schedule.expression(window.start),
+                min_capacity=window.min_tasks,
+                max_capacity=window.max_tasks,
+            )
+            self.scaling.scale_on_schedule(
+                f"{window.name}-end",
+                schedule=appscaling.Schedule.expression(window.end),
+                min_capacity=capacity.fargate.min_tasks,
+                max_capacity=capacity.fargate.max_tasks,
+            )
+
+        CfnOutput(
+            self,
+            "ServiceConnectNamespaceArn",
+            value=self.cluster.default_cloud_map_namespace.namespace_arn,
+            description="Cloud Map namespace used by ECS Service Connect",
+            export_name="ServiceConnectNamespaceArn",
+        )
+
+        CfnOutput(
+            self,
+            "EcsServiceName",
+            value=self.service.service_name,
+            description="ECS service name",
+            export_name="EcsServiceName",
+        )
+
+    def _create_agent_service(self, capacity) -> None:
+        """Run agent workers in PrivateAgent, scaled on SQS backlog per task."""
+        agent = capacity.agent
+        # Without an image a fresh environment has nothing to run, and tasks
+        # that fail to pull would trip the circuit breaker and roll back the
+        # stack. Keep the service at zero tasks until a tag is deployed.
+        min_tasks = agent.min_tasks if self.agent_image_tag else 0
+        max_tasks = agent.max_tasks if self.agent_image_tag else 0
+
+        self.agent_dlq = sqs.Queue(
+            self,
+            "AgentJobDeadLetterQueue",
+            queue_name="hackathon-agent-jobs-dlq",
+            retention_period=Duration.days(14),
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+        )
+        self.agent_queue = sqs.Queue(
+            self,
+            "AgentJobQueue",
+            queue_name="hackathon-agent-jobs",
+            visibility_timeout=Duration.minutes(agent.visibility_timeout_minutes),
+            retention_period=Duration.days(4),
+            # Long polling: idle workers wait for jobs instead of spinning
+            receive_message_wait_time=Duration.seconds(20),
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            dead_letter_queue=sqs.DeadLetterQueue(
+                queue=self.agent_dlq, max_receive_count=agent.max_receive_count
+            ),
+        )
+
+        self.agent_task_definition = ecs.FargateTaskDefinition(
+            self,
+            "AgentTaskDefinition",
+            family=ECS_SERVICE_NAMES["agent"],
+            cpu=agent.cpu,
+            memory_limit_mib=agent.memory_limit_mib,
+            runtime_platform=ecs.RuntimePlatform(
+                cpu_architecture=(
+                    ecs.CpuArchitecture.ARM64
+                    if capacity.arm64
+                    else ecs.CpuArchitecture.X86_64
+                ),
+                operating_system_family=ecs.OperatingSystemFamily.LINUX,
+            ),
+        )
+        self.agent_container = self.agent_task_definition.add_container(
+            "AgentContainer",
+            image=ecs.ContainerImage.from_ecr_repository(
+                ecr.Repository.from_repository_name(
+                    self, "AgentRepository", AGENT_REPOSITORY_NAME
+                ),
+                # Placeholder while no image is deployed; never pulled
+                tag=self.agent_image_tag or AGENT_IMAGE_PLACEHOLDER_TAG,
+            ),
+            essential=True,
+            environment={"AGENT_QUEUE_URL": self.agent_queue.queue_url},
+            logging=ecs.LogDrivers.aws_logs(
+                stream_prefix="agent",
+                log_group=logs.LogGroup(
+                    self,
+                    "AgentLogGroup",
+                    log_group_name="/hackathon/agent-worker",
+                    retention=logs.RetentionDays[capacity.log_retention],
+                    removal_policy=RemovalPolicy.DESTROY,
+                ),
+            ),
+            # Fargate maximum: time to finish or release the current job when
+            # a task is scaled in or its Spot capacity is reclaimed
+            stop_timeout=Duration.seconds(120),
+        )
+
+        task_role = self.agent_task_definition.task_role
+        self.agent_queue.grant_consume_messages(task_role)
+        task_role.add_to_principal_policy(
+            iam.PolicyStatement(
+                actions=[
+                    "bedrock:InvokeModel",
+                    "bedrock:InvokeModelWithResponseStream",
+                ],
+                resources=[
+                    f"arn:{self.partition}:bedrock:*::foundation-model/*",
+                    f"arn:{self.partition}:bedrock:{self.region}:{self.account}"
+                    ":inference-profile/*",
+                ],
+            )
+        )
+
+        self.agent_service = ecs.FargateService(
+            self,
+            "AgentService",
+            service_name=ECS_SERVICE_NAMES["agent"],
+            cluster=self.cluster,
+            task_definition=self.agent_task_definition,
+            desired_count=min_tasks,
+            capacity_provider_strategies=self._capacity_provider_strategies(agent),
+            vpc_subnets=ec2.SubnetSelection(subnet_group_name="PrivateAgent"),
+            assign_public_ip=False,
+            circuit_breaker=ecs.DeploymentCircuitBreaker(rollback=True),
+            # Client only: workers reach the app service at http://app
+            service_connect_configuration=ecs.ServiceConnectProps(),
+        )
+        # Service Connect calls arrive directly from the clients' Envoy
+        # sidecars rather than through the ALB; only the client services
+        # may reach the app tasks this way
+        self.service.connections.allow_from(
+            self.agent_service,
+            ec2.Port.tcp(APP_CONTAINER_PORT),
+            "Allow Service Connect traffic from the agent workers",
+        )
+
+        # Backlog per task = visible messages / running tasks. Target tracking
+        # keeps it at the target, so the worker count follows the queue depth
+        # rather than CPU, which stays low while agents wait on Bedrock.
+        self.agent_scaling = self.agent_service.auto_scale_task_count(
+            min_capacity=min_tasks, max_capacity=max_tasks
+        )
+        # CDK's target tracking takes a single metric, so the metric math
+        # policy is written at the CloudFormation level
+        backlog_per_task = [
+            self._scaling_metric(
+                "visible",
+                "AWS/SQS",
+                "ApproximateNumberOfMessagesVisible",
+                {"QueueName": self.agent_queue.queue_name},
+                "Sum",
+            ),
+            self._scaling_metric(
+                "tasks",
+                "ECS/ContainerInsights",
+                "RunningTaskCount",
+                {
+                    "ClusterName": self.cluster.cluster_name,
+                    "ServiceName": self.agent_service.service_name,
+                },
+                "Average",
+            ),
+            appscaling.CfnScalingPolicy.TargetTrackingMetricDataQueryProperty(
+                id="backlog_per_task",
+                expression="visible / tasks",
+                label="Agent job backlog per task",
+                return_data=True,
+            ),
+        ]
+        scalable_target = cast(
+            appscaling.ScalableTarget, self.agent_scaling.node.find_child("Target")
+        )
+        appscaling.CfnScalingPolicy(
+            self,
+            "AgentBacklogScaling",
+            policy_name="AgentBacklogPerTask",
+            policy_type="TargetTrackingScaling",
+            scaling_target_id=scalable_target.scalable_target_id,
+            target_tracking_scaling_policy_configuration={
+                "targetValue": agent.target_backlog_per_task,
+                "customizedMetricSpecification": {"metrics": backlog_per_task},
+                "scaleInCooldown": 300,
+                "scaleOutCooldown": 60,
+            },
+        )
+
+        CfnOutput(
+            self,
+            "AgentQueueUrl",
+            value=self.agent_queue.queue_url,
+            description="SQS queue the agent workers consume jobs from",
+            export_name="AgentQueueUrl",
+        )
+
+        CfnOutput(
+            self,
+            "AgentDeadLetterQueueUrl",
+            value=self.agent_dlq.queue_url,
+            description="Dead-letter queue for agent jobs that keep failing",
+            export_name="AgentDeadLetterQueueUrl",
+        )
+
+        CfnOutput(
+            self,
+            "AgentServiceName",
+            value=self.agent_service.service_name,
+            description="ECS agent worker service name",
+            export_name="AgentServiceName",
+        )
+
+    @staticmethod
+    def _scaling_metric(query_id, namespace, metric_name, dimensions, stat):
+        """Metric query input to a metric math target-tracking policy."""
+        Policy = appscaling.CfnScalingPolicy
+        return Policy.TargetTrackingMetricDataQueryProperty(
+            id=query_id,
+            metric_stat=Policy.TargetTrackingMetricStatProperty(
+                metric=Policy.TargetTrackingMetricProperty(
+                    namespace=namespace,
+                    metric_name=metric_name,
+                    dimensions=[
+                        Policy.TargetTrackingMetricDimensionProperty(
+                            name=name, value=value
+                        )
+                        for name, value in dimensions.items()
+                    ],
+                ),
+                stat=stat,
+            ),
+            return_data=False,
+        )
@@ -1,22 +1,81 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import cast
+
 import aws_cdk as cdk
+import jsii
 from aws_cdk import (
     Stack,
     Duration,
+    RemovalPolicy,
+    aws_applicationautoscaling as appscaling,
+    aws_cloudwatch as cloudwatch,
+    aws_iam as iam,
+    aws_kms as kms,
+    aws_lambda as lambda_,
+    aws_logs as logs,
     aws_rds as rds,
     aws_opensearchservice as opensearch,
     aws_secretsmanager as secretsmanager,
     aws_ec2 as ec2,
+    custom_resources as cr,
     CfnOutput,
+    CustomResource,
 )
 from constructs import Construct
 
+from ..config import get_capacity_profile
+
+# Schema bootstrap custom resource handler (pgvector tables and indexes)
+DB_BOOTSTRAP_CODE = (
+    Path(__file__).resolve().parent.parent / "functions" / "db_bootstrap"
+)
+
+
+@jsii.implements(cdk.ILocalBundling)
+class _PipBundling:
+    """Bundle a function with the host's pip, so synth does not need Docker.
+
+    Only used for pure-Python requirements, which install the same on any
+    platform. Returning False falls back to Docker bundling.
+    """
+
+    def __init__(self, source: Path) -> None:
+        self.source = source
+
+    def try_bundle(self, output_dir: str, *_args, **_options) -> bool:
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "pip",
+                "install",
+                "--quiet",
+                "--target",
+                output_dir,
+                "--requirement",
+                str(self.source / "requirements.txt"),
+            ],
+            check=False,
+        )
+        if result.returncode:
+            return False
+        for path in self.source.glob("*.py"):
+            shutil.copy(path, output_dir)
+        return True
+
 
 class DatabaseStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         # Get VPC from network stack
         network_stack = kwargs.pop("network_stack", None)
+        # Instance types, node counts and ACU range from the capacity profile
+        capacity = kwargs.pop("capacity", None) or get_capacity_profile()
 
         super().__init__(scope, construct_id, **kwargs)
+        self.capacity = capacity
         if network_stack:
             vpc = network_stack.vpc
             # Prefer direct references to the NetworkStack VPC private subnets
@@ -78,16 +137,98 @@ class DatabaseStack(Stack):
             ),
         )
 
+        # 15.7 is the first 15.x release that can scale to 0 ACUs
+        engine = rds.DatabaseClusterEngine.aurora_postgres(
+            version=rds.AuroraPostgresEngineVersion.of("15.7", "15")
+        )
+        tuning = capacity.postgres
+        # Cluster-wide settings: query statistics, planner costs, timeouts.
+        # shared_preload_libraries changes take effect after a reboot.
+        self.cluster_parameter_group = rds.ParameterGroup(
+            self,
+            "ClusterParameterGroup",
+            engine=engine,
+            description="hackathon Aurora PostgreSQL cluster parameters",
+            parameters={
+                "shared_preload_libraries": "pg_stat_statements,auto_explain",
+                "pg_stat_statements.track": "all",
+                "track_io_timing": "1",
+                "random_page_cost": str(tuning.random_page_cost),
+                "statement_timeout": str(tuning.statement_timeout_ms),
+                "idle_in_transaction_session_timeout": str(
+                    tuning.idle_in_transaction_timeout_ms
+                ),
+            },
+        )
+        # Per-instance memory and slow query logging
+        self.instance_parameter_group = rds.ParameterGroup(
+            self,
+            "InstanceParameterGroup",
+            engine=engine,
+            description="hackathon Aurora PostgreSQL instance parameters",
+            parameters={
+                # kB
+                "work_mem": str(tuning.work_mem_mb * 1024),
+                "log_min_duration_statement": str(tuning.slow_query_ms),
+                "auto_explain.log_min_duration": str(tuning.slow_query_ms),
+                "auto_explain.log_format": "json",
+            },
+        )
+
+        # Performance Insights (top SQL, wait events) on every instance,
+        # encrypted with a key from this stack
+        self.performance_insights_key = kms.Key(
+            self,
+            "PerformanceInsightsKey",
+            alias="alias/hackathon/rds-performance-insights",
+            description="Encrypts Aurora Performance Insights data",
+            enable_key_rotation=True,
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+        instance_props = {
+            "parameter_group": self.instance_parameter_group,
+            "enable_performance_insights": True,
+            "performance_insight_retention": rds.PerformanceInsightRetention[
+                capacity.aurora.performance_insights_retention
+            ],
+            "performance_insight_encryption_key": self.performance_insights_key,
+        }
+
+        # Enhanced Monitoring: OS-level metrics for every instance
+        monitoring_interval = capacity.aurora.monitoring_interval_seconds
+        self.monitoring_role = None
+        if monitoring_interval:
+            self.monitoring_role = iam.Role(
+                self,
+                "RdsMonitoringRole",
+                assumed_by=iam.ServicePrincipal("monitoring.rds.amazonaws.com"),
+                managed_policies=[
+                    iam.ManagedPolicy.from_aws_managed_policy_name(
+                        "service-role/AmazonRDSEnhancedMonitoringRole"
+                    )
+                ],
+            )
+
         # RDS PostgreSQL
         self.rds_cluster = rds.DatabaseCluster(
             self,
             "RdsCluster",
-            engine=rds.DatabaseClusterEngine.aurora_postgres(
-                version=rds.AuroraPostgresEngineVersion.VER_15_4
-            ),
+            engine=engine,
+            parameter_group=self.cluster_parameter_group,
             credentials=rds.Credentials.from_secret(self.rds_secret, "username"),
-            writer=rds.ClusterInstance.serverless_v2("writer"),
-            readers=[rds.ClusterInstance.serverless_v2("reader")],
+            writer=rds.ClusterInstance.serverless_v2("writer", **instance_props),
+            readers=[
+                self._reader(capacity, i, instance_props)
+                for i in range(capacity.aurora.readers)
+            ],
+            storage_type=rds.DBClusterStorageType[capacity.aurora.storage_type],
+            monitoring_interval=(
+                Duration.seconds(monitoring_interval) if monitoring_interval else None
+            ),
+            monitoring_role=self.monitoring_role,
+            # CDK only accepts 0.5 and up; 0 is set on the resource below
+            serverless_v2_min_capacity=max(capacity.aurora.min_acu, 0.5),
+            serverless_v2_max_capacity=capacity.aurora.max_acu,
             vpc=vpc,
             vpc_subnets=ec2.SubnetSelection(subnets=data_subnets),
             default_database_name="hackathon",
@@ -95,6 +236,26 @@ class DatabaseStack(Stack):
             storage_encrypted=True,
         )
 
+        if capacity.aurora.auto_pause:
+            cfn_cluster = cast(rds.CfnDBCluster, self.rds_cluster.node.default_child)
+            cfn_cluster.add_property_override(
+                "ServerlessV2ScalingConfiguration.MinCapacity", 0
+            )
+            cfn_cluster.add_property_override(
+                "ServerlessV2ScalingConfiguration.SecondsUntilAutoPause",
+                capacity.aurora.seconds_until_auto_pause,
+            )
+
+        # Extra readers for scheduled capacity windows
+        self.reader_scaling = None
+        reader_windows = [
+            window
+            for window in capacity.scaling_windows
+            if window.aurora_readers is not None
+        ]
+        if reader_windows:
+            self._schedule_readers(capacity, reader_windows)
+
         # RDS Proxy
         self.rds_proxy = rds.DatabaseProxy(
             self,
@@ -104,7 +265,33 @@ class DatabaseStack(Stack):
             vpc=vpc,
             vpc_subnets=ec2.SubnetSelection(subnets=data_subnets),
             security_groups=[self.rds_cluster.connections.security_groups[0]],
+            max_connections_percent=capacity.proxy.max_connections_percent,
+            max_idle_connections_percent=capacity.proxy.max_idle_connections_percent,
+            borrow_timeout=Duration.seconds(capacity.proxy.borrow_timeout_seconds),
+            idle_client_timeout=Duration.seconds(
+                capacity.proxy.idle_client_timeout_seconds
+            ),
+            init_query=capacity.proxy.init_query,
         )
+        self._create_proxy_alarms(capacity.proxy)
+
+        # Read-only proxy endpoint: pooled connections spread over the readers,
+        # for read-heavy traffic such as knowledge base lookups and dashboards
+        self.rds_proxy_read_only_endpoint = None
+        if capacity.aurora.readers:
+            self.rds_proxy_read_only_endpoint = rds.CfnDBProxyEndpoint(
+                self,
+                "RdsProxyReadOnlyEndpoint",
+                db_proxy_endpoint_name="hackathon-proxy-read-only",
+                db_proxy_name=self.rds_proxy.db_proxy_name,
+                target_role="READ_ONLY",
+                vpc_subnet_ids=[subnet.subnet_id for subnet in data_subnets],
+                vpc_security_group_ids=[
+                    self.rds_cluster.connections.security_groups[0].security_group_id
+                ],
+            )
+
+        self._create_db_bootstrap(capacity, vpc, data_subnets)
 
         # OpenSearch
         self.opensearch_domain = opensearch.Domain(
@@ -112,11 +299,12 @@ class DatabaseStack(Stack):
             "OpenSearchDomain",
             version=opensearch.EngineVersion.OPENSEARCH_2_11,
             capacity=opensearch.CapacityConfig(
-                master_nodes=0,
+                master_nodes=capacity.opensearch.master_nodes,
+                master_node_instance_type=capacity.opensearch.master_node_instance_type,
                 # For a two Availability Zone deployment, OpenSearch requires
-                # an even number of data nodes. Use 2 data nodes for 2 AZs.
-                data_nodes=2,
-                data_node_instance_type="t3.small.search",
+                # an even number of data nodes (enforced by OpenSearchCapacity).
+                data_nodes=capacity.opensearch.data_nodes,
+                data_node_instance_type=capacity.opensearch.data_node_instance_type,
             ),
             vpc=vpc,
             vpc_subnets=[ec2.SubnetSelection(subnets=data_subnets)],
@@ -135,6 +323,15 @@ class DatabaseStack(Stack):
             export_name="RdsEndpoint",
         )
 
+        if self.rds_proxy_read_only_endpoint:
+            CfnOutput(
+                self,
+                "RdsReadOnlyEndpoint",
+                value=self.rds_proxy_read_only_endpoint.attr_endpoint,
+                description="RDS proxy read-only endpoint (Aurora readers)",
+                export_name="RdsReadOnlyEndpoint",
+            )
+
         CfnOutput(
             self, "RdsPort", value="5432", description="RDS port", export_name="RdsPort"
         )
@@ -146,3 +343,187 @@ class DatabaseStack(Stack):
             description="OpenSearch endpoint",
             export_name="OpenSearchEndpoint",
         )
+
+    def _create_db_bootstrap(self, capacity, vpc, data_subnets) -> None:
+        """Apply the pgvector schema migrations on every deploy.
+
+        A Lambda in the PrivateData subnets connects through the proxy and
+        runs the versioned, idempotent migrations in functions/db_bootstrap.
+        The custom resource updates, and so reruns them, whenever the vector
+        index settings or the function code change.
+        """
+        self.db_bootstrap_function = lambda_.Function(
+            self,
+            "DbBootstrapFunction",
+            description="Applies the hackathon database schema migrations",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            # pg8000 is pure Python, so the bundle runs on either architecture
+            architecture=lambda_.Architecture.ARM_64,
+            handler="index.handler",
+            code=lambda_.Code.from_asset(
+                str(DB_BOOTSTRAP_CODE),
+                exclude=["__pycache__"],
+                bundling=cdk.BundlingOptions(
+                    image=lambda_.Runtime.PYTHON_3_12.bundling_image,
+                    command=[
+                        "bash",
+                        "-c",
+                        "pip install -r requirements.txt -t /asset-output"
+                        " && cp -au *.py /asset-output",
+                    ],
+                    local=_PipBundling(DB_BOOTSTRAP_CODE),
+                ),
+            ),
+            # Building an HNSW index over existing rows can take minutes
+            timeout=Duration.minutes(15),
+            memory_size=256,
+            vpc=vpc,
+            vpc_subnets=ec2.SubnetSelection(subnets=data_subnets),
+            environment={
+                "PROXY_ENDPOINT": self.rds_proxy.endpoint,
+                "DB_NAME": "hackathon",
+                "SECRET_ARN": self.rds_secret.secret_arn,
+            },
+            log_group=logs.LogGroup(
+                self,
+                "DbBootstrapLogGroup",
+                log_group_name="/hackathon/db-bootstrap",
+                retention=logs.RetentionDays[capacity.log_retention],
+                removal_policy=RemovalPolicy.DESTROY,
+            ),
+        )
+        self.rds_secret.grant_read(self.db_bootstrap_function)
+        self.rds_proxy.connections.allow_from(
+            self.db_bootstrap_function,
+            ec2.Port.tcp(5432),
+            "Schema bootstrap function to RDS proxy",
+        )
+
+        provider = cr.Provider(
+            self,
+            "DbBootstrapProvider",
+            on_event_handler=self.db_bootstrap_function,
+        )
+        self.db_bootstrap = CustomResource(
+            self,
+            "DbBootstrap",
+            service_token=provider.service_token,
+            resource_type="Custom::DbBootstrap",
+            properties={
+                "EmbeddingDimensions": capacity.vector.embedding_dimensions,
+                "IndexType": capacity.vector.index_type,
+                "HnswM": capacity.vector.hnsw_m,
+                "HnswEfConstruction": capacity.vector.hnsw_ef_construction,
+                "IvfflatLists": capacity.vector.ivfflat_lists,
+                # New migrations ship as code changes
+                "CodeFingerprint": cdk.FileSystem.fingerprint(
+                    str(DB_BOOTSTRAP_CODE), exclude=["__pycache__"]
+                ),
+            },
+        )
+        # The writer must be up and registered behind the proxy
+        self.db_bootstrap.node.add_dependency(self.rds_cluster, self.rds_proxy)
+
+    def _create_proxy_alarms(self, proxy) -> None:
+        """Alarm when clients queue for pooled connections or sessions pin."""
+
+        def proxy_metric(metric_name: str, statistic: str) -> cloudwatch.Metric:
+            return cloudwatch.Metric(
+                namespace="AWS/RDS",
+                metric_name=metric_name,
+                dimensions_map={"ProxyName": self.rds_proxy.db_proxy_name},
+                statistic=statistic,
+                period=Duration.minutes(1),
+            )
+
+        self.proxy_borrow_latency_alarm = cloudwatch.Alarm(
+            self,
+            "ProxyBorrowLatencyAlarm",
+            alarm_name="RDS Proxy Borrow Latency",
+            alarm_description="Clients are waiting for pooled RDS Proxy connections",
+            # Reported in microseconds
+            metric=proxy_metric("DatabaseConnectionsBorrowLatency", "p90"),
+            threshold=proxy.borrow_latency_alarm_ms * 1000,
+            evaluation_periods=5,
+            datapoints_to_alarm=3,
+            comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD,
+            treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+        )
+        self.proxy_pinned_sessions_alarm = cloudwatch.Alarm(
+            self,
+            "ProxyPinnedSessionsAlarm",
+            alarm_name="RDS Proxy Pinned Sessions",
+            alarm_description="RDS Proxy sessions are pinned to their connections",
+            metric=proxy_metric("DatabaseConnectionsCurrentlySessionPinned", "Maximum"),
+            threshold=proxy.pinned_sessions_alarm,
+            evaluation_periods=5,
+            datapoints_to_alarm=3,
+            comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD,
+            treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+        )
+
+    def _reader(self, capacity, index: int, instance_props: dict):
+        """Reader ``index``: Serverless v2, or provisioned for Optimized Reads.
+
+        Failover readers go in promotion tier 1 (Serverless v2 readers there
+        scale with the writer) and the rest in tier 2.
+        """
+        name = "reader" if index == 0 else f"reader{index + 1}"
+        failover = index < capacity.aurora.failover_readers
+        if capacity.aurora.optimized_reads_instance_type:
+            return rds.ClusterInstance.provisioned(
+                name,
+                instance_type=ec2.InstanceType(
+                    capacity.aurora.optimized_reads_instance_type
+                ),
+                promotion_tier=1 if failover else 2,
+                **instance_props,
+            )
+        return rds.ClusterInstance.serverless_v2(
+            name, scale_with_writer=failover, **instance_props
+        )
+
+    def _schedule_readers(self, capacity, windows) -> None:
+        """Add Aurora readers for each window and remove them afterwards.
+
+        Aurora Auto Scaling adds db.serverless readers to reach the scheduled
+        minimum and only ever removes the readers it added, never the ones
+        defined on the cluster above.
+
+        Those readers live outside CloudFormation, and deleting the stack only
+        deregisters the target. Readers still up from a window make the cluster
+        deletion fail, so they must be gone before a teardown.
+        """
+        self.reader_scaling = appscaling.ScalableTarget(
+            self,
+            "ReaderScalableTarget",
+            service_namespace=appscaling.ServiceNamespace.RDS,
+            resource_id=f"cluster:{self.rds_cluster.cluster_identifier}",
+            scalable_dimension="rds:cluster:ReadReplicaCount",
+            min_capacity=capacity.aurora.readers,
+            max_capacity=max(window.aurora_readers for window in windows),
+            role=iam.Role.from_role_arn(
+                self,
+                "ReaderScalingRole",
+                self.format_arn(
+                    service="iam",
+                    region="",
+                    resource="role",
+                    resource_name="aws-service-role/rds.application-autoscaling"
+                    ".amazonaws.com/AWSServiceRoleForApplicationAutoScaling_RDSCluster",
+                ),
+            ),
+        )
+        for window in windows:
+            self.reader_scaling.scale_on_schedule(
+                f"{window.name}-start",
+                schedule=appscaling.Schedule.expression(window.start),
+                min_capacity=window.aurora_readers,
+                max_capacity=window.aurora_readers,
+            )
+            self.reader_scaling.scale_on_schedule(
+                f"{window.name}-end",
+                schedule=appscaling.Schedule.expression(window.end),
+                min_capacity=capacity.aurora.readers,
+                max_capacity=capacity.aurora.readers,
+            )
@@ -1,5 +1,6 @@
 from aws_cdk import (
     Stack,
+    Duration,
     RemovalPolicy,
     aws_cloudwatch as cloudwatch,
     aws_logs as logs,
@@ -8,20 +9,31 @@ from aws_cdk import (
 )
 from constructs import Construct
 
+from ..config import (
+    APP_DISCOVERY_NAME,
+    ECS_CLUSTER_NAME,
+    ECS_SERVICE_NAMES,
+    get_capacity_profile,
+)
+
 
 class MonitoringStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         # Get logs bucket from storage stack
         logs_bucket = kwargs.pop("logs_bucket", None)
+        # Log retention from the capacity profile
+        capacity = kwargs.pop("capacity", None) or get_capacity_profile()
 
         super().__init__(scope, construct_id, **kwargs)
+        self.capacity = capacity
+        retention = logs.RetentionDays[capacity.log_retention]
 
         # CloudWatch Log Groups
         self.app_log_group = logs.LogGroup(
             self,
             "AppLogGroup",
             log_group_name="/hackathon/app",
-            retention=logs.RetentionDays.ONE_WEEK,
+            retention=retention,
             removal_policy=RemovalPolicy.DESTROY,
         )
 
@@ -29,7 +41,7 @@ class MonitoringStack(Stack):
             self,
             "AlbLogGroup",
             log_group_name="/hackathon/alb",
-            retention=logs.RetentionDays.ONE_WEEK,
+            retention=retention,
             removal_policy=RemovalPolicy.DESTROY,
         )
 
@@ -53,6 +65,30 @@ class MonitoringStack(Stack):
             comparison_operator=cloudwatch.ComparisonOperator.LESS_THAN_THRESHOLD,
         )
 
+        # ECS dashboard from Container Insights (enhanced observability), to
+        # size tasks and set scaling targets from measured usage
+        self.ecs_dashboard = cloudwatch.Dashboard(
+            self,
+            "EcsDashboard",
+            dashboard_name="hackathon-ecs",
+            default_interval=Duration.hours(3),
+        )
+        for service in ECS_SERVICE_NAMES.values():
+            self.ecs_dashboard.add_widgets(
+                cloudwatch.TextWidget(markdown=f"## {service}", width=24, height=1)
+            )
+            self.ecs_dashboard.add_widgets(*self._service_widgets(service))
+            self.ecs_dashboard.add_widgets(*self._task_widgets(service))
+        # Calls from other services to the app service over Service Connect
+        self.ecs_dashboard.add_widgets(
+            cloudwatch.TextWidget(
+                markdown=f"## Service Connect: http://{APP_DISCOVERY_NAME}",
+                width=24,
+                height=1,
+            )
+        )
+        self.ecs_dashboard.add_widgets(*self._service_connect_widgets())
+
         # CloudTrail
         self.cloudtrail = cloudtrail.Trail(
             self,
@@ -81,3 +117,142 @@ class MonitoringStack(Stack):
             description="CloudTrail ARN",
             export_name="CloudTrailArn",
         )
+
+    @staticmethod
+    def _container_insights_metric(
+        metric_name: str, service: str, statistic: str = "Average"
+    ) -> cloudwatch.Metric:
+        """Service-level Container Insights metric."""
+        return cloudwatch.Metric(
+            namespace="ECS/ContainerInsights",
+            metric_name=metric_name,
+            dimensions_map={"ClusterName": ECS_CLUSTER_NAME, "ServiceName": service},
+            statistic=statistic,
+            period=Duration.minutes(1),
+        )
+
+    def _utilization(self, resource: str, service: str) -> cloudwatch.MathExpression:
+        """Used share of the reserved task CPU or memory, in percent."""
+        # Ids must be unique within a graph, which plots CPU and memory together
+        used, reserved = f"{resource.lower()}_used", f"{resource.lower()}_reserved"
+        return cloudwatch.MathExpression(
+            expression=f"100 * {used} / {reserved}",
+            using_metrics={
+                used: self._container_insights_metric(f"{resource}Utilized", service),
+                reserved: self._container_insights_metric(
+                    f"{resource}Reserved", service
+                ),
+            },
+            label=f"{resource} utilization (%)",
+            period=Duration.minutes(1),
+        )
+
+    def _service_widgets(self, service: str) -> list:
+        """CPU, memory, network, storage and task count for a service."""
+        metric = self._container_insights_metric
+        return [
+            cloudwatch.GraphWidget(
+                title="CPU and memory utilization (% of reserved)",
+                left=[self._utilization("Cpu", service)],
+                right=[self._utilization("Memory", service)],
+                left_y_axis=cloudwatch.YAxisProps(min=0, max=100),
+                right_y_axis=cloudwatch.YAxisProps(min=0, max=100),
+                width=6,
+            ),
+            cloudwatch.GraphWidget(
+                title="Network (bytes/second)",
+                left=[
+                    metric("NetworkRxBytes", service),
+                    metric("NetworkTxBytes", service),
+                ],
+                width=6,
+            ),
+            cloudwatch.GraphWidget(
+                title="Ephemeral storage (GB)",
+                left=[
+                    metric("EphemeralStorageUtilized", service),
+                    metric("EphemeralStorageReserved", service),
+                ],
+                width=6,
+            ),
+            cloudwatch.GraphWidget(
+                title="Tasks",
+                left=[
+                    metric("RunningTaskCount", service),
+                    metric("DesiredTaskCount", service),
+                    metric("PendingTaskCount", service),
+                ],
+                width=6,
+            ),
+        ]
+
+    @staticmethod
+    def _service_connect_metric(metric_name: str, statistic: str) -> cloudwatch.Metric:
+        """Service Connect metric for requests handled by the app service."""
+        return cloudwatch.Metric(
+            namespace="AWS/ECS",
+            metric_name=metric_name,
+            dimensions_map={
+                "ClusterName": ECS_CLUSTER_NAME,
+                "ServiceName": ECS_SERVICE_NAMES["app"],
+                "DiscoveryName": APP_DISCOVERY_NAME,
+            },
+            statistic=statistic,
+            period=Duration.minutes(1),
+        )
+
+    def _service_connect_widgets(self) -> list:
+        """Request rate, latency, errors and connections seen by the app's proxy."""
+        metric = self._service_connect_metric
+        return [
+            cloudwatch.GraphWidget(
+                title="Requests",
+                left=[metric("RequestCount", "Sum")],
+                width=6,
+            ),
+            cloudwatch.GraphWidget(
+                title="Response time p99 (ms)",
+                left=[metric("TargetResponseTime", "p99")],
+                width=6,
+            ),
+            cloudwatch.GraphWidget(
+                title="5XX responses",
+                left=[metric("HTTPCode_Target_5XX_Count", "Sum")],
+                width=6,
+            ),
+            cloudwatch.GraphWidget(
+                title="Active connections",
+                left=[metric("ActiveConnectionCount", "Sum")],
+                width=6,
+            ),
+        ]
+
+    @staticmethod
+    def _task_widgets(service: str) -> list:
+        """Per-task CPU and memory; the task definition family is the service name."""
+
+        def per_task(metric_name: str) -> cloudwatch.MathExpression:
+            query = (
+                "{ECS/ContainerInsights,ClusterName,TaskDefinitionFamily,TaskId} "
+                f'MetricName="{metric_name}" ClusterName="{ECS_CLUSTER_NAME}" '
+                f'TaskDefinitionFamily="{service}"'
+            )
+            # One line per running task
+            return cloudwatch.MathExpression(
+                expression=f"SEARCH('{query}', 'Average', 60)",
+                using_metrics={},
+                label="",
+            )
+
+        return [
+            cloudwatch.GraphWidget(
+                title="Per-task CPU utilized (CPU units)",
+                left=[per_task("CpuUtilized")],
+                width=12,
+            ),
+            cloudwatch.GraphWidget(
+                title="Per-task memory utilized (MiB)",
+                left=[per_task("MemoryUtilized")],
+                width=12,
+            ),
+        ]
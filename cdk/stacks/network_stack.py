@@ -228,6 +228,23 @@ class NetworkStack(Stack):
                     ),
                 ),
             )
+        else:
+            # Without a certificate the ALB serves plain HTTP. Services attach
+            # listener rules to app_listener; unmatched requests get a 404.
+            self.http_listener = self.alb.add_listener(
+                "HttpListener",
+                port=80,
+                default_action=elbv2.ListenerAction.fixed_response(
+                    status_code=404,
+                    content_type="text/plain",
+                    message_body="Not Found",
+                ),
+            )
+
+        # Listener that application services register their routes on
+        self.app_listener = (
+            self.https_listener if self.certificate is not None else self.http_listener
+        )
 
         # DNS Record Creation
         if self.hosted_zone is not None and domain_name:
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""Synth benchmark suite for the CDK app.
+
+Times, each in a fresh interpreter so nothing is warm:
+
+- ``import_aws_cdk``: cold ``import aws_cdk``
+- ``import_cdk_stacks`` / ``import_StorageStack``: cold ``import cdk.stacks``
+  and ``from cdk.stacks import StorageStack`` (stack modules load lazily)
+- ``construct_<Stack>``: construction of each stack class (dependencies such
+  as NetworkStack are built first and excluded from the timing)
+- ``app_synth``: a full ``python app.py`` run, i.e. every stack plus
+  ``app.synth()``
+
+``peak_rss_mb`` is the ``ru_maxrss`` that ``wait4`` reports for the child:
+the largest peak RSS of any single process in its tree (python or the jsii
+node kernel it spawns), not the combined peak of the tree. Results are
+appended to a JSON history file and the run fails when a metric regresses
+beyond the configured threshold relative to the median of recent history.
+
+Usage (from the repository root):
+    python -m scripts.benchmark_synth
+    python -m scripts.benchmark_synth --repeat 5 --time-threshold 0.25
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CDK_DIR = PROJECT_ROOT / "cdk"
+DEFAULT_HISTORY = PROJECT_ROOT / "benchmarks" / "synth_history.json"
+
+# Stack class -> (module, constructor wiring). Wiring values are either the
+# name of a sibling stack or a (stack, attribute) pair, mirroring app.py.
+STACKS: dict[str, tuple[str, dict[str, Any]]] = {
+    "NetworkStack": ("cdk.stacks.network_stack", {}),
+    "DatabaseStack": ("cdk.stacks.database_stack", {"network_stack": "NetworkStack"}),
+    "ComputeStack": ("cdk.stacks.compute_stack", {"network_stack": "NetworkStack"}),
+    "StorageStack": ("cdk.stacks.storage_stack", {}),
+    "SecurityStack": ("cdk.stacks.security_stack", {}),
+    "MonitoringStack": (
+        "cdk.stacks.monitoring_stack",
+        {"logs_bucket": ("StorageStack", "logs_bucket")},
+    ),
+}
+
+
+def _maxrss_mb(ru_maxrss: int) -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(ru_maxrss / divisor, 1)
+
+
+def _child_env(**extra: str) -> dict[str, str]:
+    env = dict(os.environ)
+    # Without an account the stacks skip context lookups (see app.py)
+    env.pop("CDK_DEFAULT_ACCOUNT", None)
+    env["PYTHONPATH"] = str(PROJECT_ROOT)
+    # Time CDK itself, not pip/Docker asset bundling (DatabaseStack's Lambda)
+    env["CDK_CONTEXT_JSON"] = json.dumps({"aws:cdk:bundling-stacks": []})
+    env.update(extra)
+    return env
+
+
+def run_measured(cmd: list[str], cwd: Path, env: dict[str, str]) -> dict[str, float]:
+    """Run ``cmd`` and return its timing and largest single-process peak RSS.
+
+    If the child prints a JSON object with a ``seconds`` key on its last
+    stdout line, that in-process timing is used instead of wall time.
+    """
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=out, stderr=err)
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        wall = time.perf_counter() - start
+        out.seek(0)
+        err.seek(0)
+        stdout, stderr = out.read().decode(), err.read().decode()
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark child {cmd} failed:\n{stderr[-2000:]}")
+
+    seconds = wall
+    lines = stdout.strip().splitlines()
+    if lines:
+        try:
+            seconds = float(json.loads(lines[-1])["seconds"])
+        except (ValueError, KeyError, TypeError):
+            pass
+    return {"seconds": round(seconds, 4), "peak_rss_mb": _maxrss_mb(rusage.ru_maxrss)}
+
+
+def _child_import(target: str) -> float:
+    """Time importing ``module`` or ``module:attribute``."""
+    module, _, attribute = target.partition(":")
+    start = time.perf_counter()
+    imported = importlib.import_module(module)
+    if attribute:
+        getattr(imported, attribute)
+    return time.perf_counter() - start
+
+
+def _child_construct(stack_name: str) -> float:
+    import aws_cdk as cdk
+
+    app = cdk.App()
+    built: dict[str, Any] = {}
+
+    def load(name: str) -> type:
+        module, _ = STACKS[name]
+        return getattr(importlib.import_module(module), name)
+
+    def build(name: str) -> Any:
+        if name not in built:
+            built[name] = load(name)(app, name, **wiring(name))
+        return built[name]
+
+    def wiring(name: str) -> dict[str, Any]:
+        kwargs = {}
+        for arg, ref in STACKS[name][1].items():
+            if isinstance(ref, tuple):
+                kwargs[arg] = getattr(build(ref[0]), ref[1])
+            else:
+                kwargs[arg] = build(ref)
+        return kwargs
+
+    stack_cls = load(stack_name)
+    kwargs = wiring(stack_name)
+    start = time.perf_counter()
+    stack_cls(app, stack_name, **kwargs)
+    return time.perf_counter() - start
+
+
+def _run_child_mode(mode: str) -> None:
+    if mode.startswith("import:"):
+        seconds = _child_import(mode.split(":", 1)[1])
+    elif mode.startswith("construct:"):
+        seconds = _child_construct(mode.split(":", 1)[1])
+    else:
+        raise SystemExit(f"unknown child mode {mode!r}")
+    print(json.dumps({"seconds": seconds}))
+
+
+def benchmark_commands() -> dict[str, tuple[list[str], Path]]:
+    """Metric name -> (command, working directory)."""
+    child = [sys.executable, "-m", "scripts.benchmark_synth", "--child"]
+    commands = {
+        "import_aws_cdk": (child + ["import:aws_cdk"], PROJECT_ROOT),
+        "import_cdk_stacks": (child + ["import:cdk.stacks"], PROJECT_ROOT),
+        "import_StorageStack": (
+            child + ["import:cdk.stacks:StorageStack"],
+            PROJECT_ROOT,
+        ),
+    }
+    for stack_name in STACKS:
+        commands[f"construct_{stack_name}"] = (
+            child + [f"construct:{stack_name}"],
+            PROJECT_ROOT,
+        )
+    commands["app_synth"] = ([sys.executable, "app.py"], CDK_DIR)
+    return commands
+
+
+def summarize(samples: list[dict[str, float]]) -> dict[str, float]:
+    """Median time and worst-case RSS over repeated samples."""
+    return {
+        "seconds": round(statistics.median(s["seconds"] for s in samples), 4),
+        "peak_rss_mb": max(s["peak_rss_mb"] for s in samples),
+    }
+
+
+def run_benchmarks(repeat: int, only: list[str] | None = None) -> dict[str, dict]:
+    results = {}
+    with tempfile.TemporaryDirectory() as outdir:
+        env = _child_env(CDK_OUTDIR=outdir)
+        for metric, (cmd, cwd) in benchmark_commands().items():
+            if only and metric not in only:
+                continue
+            samples = [run_measured(cmd, cwd, env) for _ in range(repeat)]
+            results[metric] = summarize(samples)
+            print(
+                f"{metric:<28} {results[metric]['seconds']:>8.3f}s "
+                f"{results[metric]['peak_rss_mb']:>8.1f} MB largest-process RSS",
+                flush=True,
+            )
+    return results
+
+
+def load_history(path: Path) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def append_history(path: Path, entry: dict[str, Any]) -> None:
+    history = load_history(path)
+    history.append(entry)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(history, f, indent=2)
+        f.write("\n")
+
+
+def find_regressions(
+    current: dict[str, dict[str, float]],
+    history: list[dict[str, Any]],
+    time_threshold: float,
+    rss_threshold: float,
+    window: int = 5,
+) -> list[str]:
+    """Compare ``current`` metrics against the median of the last ``window`` runs.
+
+    Thresholds are fractions, e.g. 0.2 fails a metric that is more than 20%
+    slower (or larger) than its baseline. Metrics without history pass.
+    """
+    regressions = []
+    recent = history[-window:]
+    for metric, values in current.items():
+        for key, threshold, unit in (
+            ("seconds", time_threshold, "s"),
+            ("peak_rss_mb", rss_threshold, " MB"),
+        ):
+            past = [
+                run["metrics"][metric][key]
+                for run in recent
+                if key in run.get("metrics", {}).get(metric, {})
+            ]
+            if not past:
+                continue
+            baseline = statistics.median(past)
+            limit = baseline * (1 + threshold)
+            if values[key] > limit:
+                regressions.append(
+                    f"{metric} {key}: {values[key]}{unit} exceeds baseline "
+                    f"{baseline}{unit} by more than {threshold:.0%}"
+                )
+    return regressions
+
+
+def _git_sha() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per metric")
+    parser.add_argument(
+        "--only", nargs="+", help="restrict to these metrics (e.g. app_synth)"
+    )
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument(
+        "--window", type=int, default=5, help="history runs used as the baseline"
+    )
+    parser.add_argument(
+        "--time-threshold",
+        type=float,
+        default=float(os.getenv("SYNTH_BENCH_TIME_THRESHOLD", "0.20")),
+        help="allowed fractional slowdown before failing (default 0.20)",
+    )
+    parser.add_argument(
+        "--rss-threshold",
+        type=float,
+        default=float(os.getenv("SYNTH_BENCH_RSS_THRESHOLD", "0.15")),
+        help="allowed fractional growth of the largest single-process peak RSS "
+        "before failing (default 0.15)",
+    )
+    parser.add_argument(
+        "--no-record", action="store_true", help="do not append to the history"
+    )
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _run_child_mode(args.child)
+        return 0
+
+    current = run_benchmarks(args.repeat, args.only)
+    history = load_history(args.history)
+    regressions = find_regressions(
+        current, history, args.time_threshold, args.rss_threshold, args.window
+    )
+    if regressions:
+        print("Synth benchmark regressions:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        # Regressed runs are not recorded so they don't drag the baseline up
+        return 1
+
+    if not args.no_record:
+        append_history(
+            args.history,
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "git_sha": _git_sha(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "metrics": current,
+            },
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Dependency-aware parallel deployment of the CDK stacks.
+
+Synthesizes the app once, derives the stack dependency graph from the cloud
+assembly and deploys every stack as soon as its dependencies are up, with at
+most ``--concurrency`` CloudFormation deployments in flight. Independent
+stacks (e.g. DatabaseStack and ComputeStack after NetworkStack) no longer
+wait for each other.
+
+Stacks whose normalized template, assets and settings match the last
+successful deployment (see scripts/template_hash.py) are skipped; a
+structural diff is printed for the ones that changed.
+
+Usage (from the repository root):
+    python -m scripts.deploy                    # deploy every stack
+    python -m scripts.deploy --dry-run          # print the plan only
+    python -m scripts.deploy --stacks DatabaseStack --concurrency 2
+    python -m scripts.deploy --force            # ignore the deploy snapshot
+"""
+
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from scripts.stack_graph import (
+    LinePrinter,
+    StackGraph,
+    StackResult,
+    load_stack_graph,
+    run_graph,
+    select,
+    waves,
+)
+from scripts.template_hash import (
+    StackChange,
+    detect_changes,
+    fingerprint_assembly,
+    load_snapshot,
+    save_snapshot,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CDK_DIR = PROJECT_ROOT / "cdk"
+ASSEMBLY_DIR = "cdk.out"
+SNAPSHOT_FILE = ".deploy-snapshot.json"
+
+
+def log_deployment(stack: str, status: str) -> None:
+    print(
+        f"{datetime.now().isoformat(timespec='seconds')}: {stack} deployment {status}"
+    )
+
+
+def cdk_command(cdk: str, *args: str) -> list[str]:
+    return shlex.split(cdk) + list(args)
+
+
+def synth(cdk: str, context: list[str], cwd: Path = CDK_DIR) -> None:
+    context_args = [arg for item in context for arg in ("-c", item)]
+    subprocess.run(
+        cdk_command(cdk, "synth", "--quiet", "--output", ASSEMBLY_DIR, *context_args),
+        cwd=cwd,
+        check=True,
+    )
+
+
+def stream(cmd: list[str], stack: str, printer: LinePrinter, cwd: Path) -> None:
+    """Run ``cmd``, prefixing each output line with the stack name."""
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    ) as proc:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            printer(stack, line.rstrip())
+    if proc.returncode != 0:
+        raise RuntimeError(f"{cmd[0]} exited with status {proc.returncode}")
+
+
+def deploy_args(stack: str) -> list[str]:
+    # Deploy from the already synthesized assembly: no re-synth per stack and
+    # no implicit deployment of dependencies (the scheduler orders those).
+    return [
+        "deploy",
+        stack,
+        "--app",
+        ASSEMBLY_DIR,
+        "--exclusively",
+        "--require-approval",
+        "never",
+    ]
+
+
+def print_plan(graph: StackGraph, cdk: str, concurrency: int) -> None:
+    print(f"Deployment plan ({len(graph)} stacks, concurrency {concurrency}):")
+    for i, wave in enumerate(waves(graph), start=1):
+        print(f"  Wave {i}: {', '.join(wave)}")
+    for stack, deps in graph.items():
+        after = f" (after {', '.join(deps)})" if deps else ""
+        print(f"  {shlex.join(cdk_command(cdk, *deploy_args(stack)))}{after}")
+
+
+def print_changes(changes: dict[str, StackChange]) -> None:
+    print("Changes since last deployment:")
+    for change in changes.values():
+        print(f"  {change.stack}: {change.status}")
+        for line in change.diff:
+            print(f"      {line}")
+
+
+def pending_graph(graph: StackGraph, changes: dict[str, StackChange]) -> StackGraph:
+    """Drop unchanged stacks; they are already deployed, so satisfy dependents."""
+    return {
+        name: [dep for dep in deps if changes[dep].changed]
+        for name, deps in graph.items()
+        if changes[name].changed
+    }
+
+
+def print_summary(results: dict[str, StackResult], elapsed: float) -> None:
+    print("\nStack                 Status       Duration")
+    for result in results.values():
+        print(f"{result.stack:<21} {result.status:<12} {result.seconds:>7.1f}s")
+    print(f"Total wall time: {elapsed:.1f}s")
+
+
+def parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--stacks", nargs="+", help="deploy only these stacks (plus dependencies)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("DEPLOY_CONCURRENCY", "4")),
+        help="maximum stacks deploying at once (default 4)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        "--plan",
+        action="store_true",
+        dest="dry_run",
+        help="synthesize and print the deployment plan without deploying",
+    )
+    parser.add_argument(
+        "--skip-synth",
+        action="store_true",
+        help=f"reuse the existing cdk/{ASSEMBLY_DIR} instead of synthesizing",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="deploy every selected stack, even if unchanged since last deploy",
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        default=os.getenv("DEPLOY_SNAPSHOT"),
+        help=f"fingerprints of deployed stacks (default: cdk/{SNAPSHOT_FILE})",
+    )
+    parser.add_argument(
+        "-c",
+        "--context",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="CDK context passed to synth (repeatable)",
+    )
+    parser.add_argument(
+        "--cdk",
+        default=os.getenv("CDK_BIN", "cdk"),
+        help="cdk executable, e.g. 'npx cdk' (default: $CDK_BIN or cdk)",
+    )
+    parser.add_argument("--app-dir", type=Path, default=CDK_DIR, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    if not args.skip_synth:
+        print("Synthesizing CloudFormation templates...")
+        try:
+            synth(args.cdk, args.context, args.app_dir)
+        except subprocess.CalledProcessError:
+            log_deployment("Synth", "failed")
+            return 1
+        log_deployment("Synth", "succeeded")
+
+    assembly_dir = args.app_dir / ASSEMBLY_DIR
+    snapshot_file = args.snapshot or args.app_dir / SNAPSHOT_FILE
+    graph = select(load_stack_graph(assembly_dir), args.stacks)
+    fingerprints = fingerprint_assembly(assembly_dir)
+    snapshot = load_snapshot(snapshot_file)
+    changes = {
+        name: change
+        for name, change in detect_changes(
+            fingerprints, {} if args.force else snapshot
+        ).items()
+        if name in graph
+    }
+    print_changes(changes)
+    pending = pending_graph(graph, changes)
+    print_plan(pending, args.cdk, args.concurrency)
+    if args.dry_run:
+        return 0
+
+    def record(stack: str, status: str) -> None:
+        log_deployment(stack, status)
+        if status == "succeeded":
+            snapshot[stack] = fingerprints[stack].to_snapshot()
+
+    printer = LinePrinter()
+    start = time.perf_counter()
+    results = run_graph(
+        pending,
+        lambda stack: stream(
+            cdk_command(args.cdk, *deploy_args(stack)), stack, printer, args.app_dir
+        ),
+        max_workers=args.concurrency,
+        on_status=record,
+    )
+    save_snapshot(snapshot_file, snapshot)
+    results = {
+        name: results.get(name, StackResult(name, "unchanged")) for name in graph
+    }
+    print_summary(results, time.perf_counter() - start)
+
+    if all(result.ok for result in results.values()):
+        log_deployment("AllStacks", "completed successfully")
+        return 0
+    log_deployment("AllStacks", "failed")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
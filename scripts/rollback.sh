@@ -2,28 +2,20 @@
 
 # Rollback script for AWS Hackathon Infrastructure
 # Destroys CDK stacks from AWS
+#
+# Stacks are destroyed by scripts/teardown.py in reverse dependency order,
+# with stacks that nothing else imports from destroyed concurrently.
+# Arguments are passed through, e.g.:
+#   scripts/rollback.sh --dry-run
+#   scripts/rollback.sh --stacks StorageStack
 
 set -e
 
 echo "Starting rollback of AWS Hackathon Infrastructure..."
 
-# Change to CDK directory
-cd cdk
+# Run from the repository root so scripts.teardown is importable
+cd "$(dirname "$0")/.."
 
-# Destroy stacks in reverse order
-echo "Destroying MonitoringStack..."
-cdk destroy MonitoringStack --force
+python -m scripts.teardown "$@"
 
-echo "Destroying StorageStack..."
-cdk destroy StorageStack --force
-
-echo "Destroying ComputeStack..."
-cdk destroy ComputeStack --force
-
-echo "Destroying DatabaseStack..."
-cdk destroy DatabaseStack --force
-
-echo "Destroying NetworkStack..."
-cdk destroy NetworkStack --force
-
-echo "Rollback completed successfully!"
\ No newline at end of file
+echo "Rollback completed successfully!"
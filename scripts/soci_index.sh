@@ -0,0 +1,47 @@
+#!/bin/bash
+
+# SOCI index script for AWS Hackathon Infrastructure
+# Builds a Seekable OCI (SOCI) index for an image in one of the StorageStack
+# ECR repositories (bidopsai/app, bidopsai/agent) and pushes it next to the
+# image.
+#
+# When an image has a SOCI index in the same repository, Fargate lazily loads
+# its layers and starts the container before the whole image is downloaded.
+# Nothing changes in the task definition; the index is found by image digest.
+# Indexes only help for large images (the soci CLI skips layers under 10 MiB).
+#
+# Requires the soci CLI and nerdctl with containerd (run as root), plus AWS
+# credentials that can push to the repository. Usage:
+#   scripts/soci_index.sh bidopsai/agent v1.4.2
+
+set -eo pipefail
+
+if [ $# -ne 2 ]; then
+    echo "Usage: $0 <repository> <tag>" >&2
+    exit 1
+fi
+
+REPOSITORY="$1"
+TAG="$2"
+AWS_REGION="${AWS_REGION:-us-east-1}"
+ACCOUNT_ID="$(aws sts get-caller-identity --query Account --output text)"
+REGISTRY="${ACCOUNT_ID}.dkr.ecr.${AWS_REGION}.amazonaws.com"
+IMAGE="${REGISTRY}/${REPOSITORY}:${TAG}"
+
+echo "Creating SOCI index for ${IMAGE}..."
+
+# The token only ever goes through a pipe, never onto a command line where
+# ps or /proc/<pid>/cmdline would show it. nerdctl stores it in the docker
+# config (~/.docker/config.json), which soci push reads as well.
+aws ecr get-login-password --region "$AWS_REGION" |
+    nerdctl login --username AWS --password-stdin "$REGISTRY"
+
+# soci indexes the image from the containerd content store. Set
+# PLATFORM=linux/arm64 for images run with -c cpu_architecture=ARM64.
+nerdctl pull --quiet --platform "${PLATFORM:-linux/amd64}" "$IMAGE"
+soci create --platform "${PLATFORM:-linux/amd64}" "$IMAGE"
+# The index is pushed as an OCI referrer of the image manifest, by digest, so
+# it works with the repositories' immutable tags
+soci push --quiet --platform "${PLATFORM:-linux/amd64}" "$IMAGE"
+
+echo "SOCI index pushed for ${IMAGE}"
@@ -0,0 +1,190 @@
+"""Stack dependency graph of the synthesized CDK app and a DAG scheduler.
+
+The graph is read from the cloud assembly (``cdk.out/manifest.json``) that
+``cdk synth`` writes, so it reflects both the explicit ``add_dependency``
+calls and the cross-stack references CDK infers from constructor wiring.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+STACK_ARTIFACT_TYPE = "aws:cloudformation:stack"
+
+# Stack name -> names of the stacks it depends on
+StackGraph = dict[str, list[str]]
+
+
+@dataclass
+class StackResult:
+    stack: str
+    status: str  # "succeeded", "failed", "skipped" or "unchanged"
+    seconds: float = 0.0
+    detail: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("succeeded", "unchanged")
+
+
+def load_stack_graph(assembly_dir: str | Path) -> StackGraph:
+    """Read stack dependencies from a cloud assembly manifest.
+
+    Non-stack artifacts (asset manifests, the construct tree) are dropped,
+    both as nodes and as dependencies.
+    """
+    with open(Path(assembly_dir) / "manifest.json") as f:
+        artifacts = json.load(f).get("artifacts", {})
+    stacks = {
+        name
+        for name, artifact in artifacts.items()
+        if artifact.get("type") == STACK_ARTIFACT_TYPE
+    }
+    graph = {
+        name: [dep for dep in artifacts[name].get("dependencies", []) if dep in stacks]
+        for name in artifacts
+        if name in stacks
+    }
+    return order_graph(graph)
+
+
+def order_graph(graph: StackGraph) -> StackGraph:
+    """Return ``graph`` with keys in a stable dependency-first order.
+
+    Raises ValueError on unknown dependencies or cycles.
+    """
+    ordered: StackGraph = {}
+    for wave in waves(graph):
+        for name in wave:
+            ordered[name] = list(graph[name])
+    return ordered
+
+
+def waves(graph: StackGraph) -> list[list[str]]:
+    """Group stacks into waves; every stack's dependencies are in earlier waves."""
+    for name, deps in graph.items():
+        unknown = [dep for dep in deps if dep not in graph]
+        if unknown:
+            raise ValueError(f"{name} depends on unknown stacks: {unknown}")
+
+    done: set[str] = set()
+    result = []
+    while len(done) < len(graph):
+        wave = sorted(
+            name
+            for name, deps in graph.items()
+            if name not in done and all(dep in done for dep in deps)
+        )
+        if not wave:
+            cycle = sorted(set(graph) - done)
+            raise ValueError(f"Dependency cycle between stacks: {cycle}")
+        result.append(wave)
+        done.update(wave)
+    return result
+
+
+def reverse_graph(graph: StackGraph) -> StackGraph:
+    """Map each stack to the stacks that depend on it.
+
+    Scheduling the reversed graph handles consumers before producers, which is
+    the order teardown needs: a stack's exports must be released before the
+    stack that owns them can be deleted.
+    """
+    reversed_graph: StackGraph = {name: [] for name in graph}
+    for name, deps in graph.items():
+        for dep in deps:
+            reversed_graph[dep].append(name)
+    return order_graph(reversed_graph)
+
+
+def select(graph: StackGraph, stacks: list[str] | None) -> StackGraph:
+    """Restrict ``graph`` to ``stacks`` plus their transitive dependencies."""
+    if not stacks:
+        return graph
+    unknown = [name for name in stacks if name not in graph]
+    if unknown:
+        raise ValueError(f"Unknown stacks {unknown}; app defines {list(graph)}")
+    required: set[str] = set()
+    pending = list(stacks)
+    while pending:
+        name = pending.pop()
+        if name not in required:
+            required.add(name)
+            pending.extend(graph[name])
+    return {name: deps for name, deps in graph.items() if name in required}
+
+
+def run_graph(
+    graph: StackGraph,
+    worker: Callable[[str], None],
+    max_workers: int = 4,
+    on_status: Callable[[str, str], None] | None = None,
+) -> dict[str, StackResult]:
+    """Run ``worker`` for every stack once its dependencies have succeeded.
+
+    Up to ``max_workers`` stacks run concurrently. A worker signals failure
+    by raising; stacks that depend on a failed stack are skipped, while
+    independent stacks keep going. ``on_status(stack, status)`` is called
+    with "started", "succeeded", "failed" and "skipped" as stacks progress.
+    """
+    order_graph(graph)  # validate before starting anything
+    notify = on_status or (lambda stack, status: None)
+    remaining = {name: list(deps) for name, deps in graph.items()}
+    results: dict[str, StackResult] = {}
+    running: dict[Future, str] = {}
+
+    def timed(name: str) -> StackResult:
+        start = time.perf_counter()
+        try:
+            worker(name)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return StackResult(name, "failed", time.perf_counter() - start, str(e))
+        return StackResult(name, "succeeded", time.perf_counter() - start)
+
+    max_workers = max(1, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while remaining or running:
+            for name in list(remaining):
+                if any(
+                    dep in results and not results[dep].ok for dep in remaining[name]
+                ):
+                    del remaining[name]
+                    results[name] = StackResult(
+                        name, "skipped", detail="dependency failed"
+                    )
+                    notify(name, "skipped")
+
+            ready = [
+                name
+                for name, deps in remaining.items()
+                if all(dep in results and results[dep].ok for dep in deps)
+            ]
+            for name in ready[: max_workers - len(running)]:
+                del remaining[name]
+                running[pool.submit(timed, name)] = name
+                notify(name, "started")
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results[running.pop(future)] = result
+                notify(result.stack, result.status)
+
+    return {name: results[name] for name in graph}
+
+
+class LinePrinter:
+    """Thread-safe printing of per-stack, prefixed output lines."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def __call__(self, stack: str, line: str) -> None:
+        with self._lock:
+            print(f"[{stack}] {line}", flush=True)
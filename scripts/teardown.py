@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Dependency-aware parallel teardown of the CDK stacks.
+
+Destroys stacks in reverse dependency order: a stack is destroyed only once
+every stack that consumes its exports is gone, so NetworkStack is never
+blocked by lingering imports. Stacks with no remaining consumers are
+destroyed concurrently, with at most ``--concurrency`` in flight.
+
+Usage (from the repository root):
+    python -m scripts.teardown --dry-run        # print the plan only
+    python -m scripts.teardown                  # destroy every stack
+    python -m scripts.teardown --stacks StorageStack
+"""
+
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from scripts.deploy import (
+    ASSEMBLY_DIR,
+    CDK_DIR,
+    cdk_command,
+    print_summary,
+    stream,
+    synth,
+)
+from scripts.stack_graph import (
+    LinePrinter,
+    StackGraph,
+    load_stack_graph,
+    reverse_graph,
+    run_graph,
+    select,
+    waves,
+)
+
+
+def log_teardown(stack: str, status: str) -> None:
+    print(f"{datetime.now().isoformat(timespec='seconds')}: {stack} destroy {status}")
+
+
+def destroy_args(stack: str) -> list[str]:
+    # --exclusively stops cdk from pulling in the stack's dependencies; the
+    # scheduler has already destroyed its dependents.
+    return ["destroy", stack, "--app", ASSEMBLY_DIR, "--exclusively", "--force"]
+
+
+def teardown_graph(graph: StackGraph, stacks: list[str] | None) -> StackGraph:
+    """Reverse ``graph`` and restrict it to ``stacks`` plus their dependents.
+
+    Destroying a stack requires destroying everything that imports from it
+    first, so selecting StorageStack also selects MonitoringStack.
+    """
+    return select(reverse_graph(graph), stacks)
+
+
+def print_plan(graph: StackGraph, cdk: str, concurrency: int) -> None:
+    print(f"Teardown plan ({len(graph)} stacks, concurrency {concurrency}):")
+    for i, wave in enumerate(waves(graph), start=1):
+        print(f"  Wave {i}: {', '.join(wave)}")
+    for stack, dependents in graph.items():
+        after = f" (after {', '.join(dependents)})" if dependents else ""
+        print(f"  {shlex.join(cdk_command(cdk, *destroy_args(stack)))}{after}")
+
+
+def parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--stacks", nargs="+", help="destroy only these stacks (plus dependents)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("DEPLOY_CONCURRENCY", "4")),
+        help="maximum stacks being destroyed at once (default 4)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        "--plan",
+        action="store_true",
+        dest="dry_run",
+        help="synthesize and print the teardown plan without destroying",
+    )
+    parser.add_argument(
+        "--skip-synth",
+        action="store_true",
+        help=f"reuse the existing cdk/{ASSEMBLY_DIR} instead of synthesizing",
+    )
+    parser.add_argument(
+        "-c",
+        "--context",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="CDK context passed to synth (repeatable)",
+    )
+    parser.add_argument(
+        "--cdk",
+        default=os.getenv("CDK_BIN", "cdk"),
+        help="cdk executable, e.g. 'npx cdk' (default: $CDK_BIN or cdk)",
+    )
+    parser.add_argument("--app-dir", type=Path, default=CDK_DIR, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    if not args.skip_synth:
+        print("Synthesizing CloudFormation templates...")
+        try:
+            synth(args.cdk, args.context, args.app_dir)
+        except subprocess.CalledProcessError:
+            log_teardown("Synth", "failed")
+            return 1
+
+    graph = teardown_graph(load_stack_graph(args.app_dir / ASSEMBLY_DIR), args.stacks)
+    print_plan(graph, args.cdk, args.concurrency)
+    if args.dry_run:
+        return 0
+
+    printer = LinePrinter()
+    start = time.perf_counter()
+    results = run_graph(
+        graph,
+        lambda stack: stream(
+            cdk_command(args.cdk, *destroy_args(stack)), stack, printer, args.app_dir
+        ),
+        max_workers=args.concurrency,
+        on_status=log_teardown,
+    )
+    print_summary(results, time.perf_counter() - start)
+
+    if all(result.ok for result in results.values()):
+        log_teardown("AllStacks", "completed successfully")
+        return 0
+    log_teardown("AllStacks", "failed")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
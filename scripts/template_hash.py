@@ -0,0 +1,228 @@
+"""Change detection for synthesized stacks.
+
+Each stack in the cloud assembly is reduced to a fingerprint: its template
+with synth-only noise removed, the hashes of the assets it publishes, and the
+stack-level settings from the manifest (environment, tags, termination
+protection). Fingerprints of successfully deployed stacks are kept in a
+snapshot file; a stack whose fingerprint matches the snapshot has nothing for
+CloudFormation to do and can be skipped.
+
+The snapshot only knows about deployments made through scripts/deploy.py from
+this checkout. Out-of-band changes (console edits, deploys from another
+machine) are not seen, so use ``--force`` after those.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+# Resource metadata that only records where a construct or asset lives in the
+# source tree; asset contents are covered by the asset hashes.
+VOLATILE_METADATA = ("aws:cdk:path", "aws:asset:path", "aws:asset:is-bundled")
+# Manifest stack properties that change what CloudFormation deploys
+STACK_PROPERTIES = ("stackName", "tags", "terminationProtection", "parameters")
+
+
+def normalize_template(template: dict[str, Any]) -> dict[str, Any]:
+    """Drop template content that never affects the deployed resources.
+
+    Removes the AWS::CDK::Metadata analytics resource (and its condition) and
+    per-resource source-path metadata.
+    """
+    normalized = json.loads(json.dumps(template))
+    resources = normalized.get("Resources", {})
+    for logical_id in [
+        logical_id
+        for logical_id, resource in resources.items()
+        if resource.get("Type") == "AWS::CDK::Metadata"
+    ]:
+        del resources[logical_id]
+    conditions = normalized.get("Conditions", {})
+    conditions.pop("CDKMetadataAvailable", None)
+    if "Conditions" in normalized and not conditions:
+        del normalized["Conditions"]
+
+    for resource in resources.values():
+        metadata = resource.get("Metadata")
+        if not metadata:
+            continue
+        for key in VOLATILE_METADATA:
+            metadata.pop(key, None)
+        if not metadata:
+            del resource["Metadata"]
+    return normalized
+
+
+@dataclass
+class StackFingerprint:
+    stack: str
+    environment: str
+    template: dict[str, Any]
+    assets: list[str] = field(default_factory=list)
+    properties: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def hash(self) -> str:
+        payload = json.dumps(
+            {
+                "environment": self.environment,
+                "template": self.template,
+                "assets": self.assets,
+                "properties": self.properties,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def to_snapshot(self) -> dict[str, Any]:
+        return {
+            "hash": self.hash,
+            "environment": self.environment,
+            "template": self.template,
+            "assets": self.assets,
+            "properties": self.properties,
+            "deployed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+
+def _asset_hashes(assembly_dir: Path, manifest_file: str, template_file: str) -> list:
+    """Hashes of the file and image assets a stack publishes.
+
+    The stack's own template is published as a file asset too; it is left out
+    because the normalized template is compared directly.
+    """
+    with open(assembly_dir / manifest_file) as f:
+        assets = json.load(f)
+    hashes = []
+    for kind in ("files", "dockerImages"):
+        for asset_hash, asset in assets.get(kind, {}).items():
+            if asset.get("source", {}).get("path") == template_file:
+                continue
+            hashes.append(asset_hash)
+    return sorted(hashes)
+
+
+def fingerprint_assembly(assembly_dir: str | Path) -> dict[str, StackFingerprint]:
+    """Fingerprint every stack in a cloud assembly."""
+    assembly_dir = Path(assembly_dir)
+    with open(assembly_dir / "manifest.json") as f:
+        artifacts = json.load(f).get("artifacts", {})
+
+    fingerprints = {}
+    for name, artifact in artifacts.items():
+        if artifact.get("type") != "aws:cloudformation:stack":
+            continue
+        properties = artifact.get("properties", {})
+        template_file = properties.get("templateFile", f"{name}.template.json")
+        with open(assembly_dir / template_file) as f:
+            template = normalize_template(json.load(f))
+
+        assets: list[str] = []
+        for dep in artifact.get("dependencies", []):
+            dep_artifact = artifacts.get(dep, {})
+            if dep_artifact.get("type") == "cdk:asset-manifest":
+                manifest_file = dep_artifact["properties"]["file"]
+                assets += _asset_hashes(assembly_dir, manifest_file, template_file)
+
+        fingerprints[name] = StackFingerprint(
+            stack=name,
+            environment=artifact.get("environment", ""),
+            template=template,
+            assets=sorted(assets),
+            properties={
+                key: properties[key] for key in STACK_PROPERTIES if key in properties
+            },
+        )
+    return fingerprints
+
+
+def load_snapshot(path: str | Path) -> dict[str, dict[str, Any]]:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f).get("stacks", {})
+
+
+def save_snapshot(path: str | Path, stacks: dict[str, dict[str, Any]]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"stacks": stacks}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _format(value: Any) -> str:
+    text = json.dumps(value, sort_keys=True)
+    return text if len(text) <= 80 else text[:77] + "..."
+
+
+def diff_values(old: Any, new: Any, path: str = "") -> list[str]:
+    """Structural diff of two JSON values as "+", "-" and "~" lines.
+
+    Objects are compared key by key; arrays of equal length element by
+    element. Anything else that differs is reported as a replaced value.
+    """
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        lines = []
+        for key in sorted(set(old) | set(new)):
+            child = f"{path}.{key}" if path else key
+            if key not in old:
+                lines.append(f"+ {child}: {_format(new[key])}")
+            elif key not in new:
+                lines.append(f"- {child}")
+            else:
+                lines += diff_values(old[key], new[key], child)
+        return lines
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        lines = []
+        for i, (old_item, new_item) in enumerate(zip(old, new)):
+            lines += diff_values(old_item, new_item, f"{path}[{i}]")
+        return lines
+    return [f"~ {path}: {_format(old)} -> {_format(new)}"]
+
+
+@dataclass
+class StackChange:
+    stack: str
+    status: str  # "new", "changed" or "unchanged"
+    diff: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return self.status != "unchanged"
+
+
+def detect_changes(
+    fingerprints: dict[str, StackFingerprint],
+    snapshot: dict[str, dict[str, Any]],
+) -> dict[str, StackChange]:
+    """Compare synthesized stacks with the last deployed snapshot."""
+    changes = {}
+    for name, fingerprint in fingerprints.items():
+        previous = snapshot.get(name)
+        if previous is None:
+            changes[name] = StackChange(name, "new")
+        elif previous.get("hash") == fingerprint.hash:
+            changes[name] = StackChange(name, "unchanged")
+        else:
+            diff = diff_values(previous.get("template", {}), fingerprint.template)
+            diff += diff_values(
+                {key: previous.get(key) for key in ("environment", "properties")},
+                {
+                    "environment": fingerprint.environment,
+                    "properties": fingerprint.properties,
+                },
+            )
+            old_assets = set(previous.get("assets", []))
+            new_assets = set(fingerprint.assets)
+            diff += [f"+ asset {h}" for h in sorted(new_assets - old_assets)]
+            diff += [f"- asset {h}" for h in sorted(old_assets - new_assets)]
+            changes[name] = StackChange(name, "changed", diff)
+    return changes
@@ -0,0 +1,75 @@
+"""A stand-in ``cdk`` executable for testing the deploy and teardown scripts.
+
+``synth`` writes a cloud assembly for ``APP_GRAPH`` (stacks listed in
+``STUB_CDK_CHANGED`` get a different template); ``deploy`` and
+``destroy`` append "start <stack>" / "end <stack>" lines to a log file so
+tests can check ordering and overlap. Set ``STUB_CDK_FAIL`` to a stack name
+to make that stack's deploy or destroy exit non-zero.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from cdk.config import STACK_DEPENDENCIES
+
+# The dependencies app.py wires up, which CDK records in the cloud assembly
+APP_GRAPH = {name: list(deps) for name, deps in STACK_DEPENDENCIES.items()}
+
+STUB_SOURCE = """#!{python}
+import json, os, sys, time
+from pathlib import Path
+
+graph = json.loads({graph!r})
+log = Path({log!r})
+if sys.argv[1] == "synth":
+    out = Path(sys.argv[sys.argv.index("--output") + 1])
+    out.mkdir(exist_ok=True)
+    artifacts = {{"Tree": {{"type": "cdk:tree"}}}}
+    changed = os.environ.get("STUB_CDK_CHANGED", "").split(",")
+    for name, deps in graph.items():
+        value = "2" if name in changed else "1"
+        template = {{
+            "Resources": {{
+                "Marker": {{
+                    "Type": "AWS::SSM::Parameter",
+                    "Properties": {{"Type": "String", "Value": value}},
+                }}
+            }}
+        }}
+        (out / f"{{name}}.template.json").write_text(json.dumps(template))
+        (out / f"{{name}}.assets.json").write_text(json.dumps({{"files": {{}}}}))
+        artifacts[name + ".assets"] = {{
+            "type": "cdk:asset-manifest",
+            "properties": {{"file": f"{{name}}.assets.json"}},
+        }}
+        artifacts[name] = {{
+            "type": "aws:cloudformation:stack",
+            "environment": "aws://123456789012/us-east-1",
+            "properties": {{"templateFile": f"{{name}}.template.json"}},
+            "dependencies": deps + [name + ".assets"],
+        }}
+    (out / "manifest.json").write_text(json.dumps({{"artifacts": artifacts}}))
+elif sys.argv[1] in ("deploy", "destroy"):
+    stack = sys.argv[2]
+    with open(log, "a") as f:
+        f.write(f"start {{stack}}\\n")
+    print(f"{{sys.argv[1]}}ing {{stack}}")
+    time.sleep(0.2)
+    with open(log, "a") as f:
+        f.write(f"end {{stack}}\\n")
+    sys.exit(1 if stack == os.environ.get("STUB_CDK_FAIL") else 0)
+"""
+
+
+def write_stub_cdk(
+    directory: Path, graph: dict[str, list[str]] = APP_GRAPH
+) -> tuple[Path, Path]:
+    """Write the stub executable into ``directory``; returns (cdk, log) paths."""
+    log = directory / "cdk-calls.log"
+    path = directory / "cdk"
+    path.write_text(
+        STUB_SOURCE.format(python=sys.executable, graph=json.dumps(graph), log=str(log))
+    )
+    path.chmod(0o755)
+    return path, log
@@ -6,8 +6,10 @@ from typing import Any
 import boto3
 import pytest
 import yaml
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from tests.stack_outputs import StackNotDeployedError, StackOutputsResolver
 
 PROJECT_ROOT = Path(__file__).parent.parent
 
@@ -27,9 +29,6 @@ def load_contract():
     return _load
 
 
-
-
-
 @pytest.fixture(scope="session")
 def aws_region() -> str:
     return os.getenv("AWS_REGION", "us-east-1")
@@ -40,101 +39,136 @@ def aws_profile() -> str:
     return os.getenv("AWS_PROFILE", "hackathon")
 
 
-@pytest.fixture
-def cloudformation_client(aws_region: str):
-    return boto3.client("cloudformation", region_name=aws_region)
+@pytest.fixture(scope="session")
+def aws_session(aws_region: str) -> boto3.session.Session:
+    return boto3.session.Session(region_name=aws_region)
 
 
-@pytest.fixture
-def ec2_client(aws_region: str):
-    return boto3.client("ec2", region_name=aws_region)
+@pytest.fixture(scope="session")
+def aws_client_factory(aws_session):
+    """Build each boto3 client once per session and share its connection pool."""
+    clients = {}
+    config = Config(max_pool_connections=25, retries={"mode": "adaptive"})
 
+    def _client(service_name: str):
+        if service_name not in clients:
+            clients[service_name] = aws_session.client(service_name, config=config)
+        return clients[service_name]
 
-@pytest.fixture
-def iam_client(aws_region: str):
-    return boto3.client("iam", region_name=aws_region)
+    return _client
 
 
-@pytest.fixture
-def opensearch_client(aws_region: str):
-    return boto3.client("opensearch", region_name=aws_region)
+@pytest.fixture(scope="session")
+def cloudformation_client(aws_client_factory):
+    return aws_client_factory("cloudformation")
 
 
-@pytest.fixture
-def rds_client(aws_region: str):
-    return boto3.client("rds", region_name=aws_region)
+@pytest.fixture(scope="session")
+def ec2_client(aws_client_factory):
+    return aws_client_factory("ec2")
 
 
-@pytest.fixture
-def s3_client(aws_region: str):
-    return boto3.client("s3", region_name=aws_region)
+@pytest.fixture(scope="session")
+def iam_client(aws_client_factory):
+    return aws_client_factory("iam")
 
 
-@pytest.fixture
-def ecr_client(aws_region: str):
-    return boto3.client("ecr", region_name=aws_region)
+@pytest.fixture(scope="session")
+def opensearch_client(aws_client_factory):
+    return aws_client_factory("opensearch")
 
 
-@pytest.fixture
-def elbv2_client(aws_region: str):
-    return boto3.client("elbv2", region_name=aws_region)
+@pytest.fixture(scope="session")
+def rds_client(aws_client_factory):
+    return aws_client_factory("rds")
 
 
-@pytest.fixture
-def bedrock_agent_client(aws_region: str):
-    return boto3.client("bedrock-agent", region_name=aws_region)
+@pytest.fixture(scope="session")
+def s3_client(aws_client_factory):
+    return aws_client_factory("s3")
 
 
-def get_stack_outputs(cloudformation_client, stack_name: str) -> dict[str, Any]:
-    try:
-        response = cloudformation_client.describe_stacks(StackName=stack_name)
-        stacks = response.get("Stacks", [])
-        if not stacks:
-            pytest.skip(f"{stack_name} not deployed - no stacks found")
+@pytest.fixture(scope="session")
+def ecr_client(aws_client_factory):
+    return aws_client_factory("ecr")
+
 
-        outputs = stacks[0].get("Outputs", [])
-        return {o["OutputKey"]: o["OutputValue"] for o in outputs}
+@pytest.fixture(scope="session")
+def elbv2_client(aws_client_factory):
+    return aws_client_factory("elbv2")
+
+
+@pytest.fixture(scope="session")
+def bedrock_agent_client(aws_client_factory):
+    return aws_client_factory("bedrock-agent")
+
+
+@pytest.fixture(scope="session")
+def stack_outputs_resolver(cloudformation_client) -> StackOutputsResolver:
+    """Resolve outputs for every stack in one pass, shared by the whole session.
+
+    CDK_OUTPUTS_FILE points at a `cdk deploy --outputs-file` JSON (default
+    cdk/cdk-outputs.json, used when present). STACK_OUTPUTS_CACHE_TTL enables
+    an on-disk cache of describe_stacks results for that many seconds.
+    """
+    return StackOutputsResolver(
+        cloudformation_client,
+        outputs_file=os.getenv(
+            "CDK_OUTPUTS_FILE", str(PROJECT_ROOT / "cdk" / "cdk-outputs.json")
+        ),
+        cache_file=PROJECT_ROOT / ".pytest_cache" / "stack-outputs.json",
+        cache_ttl=float(os.getenv("STACK_OUTPUTS_CACHE_TTL", "0")),
+    )
+
+
+def get_stack_outputs(
+    stack_outputs_resolver: StackOutputsResolver, stack_name: str
+) -> dict[str, Any]:
+    try:
+        return stack_outputs_resolver.get(stack_name)
+    except StackNotDeployedError as e:
+        pytest.skip(str(e))
     except ClientError as e:
         if e.response["Error"]["Code"] == "ValidationError":
             pytest.skip(f"{stack_name} not deployed - {e}")
         raise
 
 
-@pytest.fixture
-def network_stack_outputs(cloudformation_client):
-    return get_stack_outputs(cloudformation_client, "NetworkStack")
+@pytest.fixture(scope="session")
+def network_stack_outputs(stack_outputs_resolver):
+    return get_stack_outputs(stack_outputs_resolver, "NetworkStack")
 
 
-@pytest.fixture
-def stack_outputs(cloudformation_client):
+@pytest.fixture(scope="session")
+def stack_outputs(stack_outputs_resolver):
     """Dynamic fixture to get outputs from any stack"""
 
     def _get_outputs(stack_name: str) -> dict[str, Any]:
-        return get_stack_outputs(cloudformation_client, stack_name)
+        return get_stack_outputs(stack_outputs_resolver, stack_name)
 
     return _get_outputs
 
 
-@pytest.fixture
-def security_stack_outputs(cloudformation_client):
-    return get_stack_outputs(cloudformation_client, "SecurityStack")
+@pytest.fixture(scope="session")
+def security_stack_outputs(stack_outputs_resolver):
+    return get_stack_outputs(stack_outputs_resolver, "SecurityStack")
 
 
-@pytest.fixture
-def storage_stack_outputs(cloudformation_client):
-    return get_stack_outputs(cloudformation_client, "StorageStack")
+@pytest.fixture(scope="session")
+def storage_stack_outputs(stack_outputs_resolver):
+    return get_stack_outputs(stack_outputs_resolver, "StorageStack")
 
 
-@pytest.fixture
-def database_stack_outputs(cloudformation_client):
-    return get_stack_outputs(cloudformation_client, "DatabaseStack")
+@pytest.fixture(scope="session")
+def database_stack_outputs(stack_outputs_resolver):
+    return get_stack_outputs(stack_outputs_resolver, "DatabaseStack")
 
 
-@pytest.fixture
-def compute_stack_outputs(cloudformation_client):
-    return get_stack_outputs(cloudformation_client, "ComputeStack")
+@pytest.fixture(scope="session")
+def compute_stack_outputs(stack_outputs_resolver):
+    return get_stack_outputs(stack_outputs_resolver, "ComputeStack")
 
 
-@pytest.fixture
-def monitoring_stack_outputs(cloudformation_client):
-    return get_stack_outputs(cloudformation_client, "MonitoringStack")
+@pytest.fixture(scope="session")
+def monitoring_stack_outputs(stack_outputs_resolver):
+    return get_stack_outputs(stack_outputs_resolver, "MonitoringStack")
@@ -1,5 +1,5 @@
 def test_database_deployment_readiness(database_stack_outputs):
-    required_outputs = ["RdsEndpoint", "OpenSearchEndpoint"]
+    required_outputs = ["RdsEndpoint", "RdsReadOnlyEndpoint", "OpenSearchEndpoint"]
 
     for output_name in required_outputs:
         assert (
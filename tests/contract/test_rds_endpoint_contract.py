@@ -63,3 +63,50 @@ def test_rds_cluster_properties(database_stack_outputs, rds_client):
         cluster["StorageEncrypted"] is True
     ), "RDS cluster must have storage encryption enabled"
     assert cluster["MultiAZ"] is True, "RDS cluster must be Multi-AZ"
+
+
+def test_rds_read_only_endpoint_contract(database_stack_outputs):
+    assert (
+        "RdsReadOnlyEndpoint" in database_stack_outputs
+    ), "RdsReadOnlyEndpoint output not found in DatabaseStack"
+
+    endpoint = database_stack_outputs["RdsReadOnlyEndpoint"]
+    proxy_endpoint_pattern = re.compile(
+        r"^[a-z0-9-]+\.endpoint\.proxy-[a-z0-9]+\.[a-z0-9-]+\.rds\.amazonaws\.com$"
+    )
+    assert proxy_endpoint_pattern.match(
+        endpoint
+    ), f"RDS read-only endpoint {endpoint} does not match proxy endpoint format"
+    assert (
+        endpoint != database_stack_outputs["RdsEndpoint"]
+    ), "Read-only endpoint must differ from the read/write RdsEndpoint"
+
+
+def test_rds_read_only_endpoint_targets_readers(database_stack_outputs, rds_client):
+    endpoint_name = database_stack_outputs["RdsReadOnlyEndpoint"].split(".")[0]
+
+    try:
+        response = rds_client.describe_db_proxy_endpoints(
+            DBProxyEndpointName=endpoint_name
+        )
+    except rds_client.exceptions.DBProxyEndpointNotFoundFault:
+        import pytest
+
+        pytest.skip(f"RDS Proxy endpoint {endpoint_name} not found")
+
+    assert (
+        len(response["DBProxyEndpoints"]) == 1
+    ), f"RDS proxy endpoint {endpoint_name} not found"
+    proxy_endpoint = response["DBProxyEndpoints"][0]
+    assert (
+        proxy_endpoint["TargetRole"] == "READ_ONLY"
+    ), f"Proxy endpoint {endpoint_name} must target the readers"
+    assert (
+        proxy_endpoint["Status"] == "available"
+    ), f"Proxy endpoint {endpoint_name} not in available state"
+
+    rds_endpoint = database_stack_outputs["RdsEndpoint"]
+    if ".proxy-" in rds_endpoint:
+        assert (
+            proxy_endpoint["DBProxyName"] == rds_endpoint.split(".proxy-")[0]
+        ), "Read-only endpoint must belong to the proxy behind RdsEndpoint"
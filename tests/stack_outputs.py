@@ -0,0 +1,111 @@
+"""Session-level resolution of deployed CloudFormation stack outputs.
+
+Contract tests used to call ``describe_stacks`` once per stack per test.
+``StackOutputsResolver`` loads the outputs of every stack in one pass and
+serves all later lookups from memory. Sources, in priority order:
+
+1. A ``cdk deploy --outputs-file`` JSON file, when present
+2. An on-disk cache written by a previous run, when younger than the TTL
+3. One paginated ``describe_stacks`` call covering all stacks
+
+Each stack falls through the sources separately: an outputs file from a
+partial deploy answers for the stacks it lists, and the others come from
+the cache or CloudFormation. Each source is read at most once.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+
+class StackNotDeployedError(LookupError):
+    """Raised when outputs are requested for a stack that is not deployed."""
+
+
+class StackOutputsResolver:
+    def __init__(
+        self,
+        cloudformation_client: Any,
+        outputs_file: str | Path | None = None,
+        cache_file: str | Path | None = None,
+        cache_ttl: float = 0,
+    ) -> None:
+        self.cloudformation_client = cloudformation_client
+        self.outputs_file = Path(outputs_file) if outputs_file else None
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.cache_ttl = cache_ttl
+        # Source name -> outputs it provides, filled in as sources are read
+        self._sources: dict[str, dict[str, dict[str, str]]] = {}
+        # Source of the most recent successful lookup
+        self.source: str | None = None
+
+    def get(self, stack_name: str) -> dict[str, str]:
+        for source in ("outputs-file", "cache", "cloudformation"):
+            outputs = self._read_source(source)
+            if stack_name in outputs:
+                self.source = source
+                return outputs[stack_name]
+        raise StackNotDeployedError(f"{stack_name} not deployed - no stacks found")
+
+    def all(self) -> dict[str, dict[str, str]]:
+        fallback = self._read_source("cache") or self._read_source("cloudformation")
+        return {**fallback, **self._read_source("outputs-file")}
+
+    def _read_source(self, source: str) -> dict[str, dict[str, str]]:
+        if source not in self._sources:
+            self._sources[source] = self._load(source)
+        return self._sources[source]
+
+    def _load(self, source: str) -> dict[str, dict[str, str]]:
+        if source == "outputs-file":
+            if self.outputs_file is None or not self.outputs_file.exists():
+                return {}
+            with open(self.outputs_file) as f:
+                return json.load(f)
+        if source == "cache":
+            return self._read_cache() or {}
+        outputs = self._describe_all_stacks()
+        self._write_cache(outputs)
+        return outputs
+
+    def _describe_all_stacks(self) -> dict[str, dict[str, str]]:
+        outputs = {}
+        paginator = self.cloudformation_client.get_paginator("describe_stacks")
+        for page in paginator.paginate():
+            for stack in page.get("Stacks", []):
+                outputs[stack["StackName"]] = {
+                    o["OutputKey"]: o["OutputValue"] for o in stack.get("Outputs", [])
+                }
+        return outputs
+
+    def _cache_key(self) -> str:
+        return self.cloudformation_client.meta.region_name
+
+    def _read_cache(self) -> dict[str, dict[str, str]] | None:
+        if not self.cache_ttl or self.cache_file is None:
+            return None
+        try:
+            with open(self.cache_file) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("region") != self._cache_key():
+            return None
+        if time.time() - cached.get("fetched_at", 0) > self.cache_ttl:
+            return None
+        return cached.get("outputs")
+
+    def _write_cache(self, outputs: dict[str, dict[str, str]]) -> None:
+        if not self.cache_ttl or self.cache_file is None:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_file, "w") as f:
+            json.dump(
+                {
+                    "region": self._cache_key(),
+                    "fetched_at": time.time(),
+                    "outputs": outputs,
+                },
+                f,
+            )
@@ -0,0 +1,305 @@
+"""Pure-Python query layer over synthesized CloudFormation templates.
+
+``aws_cdk.assertions.Template`` answers every ``has_resource_properties`` /
+``resource_count_is`` call by crossing the jsii boundary into node and scanning
+the whole template. ``TemplateQuery`` parses the template JSON once, indexes it
+by resource type, logical id and output name, and evaluates the same assertion
+API in-process. ``Match`` mirrors the subset of ``aws_cdk.assertions.Match``
+used by the test suite.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+
+class Matcher:
+    """Base class for pattern matchers used inside property queries."""
+
+    name = "Matcher"
+
+    def test(self, actual: Any, path: str) -> list[str]:
+        raise NotImplementedError
+
+
+class _AnyValue(Matcher):
+    name = "anyValue"
+
+    def test(self, actual: Any, path: str) -> list[str]:
+        if actual is None:
+            return [f"{path}: expected any value, found nothing"]
+        return []
+
+
+class _Absent(Matcher):
+    name = "absent"
+
+    def test(self, actual: Any, path: str) -> list[str]:
+        if actual is not None:
+            return [f"{path}: expected absent, found {_short(actual)}"]
+        return []
+
+
+class _StringLikeRegexp(Matcher):
+    name = "stringLikeRegexp"
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = re.compile(pattern)
+
+    def test(self, actual: Any, path: str) -> list[str]:
+        if not isinstance(actual, str):
+            return [f"{path}: expected a string, found {_short(actual)}"]
+        if not self.pattern.search(actual):
+            return [f"{path}: {actual!r} does not match /{self.pattern.pattern}/"]
+        return []
+
+
+class _ObjectMatch(Matcher):
+    def __init__(self, pattern: dict, partial: bool) -> None:
+        self.pattern = pattern
+        self.partial = partial
+        self.name = "objectLike" if partial else "objectEquals"
+
+    def test(self, actual: Any, path: str) -> list[str]:
+        return _match_object(self.pattern, actual, path, self.partial)
+
+
+class _ArrayWith(Matcher):
+    name = "arrayWith"
+
+    def __init__(self, pattern: list) -> None:
+        self.pattern = pattern
+
+    def test(self, actual: Any, path: str) -> list[str]:
+        if not isinstance(actual, list):
+            return [f"{path}: expected an array, found {_short(actual)}"]
+        # Pattern elements must appear in order, not necessarily contiguously.
+        # Like CDK, plain elements match exactly; wrap them in
+        # Match.object_like() to match partially.
+        index = 0
+        for element in actual:
+            if index == len(self.pattern):
+                break
+            if not match(self.pattern[index], element, path, partial=False):
+                index += 1
+        if index < len(self.pattern):
+            return [
+                f"{path}: could not find element {index} "
+                f"{_short(self.pattern[index])} in array"
+            ]
+        return []
+
+
+class _Exact(Matcher):
+    name = "exact"
+
+    def __init__(self, pattern: Any) -> None:
+        self.pattern = pattern
+
+    def test(self, actual: Any, path: str) -> list[str]:
+        return match(self.pattern, actual, path, partial=False)
+
+
+class Match:
+    """Factory for matchers, named after ``aws_cdk.assertions.Match``."""
+
+    @staticmethod
+    def any_value() -> Matcher:
+        return _AnyValue()
+
+    @staticmethod
+    def absent() -> Matcher:
+        return _Absent()
+
+    @staticmethod
+    def string_like_regexp(pattern: str) -> Matcher:
+        return _StringLikeRegexp(pattern)
+
+    @staticmethod
+    def object_like(pattern: dict) -> Matcher:
+        return _ObjectMatch(pattern, partial=True)
+
+    @staticmethod
+    def object_equals(pattern: dict) -> Matcher:
+        return _ObjectMatch(pattern, partial=False)
+
+    @staticmethod
+    def array_with(pattern: list) -> Matcher:
+        return _ArrayWith(pattern)
+
+    @staticmethod
+    def exact(pattern: Any) -> Matcher:
+        return _Exact(pattern)
+
+
+def _short(value: Any, limit: int = 80) -> str:
+    text = json.dumps(value, default=str, sort_keys=True)
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _match_object(pattern: dict, actual: Any, path: str, partial: bool) -> list[str]:
+    if not isinstance(actual, dict):
+        return [f"{path}: expected an object, found {_short(actual)}"]
+    failures = []
+    for key, expected in pattern.items():
+        failures.extend(match(expected, actual.get(key), f"{path}/{key}", partial))
+    if not partial:
+        for key in actual.keys() - pattern.keys():
+            failures.append(f"{path}/{key}: unexpected key")
+    return failures
+
+
+def match(pattern: Any, actual: Any, path: str = "", partial: bool = True) -> list[str]:
+    """Match ``actual`` against ``pattern`` and return the list of failures.
+
+    Semantics follow the CDK assertions library: objects are matched
+    partially (deeply) when ``partial`` is set, arrays must match element by
+    element, and ``Matcher`` instances take over wherever they appear.
+    """
+    if isinstance(pattern, Matcher):
+        return pattern.test(actual, path or "/")
+    if actual is None:
+        return [f"{path or '/'}: missing, expected {_short(pattern)}"]
+    if isinstance(pattern, dict):
+        return _match_object(pattern, actual, path, partial)
+    if isinstance(pattern, list):
+        if not isinstance(actual, list):
+            return [f"{path}: expected an array, found {_short(actual)}"]
+        if len(pattern) != len(actual):
+            return [
+                f"{path}: expected array of length {len(pattern)}, "
+                f"found {len(actual)}"
+            ]
+        failures = []
+        for i, (expected, element) in enumerate(zip(pattern, actual)):
+            failures.extend(match(expected, element, f"{path}/{i}", partial))
+        return failures
+    # bool is an int subclass; CloudFormation treats them as distinct
+    if isinstance(pattern, bool) != isinstance(actual, bool) or pattern != actual:
+        return [f"{path or '/'}: expected {_short(pattern)}, found {_short(actual)}"]
+    return []
+
+
+class TemplateQuery:
+    """Indexed, in-process view of a synthesized CloudFormation template."""
+
+    def __init__(self, template: dict[str, Any]) -> None:
+        self.template = template
+        self.resources: dict[str, dict] = template.get("Resources", {})
+        self.outputs: dict[str, dict] = template.get("Outputs", {})
+        self.resources_by_type: dict[str, dict[str, dict]] = {}
+        for logical_id, resource in self.resources.items():
+            self.resources_by_type.setdefault(resource.get("Type"), {})[
+                logical_id
+            ] = resource
+
+    @classmethod
+    def from_template(cls, template: Any) -> "TemplateQuery":
+        """Build from an ``aws_cdk.assertions.Template`` (one jsii round trip)."""
+        return cls(template.to_json())
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "TemplateQuery":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_cloud_assembly(
+        cls, stack_name: str, assembly_dir: str | Path = "cdk/cdk.out"
+    ) -> "TemplateQuery":
+        """Load ``<stack_name>.template.json`` from a ``cdk synth`` output dir."""
+        return cls.from_file(Path(assembly_dir) / f"{stack_name}.template.json")
+
+    def to_json(self) -> dict[str, Any]:
+        return self.template
+
+    # Resources
+
+    def resource(self, logical_id: str) -> dict:
+        try:
+            return self.resources[logical_id]
+        except KeyError:
+            raise AssertionError(f"Template has no resource {logical_id!r}") from None
+
+    def find_resources(self, resource_type: str, props: Any = None) -> dict[str, dict]:
+        candidates = self.resources_by_type.get(resource_type, {})
+        if props is None:
+            return dict(candidates)
+        return {
+            logical_id: resource
+            for logical_id, resource in candidates.items()
+            if not match(props, resource)
+        }
+
+    def resource_count_is(self, resource_type: str, count: int) -> None:
+        actual = len(self.resources_by_type.get(resource_type, {}))
+        if actual != count:
+            raise AssertionError(
+                f"Expected {count} resources of type {resource_type} "
+                f"but found {actual}"
+            )
+
+    def resource_properties_count_is(
+        self, resource_type: str, props: Any, count: int
+    ) -> None:
+        actual = len(self.find_resources(resource_type, {"Properties": props}))
+        if actual != count:
+            raise AssertionError(
+                f"Expected {count} resources of type {resource_type} matching "
+                f"{_short(props)} but found {actual}"
+            )
+
+    def has_resource(self, resource_type: str, props: Any) -> None:
+        self._assert_any(
+            f"{resource_type} resources",
+            self.resources_by_type.get(resource_type, {}),
+            lambda resource: match(props, resource),
+        )
+
+    def has_resource_properties(self, resource_type: str, props: Any) -> None:
+        self._assert_any(
+            f"{resource_type} resources",
+            self.resources_by_type.get(resource_type, {}),
+            lambda resource: match(props, resource.get("Properties", {})),
+        )
+
+    # Outputs
+
+    def find_outputs(self, logical_id: str = "*", props: Any = None) -> dict[str, dict]:
+        if logical_id == "*":
+            candidates = self.outputs
+        elif logical_id in self.outputs:
+            candidates = {logical_id: self.outputs[logical_id]}
+        else:
+            candidates = {}
+        if props is None:
+            return dict(candidates)
+        return {
+            name: output
+            for name, output in candidates.items()
+            if not match(props, output)
+        }
+
+    def has_output(self, logical_id: str, props: Any) -> None:
+        if logical_id != "*" and logical_id not in self.outputs:
+            raise AssertionError(f"Template has no output named {logical_id!r}")
+        candidates = self.find_outputs(logical_id)
+        self._assert_any("outputs", candidates, lambda output: match(props, output))
+
+    def _assert_any(self, label: str, candidates: dict[str, dict], check) -> None:
+        if not candidates:
+            raise AssertionError(f"Template has no {label}")
+        closest: tuple[str, list[str]] | None = None
+        for logical_id, item in candidates.items():
+            failures = check(item)
+            if not failures:
+                return
+            if closest is None or len(failures) < len(closest[1]):
+                closest = (logical_id, failures)
+        assert closest is not None
+        details = "\n  ".join(closest[1])
+        raise AssertionError(
+            f"None of the {label} match; closest is {closest[0]} "
+            f"({len(candidates)} candidates):\n  {details}"
+        )
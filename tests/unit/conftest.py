@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from typing import Any
+
+import aws_cdk as cdk
+import pytest
+from aws_cdk.assertions import Template
+
+from cdk import config
+from tests.template_query import TemplateQuery
+
+
+@dataclass(frozen=True)
+class StackAttr:
+    """Reference to an attribute of a sibling stack built in the same app.
+
+    Used for constructor wiring that passes a construct rather than the whole
+    stack, e.g. ``logs_bucket=template_cache.ref(StorageStack, "logs_bucket")``.
+    """
+
+    stack_cls: type
+    attr: str
+
+
+def _freeze(value: Any) -> Any:
+    """Turn constructor kwargs/context into a hashable cache key component."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+class TemplateCache:
+    """Synthesize each distinct stack configuration once per test session.
+
+    A configuration is keyed by (stack class, constructor kwargs, context).
+    Templates are handed out as ``TemplateQuery`` objects so assertions run
+    in-process against the parsed JSON rather than through jsii.
+    Kwarg values that are stack classes (or StackAttr references) are built
+    in the same ``cdk.App`` with default arguments, mirroring the
+    ``network_stack=`` / ``logs_bucket=`` wiring used in app.py.
+    """
+
+    def __init__(self) -> None:
+        self._templates: dict[Any, TemplateQuery] = {}
+        self.synth_count = 0
+
+    @staticmethod
+    def ref(stack_cls: type, attr: str) -> StackAttr:
+        return StackAttr(stack_cls, attr)
+
+    def get(
+        self,
+        stack_cls: type,
+        *,
+        context: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> TemplateQuery:
+        key = (stack_cls, _freeze(kwargs), _freeze(context or {}))
+        if key not in self._templates:
+            self._templates[key] = self._synth(stack_cls, context, kwargs)
+        return self._templates[key]
+
+    def _synth(
+        self, stack_cls: type, context: dict[str, Any] | None, kwargs: dict
+    ) -> TemplateQuery:
+        # Templates only: skip asset bundling (pip/Docker) for every stack
+        app = cdk.App(context={"aws:cdk:bundling-stacks": [], **(context or {})})
+        siblings: dict[type, cdk.Stack] = {}
+
+        def sibling(cls: type) -> cdk.Stack:
+            if cls not in siblings:
+                siblings[cls] = cls(app, f"Test{cls.__name__}")
+            return siblings[cls]
+
+        resolved = {}
+        for name, value in kwargs.items():
+            if isinstance(value, StackAttr):
+                value = getattr(sibling(value.stack_cls), value.attr)
+            elif isinstance(value, type) and issubclass(value, cdk.Stack):
+                value = sibling(value)
+            resolved[name] = value
+
+        stack = stack_cls(app, f"Test{stack_cls.__name__}", **resolved)
+        self.synth_count += 1
+        return TemplateQuery.from_template(Template.from_stack(stack))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def pin_environment():
+    """Size stacks built without ``capacity=`` from the test profile.
+
+    Otherwise they follow the shell's ENVIRONMENT variable.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(config, "ENVIRONMENT", "test")
+        yield
+
+
+@pytest.fixture(scope="session")
+def template_cache() -> TemplateCache:
+    return TemplateCache()
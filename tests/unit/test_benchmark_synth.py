@@ -0,0 +1,73 @@
+from scripts.benchmark_synth import (
+    STACKS,
+    append_history,
+    benchmark_commands,
+    find_regressions,
+    load_history,
+    summarize,
+)
+
+
+def _run(seconds, rss=300.0):
+    return {"metrics": {"app_synth": {"seconds": seconds, "peak_rss_mb": rss}}}
+
+
+def test_benchmark_covers_every_stack_and_full_synth():
+    metrics = benchmark_commands()
+
+    assert "import_aws_cdk" in metrics
+    assert "app_synth" in metrics
+    for stack_name in STACKS:
+        assert f"construct_{stack_name}" in metrics
+
+
+def test_summarize_uses_median_time_and_max_rss():
+    samples = [
+        {"seconds": 3.0, "peak_rss_mb": 250.0},
+        {"seconds": 1.0, "peak_rss_mb": 300.0},
+        {"seconds": 2.0, "peak_rss_mb": 275.0},
+    ]
+
+    assert summarize(samples) == {"seconds": 2.0, "peak_rss_mb": 300.0}
+
+
+def test_find_regressions_passes_without_history():
+    assert find_regressions(_run(10.0)["metrics"], [], 0.2, 0.15) == []
+
+
+def test_find_regressions_flags_slow_synth():
+    history = [_run(8.0), _run(10.0), _run(9.0)]
+
+    assert find_regressions(_run(10.7)["metrics"], history, 0.2, 0.15) == []
+    regressions = find_regressions(_run(11.0)["metrics"], history, 0.2, 0.15)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("app_synth seconds")
+
+
+def test_find_regressions_flags_rss_growth():
+    history = [_run(9.0, rss=300.0)]
+
+    regressions = find_regressions(_run(9.0, rss=400.0)["metrics"], history, 0.2, 0.15)
+
+    assert len(regressions) == 1
+    assert "peak_rss_mb" in regressions[0]
+
+
+def test_find_regressions_only_uses_recent_window():
+    history = [_run(1.0)] * 5 + [_run(10.0)] * 3
+
+    assert find_regressions(_run(11.0)["metrics"], history, 0.2, 0.15, window=3) == []
+    assert find_regressions(_run(11.0)["metrics"], history, 0.2, 0.15, window=8)
+
+
+def test_history_round_trip(tmp_path):
+    path = tmp_path / "nested" / "history.json"
+
+    assert load_history(path) == []
+    append_history(path, _run(1.0))
+    append_history(path, _run(2.0))
+
+    assert [run["metrics"]["app_synth"]["seconds"] for run in load_history(path)] == [
+        1.0,
+        2.0,
+    ]
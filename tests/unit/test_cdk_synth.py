@@ -10,7 +10,8 @@ from cdk.stacks.monitoring_stack import MonitoringStack
 
 def test_synth_all_stacks():
     """Test that all CDK stacks can be synthesized without errors"""
-    app = cdk.App()
+    # Skip asset bundling (pip/Docker); only synthesis is under test
+    app = cdk.App(context={"aws:cdk:bundling-stacks": []})
 
     network_stack = NetworkStack(app, "TestNetworkStack")
     DatabaseStack(app, "TestDatabaseStack", network_stack=network_stack)
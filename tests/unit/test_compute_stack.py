@@ -1,14 +1,13 @@
-import aws_cdk as cdk
-from aws_cdk.assertions import Template
+import dataclasses
+
+from cdk.config import CAPACITY_PROFILES, ScalingWindow
 from cdk.stacks.compute_stack import ComputeStack
 from cdk.stacks.network_stack import NetworkStack
+from tests.template_query import Match
 
 
-def test_compute_stack_ecs_cluster_created():
-    app = cdk.App()
-    network_stack = NetworkStack(app, "TestNetworkStack")
-    stack = ComputeStack(app, "TestComputeStack", network_stack=network_stack)
-    template = Template.from_stack(stack)
+def test_compute_stack_ecs_cluster_created(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
 
     template.resource_count_is("AWS::ECS::Cluster", 1)
     template.has_resource_properties(
@@ -16,13 +15,11 @@ def test_compute_stack_ecs_cluster_created():
     )
 
 
-def test_compute_stack_task_definition_created():
-    app = cdk.App()
-    network_stack = NetworkStack(app, "TestNetworkStack")
-    stack = ComputeStack(app, "TestComputeStack", network_stack=network_stack)
-    template = Template.from_stack(stack)
+def test_compute_stack_task_definition_created(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
 
-    template.resource_count_is("AWS::ECS::TaskDefinition", 1)
+    # App and agent worker task definitions
+    template.resource_count_is("AWS::ECS::TaskDefinition", 2)
     template.has_resource_properties(
         "AWS::ECS::TaskDefinition",
         {
@@ -34,11 +31,8 @@ def test_compute_stack_task_definition_created():
     )
 
 
-def test_compute_stack_task_has_container():
-    app = cdk.App()
-    network_stack = NetworkStack(app, "TestNetworkStack")
-    stack = ComputeStack(app, "TestComputeStack", network_stack=network_stack)
-    template = Template.from_stack(stack)
+def test_compute_stack_task_has_container(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
 
     template.has_resource_properties(
         "AWS::ECS::TaskDefinition",
@@ -46,7 +40,18 @@ def test_compute_stack_task_has_container():
             "ContainerDefinitions": [
                 {
                     "Name": "AppContainer",
-                    "Image": "nginx:latest",
+                    "Image": {
+                        "Fn::Join": [
+                            "",
+                            Match.array_with(
+                                [
+                                    Match.string_like_regexp(
+                                        "/ecr-public/nginx/nginx:latest"
+                                    )
+                                ]
+                            ),
+                        ]
+                    },
                     "Cpu": 128,
                     "Memory": 256,
                     "Essential": True,
@@ -56,19 +61,576 @@ def test_compute_stack_task_has_container():
     )
 
 
-def test_compute_stack_outputs():
-    app = cdk.App()
-    network_stack = NetworkStack(app, "TestNetworkStack")
-    stack = ComputeStack(app, "TestComputeStack", network_stack=network_stack)
-    template = Template.from_stack(stack)
+def test_compute_stack_pull_through_cache(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::ECR::PullThroughCacheRule",
+        {"EcrRepositoryPrefix": "ecr-public", "UpstreamRegistryUrl": "public.ecr.aws"},
+    )
+    # The first pull creates the cache repository and imports the image
+    template.has_resource_properties(
+        "AWS::IAM::Policy",
+        {
+            "PolicyDocument": {
+                "Statement": Match.array_with(
+                    [
+                        Match.object_like(
+                            {
+                                "Action": [
+                                    "ecr:BatchImportUpstreamImage",
+                                    "ecr:CreateRepository",
+                                ],
+                                "Resource": {
+                                    "Fn::Join": [
+                                        "",
+                                        Match.array_with([":repository/ecr-public/*"]),
+                                    ]
+                                },
+                            }
+                        )
+                    ]
+                )
+            }
+        },
+    )
+    task_definitions = template.find_resources("AWS::ECS::TaskDefinition")
+    app_task = next(
+        resource
+        for resource in task_definitions.values()
+        if resource["Properties"]["ContainerDefinitions"][0]["Name"] == "AppContainer"
+    )
+    assert any("PullThroughCache" in dep for dep in app_task["DependsOn"])
+
+
+def test_compute_stack_container_insights_enhanced(template_cache):
+    template = template_cache.get(ComputeStack)
+
+    template.has_resource_properties(
+        "AWS::ECS::Cluster",
+        {"ClusterSettings": [{"Name": "containerInsights", "Value": "enhanced"}]},
+    )
+    # Fixed names let MonitoringStack build Container Insights widgets
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition", {"Family": "hackathon-app"}
+    )
+
+
+def test_compute_stack_service_names(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {"ServiceName": "hackathon-app"},
+    )
+    template.has_resource_properties(
+        "AWS::ECS::Service", {"ServiceName": "hackathon-agent-worker"}
+    )
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition", {"Family": "hackathon-agent-worker"}
+    )
+
+
+def test_compute_stack_outputs(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
 
     template.has_output("EcsClusterName", {"Export": {"Name": "EcsClusterName"}})
 
 
-def test_compute_stack_without_network_stack():
-    app = cdk.App()
-    stack = ComputeStack(app, "TestComputeStack")
-    template = Template.from_stack(stack)
+def test_compute_stack_without_network_stack(template_cache):
+    template = template_cache.get(ComputeStack)
 
     template.resource_count_is("AWS::EC2::VPC", 1)
     template.resource_count_is("AWS::ECS::Cluster", 1)
+    template.resource_count_is("AWS::ECS::Service", 0)
+
+
+def test_compute_stack_service_behind_alb(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
+
+    template.resource_count_is("AWS::ECS::Service", 2)
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {
+            "LaunchType": Match.absent(),
+            "DesiredCount": 1,
+            "LoadBalancers": [{"ContainerName": "AppContainer", "ContainerPort": 80}],
+            "NetworkConfiguration": {
+                "AwsvpcConfiguration": {"AssignPublicIp": "DISABLED"}
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::TargetGroup",
+        {"Port": 80, "Protocol": "HTTP", "TargetType": "ip"},
+    )
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::ListenerRule",
+        {
+            "Priority": 100,
+            "Conditions": [{"Field": "path-pattern"}],
+            "ListenerArn": {"Fn::ImportValue": Match.string_like_regexp("Listener")},
+        },
+    )
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroupIngress",
+        {
+            "FromPort": 80,
+            "SourceSecurityGroupId": {
+                "Fn::ImportValue": Match.string_like_regexp("AlbSecurityGroup")
+            },
+        },
+    )
+    template.has_output("EcsServiceName", {"Export": {"Name": "EcsServiceName"}})
+
+
+def test_compute_stack_fargate_spot_capacity_providers(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::ECS::ClusterCapacityProviderAssociations",
+        {"CapacityProviders": ["FARGATE", "FARGATE_SPOT"]},
+    )
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {
+            "CapacityProviderStrategy": [
+                {"CapacityProvider": "FARGATE", "Base": 1, "Weight": 0},
+                {"CapacityProvider": "FARGATE_SPOT", "Weight": 1},
+            ],
+            "NetworkConfiguration": {
+                "AwsvpcConfiguration": {
+                    "Subnets": [
+                        {"Fn::ImportValue": Match.string_like_regexp("PrivateApp")},
+                        {"Fn::ImportValue": Match.string_like_regexp("PrivateApp")},
+                    ]
+                }
+            },
+        },
+    )
+
+
+def test_compute_stack_service_autoscaling(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {
+            "MinCapacity": 1,
+            "MaxCapacity": 2,
+            "ScalableDimension": "ecs:service:DesiredCount",
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "TargetTrackingScalingPolicyConfiguration": {
+                "PredefinedMetricSpecification": {
+                    "PredefinedMetricType": "ALBRequestCountPerTarget"
+                },
+                "TargetValue": 500,
+            }
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "TargetTrackingScalingPolicyConfiguration": {
+                "PredefinedMetricSpecification": {
+                    "PredefinedMetricType": "ECSServiceAverageCPUUtilization"
+                },
+                "TargetValue": 60,
+            }
+        },
+    )
+
+
+def test_compute_stack_uses_capacity_profile(template_cache):
+    template = template_cache.get(
+        ComputeStack, network_stack=NetworkStack, capacity=CAPACITY_PROFILES["prod"]
+    )
+
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "Cpu": "1024",
+            "Memory": "2048",
+            "ContainerDefinitions": [{"Cpu": 1024, "Memory": 2048}],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {"MinCapacity": 2, "MaxCapacity": 10},
+    )
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {
+            "CapacityProviderStrategy": [
+                {"CapacityProvider": "FARGATE", "Base": 2, "Weight": 1},
+                {"CapacityProvider": "FARGATE_SPOT", "Weight": 1},
+            ]
+        },
+    )
+
+
+def test_compute_stack_runtime_platform(template_cache):
+    x86 = template_cache.get(ComputeStack, network_stack=NetworkStack)
+    arm64 = template_cache.get(
+        ComputeStack,
+        network_stack=NetworkStack,
+        capacity=CAPACITY_PROFILES["dev"].with_architecture("ARM64"),
+    )
+
+    x86.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "RuntimePlatform": {
+                "CpuArchitecture": "X86_64",
+                "OperatingSystemFamily": "LINUX",
+            }
+        },
+    )
+    arm64.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "RuntimePlatform": {
+                "CpuArchitecture": "ARM64",
+                "OperatingSystemFamily": "LINUX",
+            }
+        },
+    )
+
+
+def test_compute_stack_service_connect(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::ServiceDiscovery::HttpNamespace", {"Name": "hackathon.internal"}
+    )
+    template.has_resource_properties(
+        "AWS::ECS::Cluster",
+        {"ServiceConnectDefaults": {"Namespace": {"Fn::GetAtt": Match.any_value()}}},
+    )
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "ContainerDefinitions": [
+                {"PortMappings": [{"Name": "app", "AppProtocol": "http"}]}
+            ]
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {
+            "ServiceConnectConfiguration": {
+                "Enabled": True,
+                "Namespace": "hackathon.internal",
+                "Services": [
+                    {
+                        "PortName": "app",
+                        "ClientAliases": [{"DnsName": "app", "Port": 80}],
+                    }
+                ],
+                "LogConfiguration": {"LogDriver": "awslogs"},
+            }
+        },
+    )
+    template.has_output(
+        "ServiceConnectNamespaceArn", {"Export": {"Name": "ServiceConnectNamespaceArn"}}
+    )
+
+
+def test_compute_stack_service_connect_ingress_from_clients_only(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroupIngress",
+        {
+            "Description": "Allow Service Connect traffic from the agent workers",
+            "FromPort": 80,
+            "ToPort": 80,
+            "SourceSecurityGroupId": {
+                "Fn::GetAtt": [
+                    Match.string_like_regexp("AgentServiceSecurityGroup"),
+                    "GroupId",
+                ]
+            },
+        },
+    )
+    # Nothing else in the VPC may reach the app tasks
+    for group in template.find_resources("AWS::EC2::SecurityGroup").values():
+        for rule in group["Properties"].get("SecurityGroupIngress", []):
+            assert "CidrIp" not in rule, rule
+    assert not template.find_resources(
+        "AWS::EC2::SecurityGroupIngress", {"Properties": {"CidrIp": Match.any_value()}}
+    )
+
+
+def test_compute_stack_agent_job_queue(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
+
+    template.resource_count_is("AWS::SQS::Queue", 2)
+    template.has_resource_properties(
+        "AWS::SQS::Queue",
+        {
+            "QueueName": "hackathon-agent-jobs",
+            "VisibilityTimeout": 900,
+            "ReceiveMessageWaitTimeSeconds": 20,
+            "SqsManagedSseEnabled": True,
+            "RedrivePolicy": {
+                "deadLetterTargetArn": {"Fn::GetAtt": Match.any_value()},
+                "maxReceiveCount": 3,
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::SQS::Queue",
+        {"QueueName": "hackathon-agent-jobs-dlq", "MessageRetentionPeriod": 1209600},
+    )
+    template.has_output("AgentQueueUrl", {"Export": {"Name": "AgentQueueUrl"}})
+    template.has_output(
+        "AgentDeadLetterQueueUrl", {"Export": {"Name": "AgentDeadLetterQueueUrl"}}
+    )
+
+
+def test_compute_stack_agent_service_in_private_agent_subnets(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {
+            "LoadBalancers": Match.absent(),
+            "CapacityProviderStrategy": [
+                {"CapacityProvider": "FARGATE", "Base": 0, "Weight": 0},
+                {"CapacityProvider": "FARGATE_SPOT", "Weight": 1},
+            ],
+            "NetworkConfiguration": {
+                "AwsvpcConfiguration": {
+                    "AssignPublicIp": "DISABLED",
+                    "Subnets": [
+                        {"Fn::ImportValue": Match.string_like_regexp("PrivateAgent")},
+                        {"Fn::ImportValue": Match.string_like_regexp("PrivateAgent")},
+                    ],
+                }
+            },
+            # Service Connect client of the app service
+            "ServiceConnectConfiguration": {
+                "Enabled": True,
+                "Services": Match.absent(),
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "Cpu": "512",
+            "Memory": "1024",
+            "ContainerDefinitions": [
+                {
+                    "Name": "AgentContainer",
+                    "Image": {"Fn::Join": Match.any_value()},
+                    "Environment": [{"Name": "AGENT_QUEUE_URL"}],
+                    "StopTimeout": 120,
+                    "LogConfiguration": {"LogDriver": "awslogs"},
+                }
+            ],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::IAM::Policy",
+        {
+            "PolicyDocument": {
+                "Statement": Match.array_with(
+                    [
+                        Match.object_like(
+                            {
+                                "Action": [
+                                    "bedrock:InvokeModel",
+                                    "bedrock:InvokeModelWithResponseStream",
+                                ]
+                            }
+                        )
+                    ]
+                )
+            }
+        },
+    )
+    template.has_output("AgentServiceName", {"Export": {"Name": "AgentServiceName"}})
+
+
+def test_compute_stack_agent_image_tag(template_cache):
+    template = template_cache.get(
+        ComputeStack, network_stack=NetworkStack, agent_image_tag="v1.4.2"
+    )
+
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "ContainerDefinitions": [
+                {
+                    "Name": "AgentContainer",
+                    "Image": {
+                        "Fn::Join": [
+                            "",
+                            Match.array_with(["/bidopsai/agent:v1.4.2"]),
+                        ]
+                    },
+                }
+            ]
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {"ServiceName": "hackathon-agent-worker", "DesiredCount": 1},
+    )
+
+
+def test_compute_stack_agent_without_image_runs_no_tasks(template_cache):
+    template = template_cache.get(ComputeStack, network_stack=NetworkStack)
+
+    # A fresh environment has no agent image yet; zero tasks lets the stack
+    # stabilise instead of tripping the circuit breaker
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {"ServiceName": "hackathon-agent-worker", "DesiredCount": 0},
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {
+            "MinCapacity": 0,
+            "MaxCapacity": 0,
+            "ResourceId": {
+                "Fn::Join": [
+                    "",
+                    Match.array_with(
+                        [{"Fn::GetAtt": [Match.string_like_regexp("Agent"), "Name"]}]
+                    ),
+                ]
+            },
+        },
+    )
+
+
+def test_compute_stack_agent_scales_on_backlog_per_task(template_cache):
+    template = template_cache.get(
+        ComputeStack, network_stack=NetworkStack, agent_image_tag="v1.4.2"
+    )
+
+    template.has_resource_properties(
+        "AWS::ECS::Cluster",
+        {"ClusterSettings": [{"Name": "containerInsights", "Value": "enhanced"}]},
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {
+            "MinCapacity": 1,
+            "MaxCapacity": 4,
+            "ResourceId": {
+                "Fn::Join": [
+                    "",
+                    Match.array_with(
+                        [{"Fn::GetAtt": [Match.string_like_regexp("Agent"), "Name"]}]
+                    ),
+                ]
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "PolicyType": "TargetTrackingScaling",
+            "TargetTrackingScalingPolicyConfiguration": {
+                "TargetValue": 5,
+                "CustomizedMetricSpecification": {
+                    "Metrics": [
+                        {
+                            "Id": "visible",
+                            "MetricStat": {
+                                "Metric": {
+                                    "Namespace": "AWS/SQS",
+                                    "MetricName": "ApproximateNumberOfMessagesVisible",
+                                }
+                            },
+                            "ReturnData": False,
+                        },
+                        {
+                            "Id": "tasks",
+                            "MetricStat": {
+                                "Metric": {
+                                    "Namespace": "ECS/ContainerInsights",
+                                    "MetricName": "RunningTaskCount",
+                                }
+                            },
+                            "ReturnData": False,
+                        },
+                        {"Expression": "visible / tasks", "ReturnData": True},
+                    ]
+                },
+            },
+        },
+    )
+
+
+def test_compute_stack_agent_uses_capacity_profile(template_cache):
+    template = template_cache.get(
+        ComputeStack,
+        network_stack=NetworkStack,
+        capacity=CAPACITY_PROFILES["prod"],
+        agent_image_tag="v1.4.2",
+    )
+
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {"Cpu": "1024", "Memory": "4096"},
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {"MinCapacity": 2, "MaxCapacity": 20},
+    )
+    template.has_resource_properties(
+        "AWS::SQS::Queue",
+        {"QueueName": "hackathon-agent-jobs", "VisibilityTimeout": 1800},
+    )
+
+
+def test_compute_stack_scheduled_scaling_windows(template_cache):
+    profile = dataclasses.replace(
+        CAPACITY_PROFILES["staging"],
+        scaling_windows=(
+            ScalingWindow(
+                "deadline",
+                start="at(2026-11-20T15:30:00)",
+                end="at(2026-11-20T19:00:00)",
+                min_tasks=6,
+                max_tasks=12,
+            ),
+        ),
+    )
+    template = template_cache.get(
+        ComputeStack, network_stack=NetworkStack, capacity=profile
+    )
+
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {
+            "MinCapacity": 2,
+            "MaxCapacity": 4,
+            "ScheduledActions": [
+                {
+                    "ScheduledActionName": "deadline-start",
+                    "Schedule": "at(2026-11-20T15:30:00)",
+                    "ScalableTargetAction": {"MinCapacity": 6, "MaxCapacity": 12},
+                },
+                {
+                    "ScheduledActionName": "deadline-end",
+                    "Schedule": "at(2026-11-20T19:00:00)",
+                    "ScalableTargetAction": {"MinCapacity": 2, "MaxCapacity": 4},
+                },
+            ],
+        },
+    )
+    template.resource_properties_count_is(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {"ScheduledActions": Match.any_value()},
+        1,
+    )
@@ -0,0 +1,271 @@
+import dataclasses
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from cdk import config
+from cdk.config import (
+    CAPACITY_PROFILES,
+    STACK_DEPENDENCIES,
+    AgentWorkerCapacity,
+    AuroraCapacity,
+    FargateCapacity,
+    OpenSearchCapacity,
+    PostgresTuning,
+    ProxyCapacity,
+    CapacityProfile,
+    ScalingWindow,
+    VectorIndexTuning,
+    get_capacity_profile,
+    graviton_instance_type,
+    incomplete_stacks,
+    resolve_stack_selection,
+)
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def test_stack_dependencies_are_ordered():
+    seen = set()
+    for stack_name, dependencies in STACK_DEPENDENCIES.items():
+        assert set(dependencies) <= seen, f"{stack_name} listed before a dependency"
+        seen.add(stack_name)
+
+
+@pytest.mark.parametrize("selection", [None, "", "all", "ALL", " All ", "*", []])
+def test_resolve_stack_selection_defaults_to_all(selection):
+    assert resolve_stack_selection(selection) == list(STACK_DEPENDENCIES)
+
+
+def test_resolve_stack_selection_adds_dependencies():
+    assert resolve_stack_selection("Database") == ["NetworkStack", "DatabaseStack"]
+    assert resolve_stack_selection("monitoring") == [
+        "NetworkStack",
+        "StorageStack",
+        "MonitoringStack",
+    ]
+
+
+def test_resolve_stack_selection_accepts_names_and_lists():
+    assert resolve_stack_selection("ComputeStack, network") == [
+        "NetworkStack",
+        "ComputeStack",
+    ]
+    assert resolve_stack_selection(["Security", "Storage"]) == [
+        "NetworkStack",
+        "SecurityStack",
+        "StorageStack",
+    ]
+
+
+def test_incomplete_stacks():
+    assert incomplete_stacks(list(STACK_DEPENDENCIES)) == []
+    assert incomplete_stacks(resolve_stack_selection("Network,Compute")) == [
+        "NetworkStack"
+    ]
+    # Nothing else imports from StorageStack
+    assert incomplete_stacks(resolve_stack_selection("Monitoring")) == ["NetworkStack"]
+
+
+def test_resolve_stack_selection_rejects_unknown_stack():
+    with pytest.raises(ValueError, match="Unknown stack 'Agent'"):
+        resolve_stack_selection("Network,Agent")
+
+
+def test_capacity_profiles_cover_every_environment(monkeypatch):
+    assert set(CAPACITY_PROFILES) == {"dev", "test", "staging", "prod"}
+    assert get_capacity_profile("PROD") is CAPACITY_PROFILES["prod"]
+    monkeypatch.setattr(config, "ENVIRONMENT", "staging")
+    assert get_capacity_profile().name == "staging"
+    with pytest.raises(ValueError, match="Unknown capacity profile 'qa'"):
+        get_capacity_profile("qa")
+
+
+def test_capacity_profiles_are_immutable():
+    profile = get_capacity_profile("dev")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        profile.fargate.cpu = 4096
+    bigger = dataclasses.replace(profile, aurora=AuroraCapacity(max_acu=16))
+    assert bigger.aurora.max_acu == 16
+    assert profile.aurora.max_acu == 2
+
+
+@pytest.mark.parametrize(
+    "build",
+    [
+        lambda: FargateCapacity(cpu=256, memory_limit_mib=4096),
+        lambda: FargateCapacity(container_cpu=512),
+        lambda: FargateCapacity(min_tasks=3, desired_count=2),
+        lambda: FargateCapacity(on_demand_weight=0, spot_weight=0),
+        lambda: FargateCapacity(on_demand_base=-1),
+        lambda: AgentWorkerCapacity(cpu=512, memory_limit_mib=512),
+        lambda: AgentWorkerCapacity(min_tasks=0),
+        lambda: AgentWorkerCapacity(min_tasks=5, max_tasks=4),
+        lambda: AgentWorkerCapacity(visibility_timeout_minutes=721),
+        lambda: AgentWorkerCapacity(on_demand_weight=0, spot_weight=0),
+        lambda: ScalingWindow("peak", "cron(0 8 * * ?)", "cron(0 18 * * ? *)", 2, 4),
+        lambda: ScalingWindow("peak", "at(2026-11-20)", "cron(0 18 * * ? *)", 2, 4),
+        lambda: ScalingWindow("peak", "cron(0 8 * * ? *)", "cron(0 18 * * ? *)", 4, 2),
+        lambda: ScalingWindow(
+            "peak window", "at(2026-11-20T08:00:00)", "at(2026-11-20T18:00:00)", 2, 4
+        ),
+        lambda: CapacityProfile(
+            name="dev",
+            scaling_windows=(
+                ScalingWindow(
+                    "peak", "cron(0 8 * * ? *)", "cron(0 18 * * ? *)", 2, 4, 0
+                ),
+            ),
+        ),
+        lambda: ScalingWindow(
+            "peak", "at(2026-11-20T18:00:00)", "at(2026-11-20T08:00:00)", 2, 4
+        ),
+        lambda: CapacityProfile(
+            name="dev",
+            scaling_windows=(
+                ScalingWindow(
+                    "deadline",
+                    "at(2026-11-20T08:00:00)",
+                    "at(2026-11-20T18:00:00)",
+                    2,
+                    4,
+                ),
+                ScalingWindow(
+                    "judging",
+                    "at(2026-11-20T18:00:00)",
+                    "at(2026-11-21T12:00:00)",
+                    2,
+                    4,
+                ),
+            ),
+        ),
+        lambda: AuroraCapacity(min_acu=4, max_acu=2),
+        lambda: AuroraCapacity(max_acu=2.3),
+        lambda: AuroraCapacity(min_acu=0, max_acu=0.5),
+        lambda: AuroraCapacity(readers=1, failover_readers=2),
+        lambda: AuroraCapacity(min_acu=0, seconds_until_auto_pause=60),
+        lambda: AuroraCapacity(performance_insights_retention="MONTHS_24"),
+        lambda: AuroraCapacity(performance_insights_retention="7"),
+        lambda: AuroraCapacity(monitoring_interval_seconds=20),
+        lambda: AuroraCapacity(storage_type="gp3"),
+        lambda: AuroraCapacity(
+            storage_type="AURORA_IOPT1", optimized_reads_instance_type="r6g.xlarge"
+        ),
+        lambda: AuroraCapacity(optimized_reads_instance_type="r6gd.xlarge"),
+        lambda: AuroraCapacity(
+            min_acu=0,
+            storage_type="AURORA_IOPT1",
+            optimized_reads_instance_type="r6gd.xlarge",
+        ),
+        lambda: PostgresTuning(work_mem_mb=0),
+        lambda: PostgresTuning(statement_timeout_ms=-1),
+        lambda: VectorIndexTuning(embedding_dimensions=3072),
+        lambda: VectorIndexTuning(hnsw_m=1),
+        lambda: VectorIndexTuning(hnsw_m=32, hnsw_ef_construction=40),
+        lambda: VectorIndexTuning(index_type="diskann"),
+        lambda: VectorIndexTuning(index_type="ivfflat", ivfflat_lists=0),
+        lambda: ProxyCapacity(max_connections_percent=0),
+        lambda: ProxyCapacity(max_connections_percent=40),
+        lambda: OpenSearchCapacity(data_nodes=3),
+        lambda: OpenSearchCapacity(master_nodes=3),
+    ],
+)
+def test_capacity_profiles_reject_invalid_sizes(build):
+    with pytest.raises(ValueError):
+        build()
+
+
+@pytest.mark.parametrize(
+    "instance_type, expected",
+    [
+        ("t3.small.search", "t4g.small.search"),
+        ("r5.large.search", "r6g.large.search"),
+        ("m6i.xlarge.search", "m6g.xlarge.search"),
+        ("r6g.large.search", "r6g.large.search"),
+    ],
+)
+def test_graviton_instance_type(instance_type, expected):
+    assert graviton_instance_type(instance_type) == expected
+
+
+def test_capacity_profile_accepts_separate_one_off_windows():
+    profile = CapacityProfile(
+        name="dev",
+        scaling_windows=(
+            ScalingWindow(
+                "judging", "at(2026-11-21T09:00:00)", "at(2026-11-21T12:00:00)", 2, 4
+            ),
+            ScalingWindow(
+                "deadline", "at(2026-11-20T08:00:00)", "at(2026-11-20T18:00:00)", 2, 4
+            ),
+            # Recurring windows are not checked against one-off windows
+            ScalingWindow(
+                "weekday", "cron(0 8 ? * MON-FRI *)", "cron(0 18 ? * MON-FRI *)", 1, 2
+            ),
+        ),
+    )
+
+    assert [window.interval is None for window in profile.scaling_windows] == [
+        False,
+        False,
+        True,
+    ]
+
+
+def test_graviton_instance_type_rejects_unknown_family():
+    with pytest.raises(ValueError, match="No Graviton equivalent"):
+        graviton_instance_type("i3.large.search")
+
+
+def test_capacity_profile_with_arm64_architecture():
+    profile = get_capacity_profile("dev").with_architecture("arm64")
+
+    assert profile.arm64
+    assert profile.opensearch.data_node_instance_type == "t4g.small.search"
+    assert not get_capacity_profile("dev").arm64
+
+    prod = get_capacity_profile("prod").with_architecture("ARM64")
+    assert prod.opensearch.master_node_instance_type == "m6g.large.search"
+
+    with pytest.raises(ValueError, match="x86 instance types"):
+        CapacityProfile(name="bad", cpu_architecture="ARM64")
+    with pytest.raises(ValueError, match="Unknown CPU architecture"):
+        get_capacity_profile("dev").with_architecture("sparc")
+
+
+@pytest.mark.slow
+def test_app_synthesizes_only_selected_stacks(tmp_path):
+    env = dict(os.environ)
+    env.pop("CDK_DEFAULT_ACCOUNT", None)
+    env["CDK_OUTDIR"] = str(tmp_path)
+    env["CDK_CONTEXT_JSON"] = json.dumps({"stacks": "Database"})
+
+    subprocess.run(
+        [sys.executable, "app.py"], cwd=PROJECT_ROOT / "cdk", env=env, check=True
+    )
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    stacks = {
+        name
+        for name, artifact in manifest["artifacts"].items()
+        if artifact["type"] == "aws:cloudformation:stack"
+    }
+    assert stacks == {"NetworkStack", "DatabaseStack"}
+    # NetworkStack lacks the exports of the stacks left out
+    errors = [
+        entry["data"]
+        for entries in manifest["artifacts"]["NetworkStack"]["metadata"].values()
+        for entry in entries
+        if entry["type"] == "aws:cdk:error"
+    ]
+    assert len(errors) == 1 and "missing exports" in errors[0]
+    assert not any(
+        entry["type"] == "aws:cdk:error"
+        for entries in manifest["artifacts"]["DatabaseStack"]["metadata"].values()
+        for entry in entries
+    )
@@ -1,41 +1,39 @@
-import aws_cdk as cdk
-from aws_cdk.assertions import Template, Match
+import dataclasses
+
+from cdk.config import (
+    CAPACITY_PROFILES,
+    AuroraCapacity,
+    ProxyCapacity,
+    ScalingWindow,
+)
 from cdk.stacks.database_stack import DatabaseStack
 from cdk.stacks.network_stack import NetworkStack
+from tests.template_query import Match
 
 
-def test_database_stack_rds_cluster_created():
-    app = cdk.App()
-    network_stack = NetworkStack(app, "TestNetworkStack")
-    stack = DatabaseStack(app, "TestDatabaseStack", network_stack=network_stack)
-    template = Template.from_stack(stack)
+def test_database_stack_rds_cluster_created(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
 
     template.resource_count_is("AWS::RDS::DBCluster", 1)
     template.has_resource_properties(
         "AWS::RDS::DBCluster",
         {
             "Engine": "aurora-postgresql",
-            "EngineVersion": "15.4",
+            "EngineVersion": "15.7",
             "DatabaseName": "hackathon",
             "StorageEncrypted": True,
         },
     )
 
 
-def test_database_stack_rds_instances():
-    app = cdk.App()
-    network_stack = NetworkStack(app, "TestNetworkStack")
-    stack = DatabaseStack(app, "TestDatabaseStack", network_stack=network_stack)
-    template = Template.from_stack(stack)
+def test_database_stack_rds_instances(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
 
     template.resource_count_is("AWS::RDS::DBInstance", 2)
 
 
-def test_database_stack_rds_secret():
-    app = cdk.App()
-    network_stack = NetworkStack(app, "TestNetworkStack")
-    stack = DatabaseStack(app, "TestDatabaseStack", network_stack=network_stack)
-    template = Template.from_stack(stack)
+def test_database_stack_rds_secret(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
 
     template.resource_count_is("AWS::SecretsManager::Secret", 1)
     template.has_resource_properties(
@@ -44,20 +42,411 @@ def test_database_stack_rds_secret():
     )
 
 
-def test_database_stack_rds_proxy():
-    app = cdk.App()
-    network_stack = NetworkStack(app, "TestNetworkStack")
-    stack = DatabaseStack(app, "TestDatabaseStack", network_stack=network_stack)
-    template = Template.from_stack(stack)
+def test_database_stack_rds_proxy(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
 
     template.resource_count_is("AWS::RDS::DBProxy", 1)
 
 
-def test_database_stack_opensearch_domain():
-    app = cdk.App()
-    network_stack = NetworkStack(app, "TestNetworkStack")
-    stack = DatabaseStack(app, "TestDatabaseStack", network_stack=network_stack)
-    template = Template.from_stack(stack)
+def test_database_stack_cluster_parameter_group(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::RDS::DBClusterParameterGroup",
+        {
+            "Family": "aurora-postgresql15",
+            "Parameters": {
+                "shared_preload_libraries": "pg_stat_statements,auto_explain",
+                "pg_stat_statements.track": "all",
+                "track_io_timing": "1",
+                "random_page_cost": "1.1",
+                "statement_timeout": "60000",
+                "idle_in_transaction_session_timeout": "300000",
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBCluster",
+        {"DBClusterParameterGroupName": {"Ref": Match.any_value()}},
+    )
+
+
+def test_database_stack_instance_parameter_group(template_cache):
+    template = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=CAPACITY_PROFILES["prod"]
+    )
+
+    template.has_resource_properties(
+        "AWS::RDS::DBParameterGroup",
+        {
+            "Family": "aurora-postgresql15",
+            "Parameters": {
+                "work_mem": "16384",
+                "log_min_duration_statement": "500",
+                "auto_explain.log_min_duration": "500",
+                "auto_explain.log_format": "json",
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBClusterParameterGroup",
+        {"Parameters": {"statement_timeout": "30000"}},
+    )
+    # Writer and both readers share the instance parameter group
+    template.resource_properties_count_is(
+        "AWS::RDS::DBInstance",
+        {
+            "DBParameterGroupName": {
+                "Ref": Match.string_like_regexp("InstanceParameter")
+            }
+        },
+        3,
+    )
+
+
+def test_database_stack_rds_proxy_pool(template_cache):
+    default = template_cache.get(DatabaseStack, network_stack=NetworkStack)
+    prod = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=CAPACITY_PROFILES["prod"]
+    )
+
+    default.has_resource_properties(
+        "AWS::RDS::DBProxyTargetGroup",
+        {
+            "ConnectionPoolConfigurationInfo": {
+                "ConnectionBorrowTimeout": 30,
+                "MaxConnectionsPercent": 90,
+                "MaxIdleConnectionsPercent": 50,
+                "SessionPinningFilters": Match.absent(),
+            }
+        },
+    )
+    default.has_resource_properties("AWS::RDS::DBProxy", {"IdleClientTimeout": 1800})
+    prod.has_resource_properties(
+        "AWS::RDS::DBProxyTargetGroup",
+        {
+            "ConnectionPoolConfigurationInfo": {
+                "ConnectionBorrowTimeout": 10,
+                "MaxIdleConnectionsPercent": 75,
+            }
+        },
+    )
+
+
+def test_database_stack_rds_proxy_init_query(template_cache):
+    profile = dataclasses.replace(
+        CAPACITY_PROFILES["staging"],
+        proxy=ProxyCapacity(init_query="SET statement_timeout = '30s'"),
+    )
+    template = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=profile
+    )
+
+    template.has_resource_properties(
+        "AWS::RDS::DBProxyTargetGroup",
+        {
+            "ConnectionPoolConfigurationInfo": {
+                "SessionPinningFilters": Match.absent(),
+                "InitQuery": "SET statement_timeout = '30s'",
+            }
+        },
+    )
+
+
+def test_database_stack_rds_proxy_alarms(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "Namespace": "AWS/RDS",
+            "MetricName": "DatabaseConnectionsBorrowLatency",
+            "Dimensions": [{"Name": "ProxyName", "Value": {"Ref": Match.any_value()}}],
+            # 100 ms, in microseconds
+            "Threshold": 100000,
+            "ComparisonOperator": "GreaterThanThreshold",
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "Namespace": "AWS/RDS",
+            "MetricName": "DatabaseConnectionsCurrentlySessionPinned",
+            "Threshold": 10,
+        },
+    )
+
+
+def test_database_stack_rds_proxy_read_only_endpoint(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
+
+    template.resource_count_is("AWS::RDS::DBProxyEndpoint", 1)
+    template.has_resource_properties(
+        "AWS::RDS::DBProxyEndpoint",
+        {
+            "DBProxyEndpointName": "hackathon-proxy-read-only",
+            "DBProxyName": {"Ref": Match.string_like_regexp("RdsProxy")},
+            "TargetRole": "READ_ONLY",
+            "VpcSubnetIds": [Match.any_value(), Match.any_value()],
+        },
+    )
+    template.has_output(
+        "RdsReadOnlyEndpoint",
+        {
+            "Value": {"Fn::GetAtt": [Match.any_value(), "Endpoint"]},
+            "Export": {"Name": "RdsReadOnlyEndpoint"},
+        },
+    )
+
+
+def test_database_stack_no_read_only_endpoint_without_readers(template_cache):
+    profile = dataclasses.replace(
+        CAPACITY_PROFILES["staging"],
+        aurora=AuroraCapacity(min_acu=0.5, max_acu=8, readers=0, failover_readers=0),
+    )
+    template = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=profile
+    )
+
+    template.resource_count_is("AWS::RDS::DBProxyEndpoint", 0)
+    assert "RdsReadOnlyEndpoint" not in template.to_json().get("Outputs", {})
+
+
+def test_database_stack_performance_insights(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::KMS::Key",
+        {
+            "Description": "Encrypts Aurora Performance Insights data",
+            "EnableKeyRotation": True,
+        },
+    )
+    template.resource_properties_count_is(
+        "AWS::RDS::DBInstance",
+        {
+            "EnablePerformanceInsights": True,
+            "PerformanceInsightsRetentionPeriod": 7,
+            "PerformanceInsightsKMSKeyId": {
+                "Fn::GetAtt": [
+                    Match.string_like_regexp("PerformanceInsightsKey"),
+                    "Arn",
+                ]
+            },
+        },
+        2,
+    )
+
+
+def test_database_stack_enhanced_monitoring(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::IAM::Role",
+        {
+            "AssumeRolePolicyDocument": {
+                "Statement": [
+                    Match.object_like(
+                        {"Principal": {"Service": "monitoring.rds.amazonaws.com"}}
+                    )
+                ]
+            },
+            "ManagedPolicyArns": [
+                {
+                    "Fn::Join": [
+                        "",
+                        Match.array_with(
+                            [
+                                ":iam::aws:policy/service-role/"
+                                "AmazonRDSEnhancedMonitoringRole"
+                            ]
+                        ),
+                    ]
+                }
+            ],
+        },
+    )
+    template.resource_properties_count_is(
+        "AWS::RDS::DBInstance",
+        {
+            "MonitoringInterval": 60,
+            "MonitoringRoleArn": {
+                "Fn::GetAtt": [Match.string_like_regexp("RdsMonitoringRole"), "Arn"]
+            },
+        },
+        2,
+    )
+
+
+def test_database_stack_prod_monitoring_settings(template_cache):
+    template = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=CAPACITY_PROFILES["prod"]
+    )
+
+    template.resource_properties_count_is(
+        "AWS::RDS::DBInstance",
+        {"PerformanceInsightsRetentionPeriod": 31, "MonitoringInterval": 15},
+        3,
+    )
+
+
+def test_database_stack_enhanced_monitoring_disabled(template_cache):
+    profile = dataclasses.replace(
+        CAPACITY_PROFILES["staging"],
+        aurora=AuroraCapacity(monitoring_interval_seconds=0),
+    )
+    template = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=profile
+    )
+
+    template.resource_properties_count_is(
+        "AWS::RDS::DBInstance",
+        {"MonitoringInterval": Match.absent(), "MonitoringRoleArn": Match.absent()},
+        2,
+    )
+    assert not template.find_resources(
+        "AWS::IAM::Role",
+        {
+            "Properties": {
+                "AssumeRolePolicyDocument": {
+                    "Statement": [
+                        Match.object_like(
+                            {"Principal": {"Service": "monitoring.rds.amazonaws.com"}}
+                        )
+                    ]
+                }
+            }
+        },
+    )
+
+
+def test_database_stack_storage_type(template_cache):
+    staging = template_cache.get(
+        DatabaseStack,
+        network_stack=NetworkStack,
+        capacity=CAPACITY_PROFILES["staging"],
+    )
+    prod = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=CAPACITY_PROFILES["prod"]
+    )
+
+    staging.has_resource_properties("AWS::RDS::DBCluster", {"StorageType": "aurora"})
+    prod.has_resource_properties("AWS::RDS::DBCluster", {"StorageType": "aurora-iopt1"})
+
+
+def test_database_stack_optimized_reads_readers(template_cache):
+    profile = dataclasses.replace(
+        CAPACITY_PROFILES["staging"],
+        aurora=AuroraCapacity(
+            max_acu=8,
+            readers=2,
+            failover_readers=1,
+            storage_type="AURORA_IOPT1",
+            optimized_reads_instance_type="r6gd.xlarge",
+        ),
+    )
+    template = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=profile
+    )
+
+    template.has_resource_properties(
+        "AWS::RDS::DBCluster", {"StorageType": "aurora-iopt1"}
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBInstance", {"DBInstanceClass": "db.serverless", "PromotionTier": 0}
+    )
+    readers = [
+        instance["Properties"]
+        for instance in template.find_resources(
+            "AWS::RDS::DBInstance",
+            {"Properties": {"DBInstanceClass": "db.r6gd.xlarge"}},
+        ).values()
+    ]
+    assert sorted(reader["PromotionTier"] for reader in readers) == [1, 2]
+    assert all(reader["EnablePerformanceInsights"] for reader in readers)
+
+
+def test_database_stack_db_bootstrap_function(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": "index.handler",
+            "Runtime": "python3.12",
+            "Timeout": 900,
+            "VpcConfig": {
+                "SubnetIds": [
+                    {"Fn::ImportValue": Match.string_like_regexp("PrivateDataSubnet1")},
+                    {"Fn::ImportValue": Match.string_like_regexp("PrivateDataSubnet2")},
+                ]
+            },
+            "Environment": {
+                "Variables": {
+                    "PROXY_ENDPOINT": {
+                        "Fn::GetAtt": [Match.string_like_regexp("RdsProxy"), "Endpoint"]
+                    },
+                    "DB_NAME": "hackathon",
+                    "SECRET_ARN": {"Ref": Match.string_like_regexp("RdsSecret")},
+                }
+            },
+        },
+    )
+    # Reaches the database only through the proxy's security group
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroupIngress",
+        {
+            "Description": "Schema bootstrap function to RDS proxy",
+            "FromPort": 5432,
+            "ToPort": 5432,
+            "SourceSecurityGroupId": {
+                "Fn::GetAtt": [
+                    Match.string_like_regexp("DbBootstrapFunctionSecurityGroup"),
+                    "GroupId",
+                ]
+            },
+        },
+    )
+
+
+def test_database_stack_db_bootstrap_resource(template_cache):
+    dev = template_cache.get(DatabaseStack, network_stack=NetworkStack)
+    prod = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=CAPACITY_PROFILES["prod"]
+    )
+
+    dev.has_resource_properties(
+        "Custom::DbBootstrap",
+        {
+            "ServiceToken": {
+                "Fn::GetAtt": [
+                    Match.string_like_regexp("DbBootstrapProviderframeworkonEvent"),
+                    "Arn",
+                ]
+            },
+            "EmbeddingDimensions": 1024,
+            "IndexType": "hnsw",
+            "HnswM": 16,
+            "HnswEfConstruction": 64,
+            "IvfflatLists": 100,
+            "CodeFingerprint": Match.string_like_regexp("^[0-9a-f]{64}$"),
+        },
+    )
+    (bootstrap,) = dev.find_resources("Custom::DbBootstrap").values()
+    # Runs once the writer is up and registered behind the proxy
+    assert any(dep.startswith("RdsClusterwriter") for dep in bootstrap["DependsOn"])
+    assert any(
+        dep.startswith("RdsProxyProxyTargetGroup") for dep in bootstrap["DependsOn"]
+    )
+
+    prod.has_resource_properties(
+        "Custom::DbBootstrap",
+        {"EmbeddingDimensions": 1024, "HnswM": 24, "HnswEfConstruction": 128},
+    )
+
+
+def test_database_stack_opensearch_domain(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
 
     template.resource_count_is("AWS::OpenSearchService::Domain", 1)
     template.has_resource_properties(
@@ -78,22 +467,152 @@ def test_database_stack_opensearch_domain():
     )
 
 
-def test_database_stack_outputs():
-    app = cdk.App()
-    network_stack = NetworkStack(app, "TestNetworkStack")
-    stack = DatabaseStack(app, "TestDatabaseStack", network_stack=network_stack)
-    template = Template.from_stack(stack)
+def test_database_stack_outputs(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
 
     template.has_output("RdsEndpoint", {"Export": {"Name": "RdsEndpoint"}})
     template.has_output("RdsPort", {"Export": {"Name": "RdsPort"}})
-    template.has_output("OpenSearchEndpoint", {"Export": {"Name": "OpenSearchEndpoint"}})
+    template.has_output(
+        "OpenSearchEndpoint", {"Export": {"Name": "OpenSearchEndpoint"}}
+    )
 
 
-def test_database_stack_without_network_stack():
-    app = cdk.App()
-    stack = DatabaseStack(app, "TestDatabaseStack")
-    template = Template.from_stack(stack)
+def test_database_stack_without_network_stack(template_cache):
+    template = template_cache.get(DatabaseStack)
 
     template.resource_count_is("AWS::EC2::VPC", 1)
     template.resource_count_is("AWS::RDS::DBCluster", 1)
     template.resource_count_is("AWS::OpenSearchService::Domain", 1)
+
+
+def test_database_stack_uses_capacity_profile(template_cache):
+    template = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=CAPACITY_PROFILES["prod"]
+    )
+
+    template.has_resource_properties(
+        "AWS::RDS::DBCluster",
+        {"ServerlessV2ScalingConfiguration": {"MinCapacity": 2, "MaxCapacity": 32}},
+    )
+    template.resource_count_is("AWS::RDS::DBInstance", 3)
+    template.has_resource_properties(
+        "AWS::OpenSearchService::Domain",
+        {
+            "ClusterConfig": {
+                "InstanceType": "r6g.large.search",
+                "InstanceCount": 2,
+                "DedicatedMasterEnabled": True,
+                "DedicatedMasterType": "m6g.large.search",
+                "DedicatedMasterCount": 3,
+            }
+        },
+    )
+
+
+def test_database_stack_dev_scales_to_zero(template_cache):
+    template = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=CAPACITY_PROFILES["dev"]
+    )
+
+    template.has_resource_properties(
+        "AWS::RDS::DBCluster",
+        {
+            "ServerlessV2ScalingConfiguration": {
+                "MinCapacity": 0,
+                "MaxCapacity": 2,
+                "SecondsUntilAutoPause": 300,
+            }
+        },
+    )
+
+
+def test_database_stack_reader_promotion_tiers(template_cache):
+    staging = template_cache.get(
+        DatabaseStack,
+        network_stack=NetworkStack,
+        capacity=CAPACITY_PROFILES["staging"],
+    )
+    prod = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=CAPACITY_PROFILES["prod"]
+    )
+
+    staging.has_resource_properties(
+        "AWS::RDS::DBCluster",
+        {
+            "ServerlessV2ScalingConfiguration": {
+                "MinCapacity": 0.5,
+                "MaxCapacity": 8,
+                "SecondsUntilAutoPause": Match.absent(),
+            }
+        },
+    )
+    # Writer in tier 0, the failover reader scales with it in tier 1 and the
+    # read-load reader scales independently in tier 2
+    assert sorted(
+        instance["Properties"]["PromotionTier"]
+        for instance in prod.find_resources("AWS::RDS::DBInstance").values()
+    ) == [0, 1, 2]
+
+
+def test_database_stack_graviton_opensearch_nodes(template_cache):
+    template = template_cache.get(
+        DatabaseStack,
+        network_stack=NetworkStack,
+        capacity=CAPACITY_PROFILES["dev"].with_architecture("ARM64"),
+    )
+
+    template.has_resource_properties(
+        "AWS::OpenSearchService::Domain",
+        {"ClusterConfig": {"InstanceType": "t4g.small.search", "InstanceCount": 2}},
+    )
+    # Serverless v2 has no instance architecture to choose
+    template.has_resource_properties(
+        "AWS::RDS::DBInstance", {"DBInstanceClass": "db.serverless"}
+    )
+
+
+def test_database_stack_scheduled_reader_windows(template_cache):
+    profile = dataclasses.replace(
+        CAPACITY_PROFILES["staging"],
+        scaling_windows=(
+            ScalingWindow(
+                "judging",
+                start="cron(30 8 ? * SAT *)",
+                end="cron(0 18 ? * SAT *)",
+                min_tasks=4,
+                max_tasks=8,
+                aurora_readers=3,
+            ),
+        ),
+    )
+    template = template_cache.get(
+        DatabaseStack, network_stack=NetworkStack, capacity=profile
+    )
+
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {
+            "ServiceNamespace": "rds",
+            "ScalableDimension": "rds:cluster:ReadReplicaCount",
+            "MinCapacity": 1,
+            "MaxCapacity": 3,
+            "ScheduledActions": [
+                {
+                    "ScheduledActionName": "judging-start",
+                    "Schedule": "cron(30 8 ? * SAT *)",
+                    "ScalableTargetAction": {"MinCapacity": 3, "MaxCapacity": 3},
+                },
+                {
+                    "ScheduledActionName": "judging-end",
+                    "Schedule": "cron(0 18 ? * SAT *)",
+                    "ScalableTargetAction": {"MinCapacity": 1, "MaxCapacity": 1},
+                },
+            ],
+        },
+    )
+
+
+def test_database_stack_no_reader_scaling_without_windows(template_cache):
+    template = template_cache.get(DatabaseStack, network_stack=NetworkStack)
+
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 0)
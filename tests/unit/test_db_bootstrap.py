@@ -0,0 +1,211 @@
+import pytest
+
+from cdk.functions.db_bootstrap import index
+
+SETTINGS = {
+    "embedding_dimensions": 1024,
+    "index_type": "hnsw",
+    "hnsw_m": 16,
+    "hnsw_ef_construction": 64,
+    "ivfflat_lists": 100,
+}
+
+
+class FakeConnection:
+    """Records statements; answers the bootstrap's catalog queries."""
+
+    def __init__(
+        self,
+        applied=(),
+        index_options=None,
+        index_valid=True,
+        fail_on=None,
+        indexes=None,
+    ):
+        self.applied = list(applied)
+        # Existing indexes: name -> (reloptions, valid). index_options and
+        # index_valid describe the HNSW index.
+        self.indexes = dict(indexes or {})
+        if index_options is not None:
+            self.indexes[index.HNSW_INDEX] = (index_options, index_valid)
+        self.fail_on = fail_on
+        self.statements: list[str] = []
+        self.closed = False
+
+    def run(self, sql, **params):
+        statement = " ".join(sql.split())
+        self.statements.append(statement)
+        if self.fail_on and self.fail_on in statement:
+            raise RuntimeError(f"failed: {statement}")
+        if statement == "SELECT version FROM schema_migrations":
+            return [[version] for version in self.applied]
+        if statement.startswith("INSERT INTO schema_migrations"):
+            self.applied.append(params["version"])
+        if statement.startswith("SELECT c.reloptions"):
+            if params["name"] not in self.indexes:
+                return []
+            return [list(self.indexes[params["name"]])]
+        return []
+
+    def close(self):
+        self.closed = True
+
+    def executed(self, prefix: str) -> list[str]:
+        return [s for s in self.statements if s.startswith(prefix)]
+
+
+def test_bootstrap_fresh_database():
+    conn = FakeConnection()
+
+    assert index.bootstrap(conn, SETTINGS) == [1, 2]
+
+    assert conn.statements[:2] == [
+        "SET statement_timeout = 0",
+        "SELECT pg_advisory_lock(:key)",
+    ]
+    assert conn.statements[-1] == "SELECT pg_advisory_unlock(:key)"
+    assert conn.executed("CREATE EXTENSION IF NOT EXISTS vector")
+    assert (
+        "embedding vector(1024) NOT NULL"
+        in conn.executed("CREATE TABLE IF NOT EXISTS document_chunks")[0]
+    )
+    assert conn.executed("CREATE INDEX CONCURRENTLY") == [
+        "CREATE INDEX CONCURRENTLY document_chunks_embedding_hnsw ON document_chunks "
+        "USING hnsw (embedding vector_cosine_ops) "
+        "WITH (m = 16, ef_construction = 64)"
+    ]
+    assert len(conn.executed("COMMIT")) == 2
+
+
+def test_bootstrap_is_idempotent():
+    conn = FakeConnection(applied=[1, 2], index_options=["m=16", "ef_construction=64"])
+
+    assert index.bootstrap(conn, SETTINGS) == []
+
+    assert not conn.executed("START TRANSACTION")
+    assert not conn.executed("CREATE INDEX")
+    assert not conn.executed("DROP INDEX")
+
+
+def test_bootstrap_applies_only_new_migrations():
+    conn = FakeConnection(applied=[1], index_options=["m=16", "ef_construction=64"])
+
+    assert index.bootstrap(conn, SETTINGS) == [2]
+
+    assert not conn.executed("CREATE EXTENSION")
+    assert conn.applied == [1, 2]
+
+
+def test_bootstrap_rebuilds_index_when_options_change():
+    conn = FakeConnection(applied=[1, 2], index_options=["m=16", "ef_construction=64"])
+
+    index.bootstrap(conn, {**SETTINGS, "hnsw_m": 24, "hnsw_ef_construction": 128})
+
+    name = index.HNSW_INDEX
+    assert [s for s in conn.statements if "INDEX" in s] == [
+        f"DROP INDEX CONCURRENTLY IF EXISTS {name}_rebuild",
+        f"CREATE INDEX CONCURRENTLY {name}_rebuild ON document_chunks "
+        "USING hnsw (embedding vector_cosine_ops) "
+        "WITH (m = 24, ef_construction = 128)",
+        f"DROP INDEX CONCURRENTLY {name}",
+        f"ALTER INDEX {name}_rebuild RENAME TO {name}",
+    ]
+
+
+def test_bootstrap_replaces_invalid_index():
+    conn = FakeConnection(
+        applied=[1, 2],
+        index_options=["m=16", "ef_construction=64"],
+        index_valid=False,
+    )
+
+    index.bootstrap(conn, SETTINGS)
+
+    assert [s for s in conn.statements if "INDEX" in s][0] == (
+        f"DROP INDEX CONCURRENTLY {index.HNSW_INDEX}"
+    )
+    assert len(conn.executed("CREATE INDEX CONCURRENTLY")) == 1
+
+
+def test_bootstrap_builds_ivfflat_index():
+    conn = FakeConnection(applied=[1, 2])
+
+    index.bootstrap(conn, {**SETTINGS, "index_type": "ivfflat", "ivfflat_lists": 50})
+
+    assert [s for s in conn.statements if "INDEX" in s] == [
+        f"CREATE INDEX CONCURRENTLY {index.IVFFLAT_INDEX} ON document_chunks "
+        "USING ivfflat (embedding vector_cosine_ops) WITH (lists = 50)"
+    ]
+
+
+def test_bootstrap_switches_index_type_before_dropping_old_index():
+    conn = FakeConnection(applied=[1, 2], index_options=["m=16", "ef_construction=64"])
+
+    index.bootstrap(conn, {**SETTINGS, "index_type": "ivfflat"})
+
+    assert [s for s in conn.statements if "INDEX" in s] == [
+        f"CREATE INDEX CONCURRENTLY {index.IVFFLAT_INDEX} ON document_chunks "
+        "USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)",
+        f"DROP INDEX CONCURRENTLY {index.HNSW_INDEX}",
+    ]
+
+
+def test_bootstrap_keeps_matching_ivfflat_index():
+    conn = FakeConnection(
+        applied=[1, 2], indexes={index.IVFFLAT_INDEX: (["lists=100"], True)}
+    )
+
+    index.bootstrap(conn, {**SETTINGS, "index_type": "ivfflat"})
+
+    assert not [s for s in conn.statements if "INDEX" in s]
+
+
+def test_failed_migration_rolls_back_and_releases_lock():
+    conn = FakeConnection(applied=[1], fail_on="CREATE TABLE IF NOT EXISTS document")
+
+    with pytest.raises(RuntimeError):
+        index.bootstrap(conn, SETTINGS)
+
+    assert conn.applied == [1]
+    assert conn.executed("ROLLBACK")
+    assert not conn.executed("COMMIT")
+    assert not conn.executed("CREATE INDEX")
+    assert conn.statements[-1] == "SELECT pg_advisory_unlock(:key)"
+
+
+def test_handler_create_runs_bootstrap(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(index, "connect", lambda: conn)
+
+    response = index.handler(
+        {
+            "RequestType": "Create",
+            "ResourceProperties": {
+                "EmbeddingDimensions": "1536",
+                "IndexType": "hnsw",
+                "HnswM": "16",
+                "HnswEfConstruction": "64",
+                "IvfflatLists": "100",
+            },
+        },
+        None,
+    )
+
+    assert response == {
+        "PhysicalResourceId": index.PHYSICAL_RESOURCE_ID,
+        "Data": {"SchemaVersion": "2", "AppliedMigrations": "1,2"},
+    }
+    assert "embedding vector(1536) NOT NULL" in conn.executed("CREATE TABLE")[1]
+    assert conn.closed
+
+
+def test_handler_delete_does_not_connect(monkeypatch):
+    def connect():
+        raise AssertionError("Delete must not touch the database")
+
+    monkeypatch.setattr(index, "connect", connect)
+
+    assert index.handler(
+        {"RequestType": "Delete", "PhysicalResourceId": "hackathon-db-bootstrap"},
+        None,
+    ) == {"PhysicalResourceId": "hackathon-db-bootstrap"}
@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pytest
+
+from scripts import deploy
+from scripts.stack_graph import load_stack_graph, run_graph, select, waves
+from tests.cdk_stub import APP_GRAPH, write_stub_cdk
+
+
+@pytest.fixture
+def stub_cdk(tmp_path):
+    return write_stub_cdk(tmp_path)
+
+
+def test_waves_group_independent_stacks():
+    assert waves(APP_GRAPH) == [
+        ["NetworkStack"],
+        ["ComputeStack", "DatabaseStack", "SecurityStack", "StorageStack"],
+        ["MonitoringStack"],
+    ]
+
+
+def test_waves_reject_cycles_and_unknown_dependencies():
+    with pytest.raises(ValueError, match="cycle"):
+        waves({"A": ["B"], "B": ["A"]})
+    with pytest.raises(ValueError, match="unknown stacks"):
+        waves({"A": ["Missing"]})
+
+
+def test_select_includes_transitive_dependencies():
+    assert set(select(APP_GRAPH, ["MonitoringStack"])) == {
+        "NetworkStack",
+        "StorageStack",
+        "MonitoringStack",
+    }
+    assert select(APP_GRAPH, None) == APP_GRAPH
+    with pytest.raises(ValueError, match="Unknown stacks"):
+        select(APP_GRAPH, ["AgentCoreStack"])
+
+
+def test_run_graph_respects_dependencies_and_concurrency():
+    lock = threading.Lock()
+    running, peak, finished = set(), [0], []
+
+    def worker(stack):
+        with lock:
+            assert all(dep in finished for dep in APP_GRAPH[stack])
+            running.add(stack)
+            peak[0] = max(peak[0], len(running))
+        time.sleep(0.05)
+        with lock:
+            running.discard(stack)
+            finished.append(stack)
+
+    results = run_graph(APP_GRAPH, worker, max_workers=3)
+
+    assert all(result.ok for result in results.values())
+    assert peak[0] == 3
+
+
+def test_run_graph_skips_dependents_of_failed_stack():
+    def worker(stack):
+        if stack == "StorageStack":
+            raise RuntimeError("boom")
+
+    statuses = []
+    results = run_graph(APP_GRAPH, worker, on_status=lambda s, st: statuses.append(st))
+
+    assert results["StorageStack"].status == "failed"
+    assert results["StorageStack"].detail == "boom"
+    assert results["MonitoringStack"].status == "skipped"
+    assert all(
+        results[s].ok
+        for s in ("NetworkStack", "SecurityStack", "DatabaseStack", "ComputeStack")
+    )
+    assert statuses.count("skipped") == 1
+
+
+def test_deploy_dry_run_prints_plan(stub_cdk, tmp_path, capsys):
+    cdk, log = stub_cdk
+
+    assert (
+        deploy.main(["--dry-run", "--app-dir", str(tmp_path), "--cdk", str(cdk)]) == 0
+    )
+
+    out = capsys.readouterr().out
+    assert "Wave 1: NetworkStack" in out
+    assert "Wave 2: ComputeStack, DatabaseStack, SecurityStack, StorageStack" in out
+    assert "deploy MonitoringStack --app cdk.out --exclusively" in out
+    assert not log.exists()
+    assert load_stack_graph(tmp_path / "cdk.out") == APP_GRAPH
+
+
+def test_deploy_runs_independent_stacks_in_parallel(stub_cdk, tmp_path, capsys):
+    cdk, log = stub_cdk
+
+    assert deploy.main(["--app-dir", str(tmp_path), "--cdk", str(cdk)]) == 0
+
+    order = log.read_text().splitlines()
+    # The four stacks that only need NetworkStack start before any finishes
+    assert order[:2] == ["start NetworkStack", "end NetworkStack"]
+    assert all(line.startswith("start") for line in order[2:6])
+    for stack, deps in APP_GRAPH.items():
+        for dep in deps:
+            assert order.index(f"end {dep}") < order.index(f"start {stack}")
+    assert {line.split()[1] for line in order} == set(APP_GRAPH)
+    assert "[DatabaseStack] deploying DatabaseStack" in capsys.readouterr().out
+
+
+def test_deploy_failure_skips_dependents(stub_cdk, tmp_path, monkeypatch, capsys):
+    cdk, log = stub_cdk
+    monkeypatch.setenv("STUB_CDK_FAIL", "StorageStack")
+
+    assert deploy.main(["--app-dir", str(tmp_path), "--cdk", str(cdk)]) == 1
+
+    started = {line.split()[1] for line in log.read_text().splitlines()}
+    assert "MonitoringStack" not in started
+    assert "DatabaseStack" in started
+    assert "MonitoringStack deployment skipped" in capsys.readouterr().out
+
+
+def test_deploy_skips_stacks_unchanged_since_last_deploy(
+    stub_cdk, tmp_path, monkeypatch, capsys
+):
+    cdk, log = stub_cdk
+    assert deploy.main(["--app-dir", str(tmp_path), "--cdk", str(cdk)]) == 0
+    log.unlink()
+    monkeypatch.setenv("STUB_CDK_CHANGED", "DatabaseStack")
+
+    assert deploy.main(["--app-dir", str(tmp_path), "--cdk", str(cdk)]) == 0
+
+    assert log.read_text().splitlines() == ["start DatabaseStack", "end DatabaseStack"]
+    out = capsys.readouterr().out
+    assert "NetworkStack: unchanged" in out
+    assert '~ Resources.Marker.Properties.Value: "1" -> "2"' in out
+
+    log.unlink()
+    assert deploy.main(["--app-dir", str(tmp_path), "--cdk", str(cdk)]) == 0
+    assert not log.exists()
+
+    assert deploy.main(["--force", "--app-dir", str(tmp_path), "--cdk", str(cdk)]) == 0
+    assert len(log.read_text().splitlines()) == 2 * len(APP_GRAPH)
@@ -1,27 +1,22 @@
-import aws_cdk as cdk
-from aws_cdk.assertions import Template
+import json
+
+from cdk.config import CAPACITY_PROFILES
 from cdk.stacks.monitoring_stack import MonitoringStack
 from cdk.stacks.storage_stack import StorageStack
 
 
-def test_monitoring_stack_log_groups_created():
-    app = cdk.App()
-    storage_stack = StorageStack(app, "TestStorageStack")
-    stack = MonitoringStack(
-        app, "TestMonitoringStack", logs_bucket=storage_stack.logs_bucket
+def test_monitoring_stack_log_groups_created(template_cache):
+    template = template_cache.get(
+        MonitoringStack, logs_bucket=template_cache.ref(StorageStack, "logs_bucket")
     )
-    template = Template.from_stack(stack)
 
     template.resource_count_is("AWS::Logs::LogGroup", 2)
 
 
-def test_monitoring_stack_app_log_group():
-    app = cdk.App()
-    storage_stack = StorageStack(app, "TestStorageStack")
-    stack = MonitoringStack(
-        app, "TestMonitoringStack", logs_bucket=storage_stack.logs_bucket
+def test_monitoring_stack_app_log_group(template_cache):
+    template = template_cache.get(
+        MonitoringStack, logs_bucket=template_cache.ref(StorageStack, "logs_bucket")
     )
-    template = Template.from_stack(stack)
 
     template.has_resource_properties(
         "AWS::Logs::LogGroup",
@@ -29,13 +24,10 @@ def test_monitoring_stack_app_log_group():
     )
 
 
-def test_monitoring_stack_alb_log_group():
-    app = cdk.App()
-    storage_stack = StorageStack(app, "TestStorageStack")
-    stack = MonitoringStack(
-        app, "TestMonitoringStack", logs_bucket=storage_stack.logs_bucket
+def test_monitoring_stack_alb_log_group(template_cache):
+    template = template_cache.get(
+        MonitoringStack, logs_bucket=template_cache.ref(StorageStack, "logs_bucket")
     )
-    template = Template.from_stack(stack)
 
     template.has_resource_properties(
         "AWS::Logs::LogGroup",
@@ -43,13 +35,10 @@ def test_monitoring_stack_alb_log_group():
     )
 
 
-def test_monitoring_stack_cloudwatch_alarm():
-    app = cdk.App()
-    storage_stack = StorageStack(app, "TestStorageStack")
-    stack = MonitoringStack(
-        app, "TestMonitoringStack", logs_bucket=storage_stack.logs_bucket
+def test_monitoring_stack_cloudwatch_alarm(template_cache):
+    template = template_cache.get(
+        MonitoringStack, logs_bucket=template_cache.ref(StorageStack, "logs_bucket")
     )
-    template = Template.from_stack(stack)
 
     template.resource_count_is("AWS::CloudWatch::Alarm", 1)
     template.has_resource_properties(
@@ -64,13 +53,10 @@ def test_monitoring_stack_cloudwatch_alarm():
     )
 
 
-def test_monitoring_stack_cloudtrail():
-    app = cdk.App()
-    storage_stack = StorageStack(app, "TestStorageStack")
-    stack = MonitoringStack(
-        app, "TestMonitoringStack", logs_bucket=storage_stack.logs_bucket
+def test_monitoring_stack_cloudtrail(template_cache):
+    template = template_cache.get(
+        MonitoringStack, logs_bucket=template_cache.ref(StorageStack, "logs_bucket")
     )
-    template = Template.from_stack(stack)
 
     template.resource_count_is("AWS::CloudTrail::Trail", 1)
     template.has_resource_properties(
@@ -84,13 +70,78 @@ def test_monitoring_stack_cloudtrail():
     )
 
 
-def test_monitoring_stack_outputs():
-    app = cdk.App()
-    storage_stack = StorageStack(app, "TestStorageStack")
-    stack = MonitoringStack(
-        app, "TestMonitoringStack", logs_bucket=storage_stack.logs_bucket
+def test_monitoring_stack_outputs(template_cache):
+    template = template_cache.get(
+        MonitoringStack, logs_bucket=template_cache.ref(StorageStack, "logs_bucket")
     )
-    template = Template.from_stack(stack)
 
     template.has_output("AppLogGroupName", {"Export": {"Name": "AppLogGroupName"}})
     template.has_output("CloudTrailArn", {"Export": {"Name": "CloudTrailArn"}})
+
+
+def test_monitoring_stack_log_retention_from_capacity_profile(template_cache):
+    template = template_cache.get(
+        MonitoringStack,
+        logs_bucket=template_cache.ref(StorageStack, "logs_bucket"),
+        capacity=CAPACITY_PROFILES["prod"],
+    )
+
+    template.resource_properties_count_is(
+        "AWS::Logs::LogGroup", {"RetentionInDays": 90}, 2
+    )
+
+
+def _dashboard_body(template) -> str:
+    (dashboard,) = template.find_resources("AWS::CloudWatch::Dashboard").values()
+    body = dashboard["Properties"]["DashboardBody"]
+    if isinstance(body, str):
+        return body
+    return "".join(
+        part if isinstance(part, str) else json.dumps(part)
+        for part in body["Fn::Join"][1]
+    )
+
+
+def test_monitoring_stack_ecs_dashboard(template_cache):
+    template = template_cache.get(
+        MonitoringStack, logs_bucket=template_cache.ref(StorageStack, "logs_bucket")
+    )
+
+    template.has_resource_properties(
+        "AWS::CloudWatch::Dashboard", {"DashboardName": "hackathon-ecs"}
+    )
+    body = _dashboard_body(template)
+    for service in ("hackathon-app", "hackathon-agent-worker"):
+        assert f'"ServiceName","{service}"' in body
+        assert f'TaskDefinitionFamily=\\"{service}\\"' in body
+    for metric in (
+        "CpuUtilized",
+        "CpuReserved",
+        "MemoryUtilized",
+        "MemoryReserved",
+        "NetworkRxBytes",
+        "NetworkTxBytes",
+        "EphemeralStorageUtilized",
+        "RunningTaskCount",
+    ):
+        assert f'"ECS/ContainerInsights","{metric}"' in body
+    assert "100 * cpu_used / cpu_reserved" in body
+
+
+def test_monitoring_stack_service_connect_widgets(template_cache):
+    template = template_cache.get(
+        MonitoringStack, logs_bucket=template_cache.ref(StorageStack, "logs_bucket")
+    )
+
+    body = _dashboard_body(template)
+    for metric in (
+        "RequestCount",
+        "TargetResponseTime",
+        "HTTPCode_Target_5XX_Count",
+        "ActiveConnectionCount",
+    ):
+        assert (
+            f'"AWS/ECS","{metric}","ClusterName","hackathon-cluster",'
+            '"DiscoveryName","app","ServiceName","hackathon-app"'
+        ) in body
+    assert '"stat":"p99"' in body
@@ -1,12 +1,9 @@
-import aws_cdk as cdk
-from aws_cdk.assertions import Template, Match
+from tests.template_query import Match
 from cdk.stacks.network_stack import NetworkStack
 
 
-def test_network_stack_vpc_created():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_vpc_created(template_cache):
+    template = template_cache.get(NetworkStack)
 
     template.resource_count_is("AWS::EC2::VPC", 1)
     template.has_resource_properties(
@@ -19,18 +16,14 @@ def test_network_stack_vpc_created():
     )
 
 
-def test_network_stack_subnets_created():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_subnets_created(template_cache):
+    template = template_cache.get(NetworkStack)
 
     template.resource_count_is("AWS::EC2::Subnet", 8)
 
 
-def test_network_stack_public_alb_created():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_public_alb_created(template_cache):
+    template = template_cache.get(NetworkStack)
 
     template.resource_count_is("AWS::ElasticLoadBalancingV2::LoadBalancer", 2)
     template.has_resource_properties(
@@ -38,20 +31,16 @@ def test_network_stack_public_alb_created():
     )
 
 
-def test_network_stack_internal_alb_created():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_internal_alb_created(template_cache):
+    template = template_cache.get(NetworkStack)
 
     template.has_resource_properties(
         "AWS::ElasticLoadBalancingV2::LoadBalancer", {"Scheme": "internal"}
     )
 
 
-def test_network_stack_waf_created():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_waf_created(template_cache):
+    template = template_cache.get(NetworkStack)
 
     template.resource_count_is("AWS::WAFv2::WebACL", 1)
     template.has_resource_properties(
@@ -74,26 +63,20 @@ def test_network_stack_waf_created():
     )
 
 
-def test_network_stack_waf_association():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_waf_association(template_cache):
+    template = template_cache.get(NetworkStack)
 
     template.resource_count_is("AWS::WAFv2::WebACLAssociation", 1)
 
 
-def test_network_stack_vpc_endpoints():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_vpc_endpoints(template_cache):
+    template = template_cache.get(NetworkStack)
 
     template.resource_count_is("AWS::EC2::VPCEndpoint", 7)
 
 
-def test_network_stack_s3_gateway_endpoint():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_s3_gateway_endpoint(template_cache):
+    template = template_cache.get(NetworkStack)
 
     template.has_resource_properties(
         "AWS::EC2::VPCEndpoint",
@@ -101,10 +84,8 @@ def test_network_stack_s3_gateway_endpoint():
     )
 
 
-def test_network_stack_bedrock_endpoint():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_bedrock_endpoint(template_cache):
+    template = template_cache.get(NetworkStack)
 
     template.has_resource_properties(
         "AWS::EC2::VPCEndpoint",
@@ -112,10 +93,8 @@ def test_network_stack_bedrock_endpoint():
     )
 
 
-def test_network_stack_security_groups():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_security_groups(template_cache):
+    template = template_cache.get(NetworkStack)
 
     alb_sg_count = 0
     internal_alb_sg_count = 0
@@ -132,10 +111,8 @@ def test_network_stack_security_groups():
     assert internal_alb_sg_count == 1, "Expected 1 Internal ALB security group"
 
 
-def test_network_stack_outputs():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack")
-    template = Template.from_stack(stack)
+def test_network_stack_outputs(template_cache):
+    template = template_cache.get(NetworkStack)
 
     template.has_output("VpcId", {})
     template.has_output("PublicSubnetIds", {})
@@ -146,10 +123,24 @@ def test_network_stack_outputs():
     template.has_output("InternalAlbDnsName", {})
 
 
-def test_network_stack_with_domain_no_env():
-    app = cdk.App()
-    stack = NetworkStack(app, "TestNetworkStack", domain_name="example.local")
-    template = Template.from_stack(stack)
+def test_network_stack_with_domain_no_env(template_cache):
+    template = template_cache.get(NetworkStack, domain_name="example.local")
 
     template.resource_count_is("AWS::Route53::HostedZone", 0)
     template.resource_count_is("AWS::CertificateManager::Certificate", 0)
+
+
+def test_network_stack_http_listener_without_certificate(template_cache):
+    template = template_cache.get(NetworkStack)
+
+    template.resource_count_is("AWS::ElasticLoadBalancingV2::Listener", 1)
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::Listener",
+        {
+            "Port": 80,
+            "Protocol": "HTTP",
+            "DefaultActions": [
+                {"Type": "fixed-response", "FixedResponseConfig": {"StatusCode": "404"}}
+            ],
+        },
+    )
@@ -1,12 +1,8 @@
-import aws_cdk as cdk
-from aws_cdk.assertions import Template, Match
 from cdk.stacks.security_stack import SecurityStack
 
 
-def test_security_stack_cognito_created():
-    app = cdk.App()
-    stack = SecurityStack(app, "TestSecurityStack", environment="dev")
-    template = Template.from_stack(stack)
+def test_security_stack_cognito_created(template_cache):
+    template = template_cache.get(SecurityStack, environment="dev")
 
     template.resource_count_is("AWS::Cognito::UserPool", 1)
     template.has_resource_properties(
@@ -14,10 +10,8 @@ def test_security_stack_cognito_created():
     )
 
 
-def test_security_stack_password_policy():
-    app = cdk.App()
-    stack = SecurityStack(app, "TestSecurityStack", environment="dev")
-    template = Template.from_stack(stack)
+def test_security_stack_password_policy(template_cache):
+    template = template_cache.get(SecurityStack, environment="dev")
 
     template.has_resource_properties(
         "AWS::Cognito::UserPool",
@@ -36,20 +30,16 @@ def test_security_stack_password_policy():
     )
 
 
-def test_security_stack_mfa_optional():
-    app = cdk.App()
-    stack = SecurityStack(app, "TestSecurityStack", environment="dev")
-    template = Template.from_stack(stack)
+def test_security_stack_mfa_optional(template_cache):
+    template = template_cache.get(SecurityStack, environment="dev")
 
     template.has_resource_properties(
         "AWS::Cognito::UserPool", {"MfaConfiguration": "OPTIONAL"}
     )
 
 
-def test_security_stack_user_groups_created():
-    app = cdk.App()
-    stack = SecurityStack(app, "TestSecurityStack", environment="dev")
-    template = Template.from_stack(stack)
+def test_security_stack_user_groups_created(template_cache):
+    template = template_cache.get(SecurityStack, environment="dev")
 
     template.resource_count_is("AWS::Cognito::UserPoolGroup", 5)
 
@@ -79,10 +69,8 @@ def test_security_stack_user_groups_created():
     )
 
 
-def test_security_stack_user_pool_client_created():
-    app = cdk.App()
-    stack = SecurityStack(app, "TestSecurityStack", environment="dev")
-    template = Template.from_stack(stack)
+def test_security_stack_user_pool_client_created(template_cache):
+    template = template_cache.get(SecurityStack, environment="dev")
 
     template.resource_count_is("AWS::Cognito::UserPoolClient", 1)
 
@@ -97,10 +85,8 @@ def test_security_stack_user_pool_client_created():
     )
 
 
-def test_security_stack_user_pool_domain_created():
-    app = cdk.App()
-    stack = SecurityStack(app, "TestSecurityStack", environment="dev")
-    template = Template.from_stack(stack)
+def test_security_stack_user_pool_domain_created(template_cache):
+    template = template_cache.get(SecurityStack, environment="dev")
 
     template.resource_count_is("AWS::Cognito::UserPoolDomain", 1)
     template.has_resource_properties(
@@ -108,10 +94,8 @@ def test_security_stack_user_pool_domain_created():
     )
 
 
-def test_security_stack_ssm_parameters_created():
-    app = cdk.App()
-    stack = SecurityStack(app, "TestSecurityStack", environment="dev")
-    template = Template.from_stack(stack)
+def test_security_stack_ssm_parameters_created(template_cache):
+    template = template_cache.get(SecurityStack, environment="dev")
 
     template.resource_count_is("AWS::SSM::Parameter", 2)
 
@@ -126,10 +110,8 @@ def test_security_stack_ssm_parameters_created():
     )
 
 
-def test_security_stack_outputs():
-    app = cdk.App()
-    stack = SecurityStack(app, "TestSecurityStack", environment="dev")
-    template = Template.from_stack(stack)
+def test_security_stack_outputs(template_cache):
+    template = template_cache.get(SecurityStack, environment="dev")
 
     template.has_output("UserPoolId", {})
     template.has_output("UserPoolArn", {})
@@ -139,20 +121,16 @@ def test_security_stack_outputs():
     template.has_output("AppConfigParamName", {})
 
 
-def test_security_stack_prod_has_deletion_protection():
-    app = cdk.App()
-    stack = SecurityStack(app, "TestSecurityStack", environment="prod")
-    template = Template.from_stack(stack)
+def test_security_stack_prod_has_deletion_protection(template_cache):
+    template = template_cache.get(SecurityStack, environment="prod")
 
     template.has_resource_properties(
         "AWS::Cognito::UserPool", {"DeletionProtection": "ACTIVE"}
     )
 
 
-def test_security_stack_dev_no_deletion_protection():
-    app = cdk.App()
-    stack = SecurityStack(app, "TestSecurityStack", environment="dev")
-    template = Template.from_stack(stack)
+def test_security_stack_dev_no_deletion_protection(template_cache):
+    template = template_cache.get(SecurityStack, environment="dev")
 
     template.has_resource_properties(
         "AWS::Cognito::UserPool", {"DeletionProtection": "INACTIVE"}
@@ -0,0 +1,143 @@
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from tests.stack_outputs import StackNotDeployedError, StackOutputsResolver
+
+
+def _template(outputs: dict[str, str]) -> str:
+    return json.dumps(
+        {
+            "Resources": {"Topic": {"Type": "AWS::SNS::Topic"}},
+            "Outputs": {key: {"Value": value} for key, value in outputs.items()},
+        }
+    )
+
+
+@pytest.fixture
+def cloudformation(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("cloudformation", region_name="us-east-1")
+        client.create_stack(
+            StackName="NetworkStack", TemplateBody=_template({"VpcId": "vpc-1"})
+        )
+        client.create_stack(
+            StackName="DatabaseStack", TemplateBody=_template({"RdsPort": "5432"})
+        )
+        yield client
+
+
+@pytest.fixture
+def describe_calls(cloudformation):
+    calls = []
+    cloudformation.meta.events.register(
+        "before-call.cloudformation.DescribeStacks",
+        lambda **kwargs: calls.append(kwargs["params"]),
+    )
+    return calls
+
+
+def test_resolver_fetches_all_stacks_in_one_call(cloudformation, describe_calls):
+    resolver = StackOutputsResolver(cloudformation)
+
+    assert resolver.get("NetworkStack") == {"VpcId": "vpc-1"}
+    assert resolver.get("DatabaseStack") == {"RdsPort": "5432"}
+    assert resolver.get("NetworkStack") == {"VpcId": "vpc-1"}
+    assert len(describe_calls) == 1
+    assert "StackName" not in describe_calls[0]
+    assert resolver.source == "cloudformation"
+
+
+def test_resolver_raises_for_missing_stack(cloudformation):
+    resolver = StackOutputsResolver(cloudformation)
+
+    with pytest.raises(StackNotDeployedError, match="ComputeStack not deployed"):
+        resolver.get("ComputeStack")
+
+
+def test_resolver_prefers_outputs_file(cloudformation, describe_calls, tmp_path):
+    outputs_file = tmp_path / "cdk-outputs.json"
+    outputs_file.write_text(json.dumps({"NetworkStack": {"VpcId": "vpc-file"}}))
+
+    resolver = StackOutputsResolver(cloudformation, outputs_file=outputs_file)
+
+    assert resolver.get("NetworkStack") == {"VpcId": "vpc-file"}
+    assert describe_calls == []
+    assert resolver.source == "outputs-file"
+
+
+def test_resolver_partial_outputs_file_falls_back_per_stack(
+    cloudformation, describe_calls, tmp_path
+):
+    # e.g. `cdk deploy NetworkStack --outputs-file ...` after a full deploy
+    outputs_file = tmp_path / "cdk-outputs.json"
+    outputs_file.write_text(json.dumps({"NetworkStack": {"VpcId": "vpc-file"}}))
+
+    resolver = StackOutputsResolver(cloudformation, outputs_file=outputs_file)
+
+    assert resolver.get("NetworkStack") == {"VpcId": "vpc-file"}
+    assert describe_calls == []
+    assert resolver.get("DatabaseStack") == {"RdsPort": "5432"}
+    assert resolver.source == "cloudformation"
+    assert resolver.get("NetworkStack") == {"VpcId": "vpc-file"}
+    assert resolver.get("DatabaseStack") == {"RdsPort": "5432"}
+    assert len(describe_calls) == 1
+    assert resolver.all() == {
+        "NetworkStack": {"VpcId": "vpc-file"},
+        "DatabaseStack": {"RdsPort": "5432"},
+    }
+
+
+def test_resolver_partial_outputs_file_uses_fresh_cache(
+    cloudformation, describe_calls, tmp_path
+):
+    cache_file = tmp_path / "stack-outputs.json"
+    StackOutputsResolver(cloudformation, cache_file=cache_file, cache_ttl=60).get(
+        "NetworkStack"
+    )
+    outputs_file = tmp_path / "cdk-outputs.json"
+    outputs_file.write_text(json.dumps({"NetworkStack": {"VpcId": "vpc-file"}}))
+
+    resolver = StackOutputsResolver(
+        cloudformation,
+        outputs_file=outputs_file,
+        cache_file=cache_file,
+        cache_ttl=60,
+    )
+
+    assert resolver.get("DatabaseStack") == {"RdsPort": "5432"}
+    assert resolver.source == "cache"
+    assert len(describe_calls) == 1
+
+
+def test_resolver_disk_cache_respects_ttl(cloudformation, describe_calls, tmp_path):
+    cache_file = tmp_path / "stack-outputs.json"
+
+    first = StackOutputsResolver(cloudformation, cache_file=cache_file, cache_ttl=60)
+    assert first.get("NetworkStack") == {"VpcId": "vpc-1"}
+    second = StackOutputsResolver(cloudformation, cache_file=cache_file, cache_ttl=60)
+    assert second.get("DatabaseStack") == {"RdsPort": "5432"}
+
+    assert len(describe_calls) == 1
+    assert second.source == "cache"
+
+    cached = json.loads(cache_file.read_text())
+    cached["fetched_at"] -= 120
+    cache_file.write_text(json.dumps(cached))
+    third = StackOutputsResolver(cloudformation, cache_file=cache_file, cache_ttl=60)
+    third.get("NetworkStack")
+
+    assert len(describe_calls) == 2
+    assert third.source == "cloudformation"
+
+
+def test_resolver_without_ttl_does_not_write_cache(cloudformation, tmp_path):
+    cache_file = tmp_path / "stack-outputs.json"
+
+    StackOutputsResolver(cloudformation, cache_file=cache_file).get("NetworkStack")
+
+    assert not cache_file.exists()
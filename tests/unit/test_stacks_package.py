@@ -0,0 +1,45 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def _loaded_modules(statement: str) -> list[str]:
+    """Run ``statement`` in a fresh interpreter and return the modules it loaded."""
+    script = f"import sys, json\n{statement}\n" "print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_importing_stacks_package_does_not_load_aws_cdk():
+    modules = _loaded_modules("import cdk.stacks")
+
+    assert "cdk.stacks" in modules
+    assert "aws_cdk" not in modules
+    assert not [m for m in modules if m.startswith("cdk.stacks.")]
+
+
+@pytest.mark.slow
+def test_importing_one_stack_loads_only_its_module():
+    modules = _loaded_modules("from cdk.stacks import StorageStack")
+
+    assert [m for m in modules if m.startswith("cdk.stacks.")] == [
+        "cdk.stacks.storage_stack"
+    ]
+
+
+def test_stacks_package_rejects_unknown_attribute():
+    import cdk.stacks
+
+    with pytest.raises(AttributeError):
+        getattr(cdk.stacks, "AgentCoreStack")
@@ -1,20 +1,14 @@
-import aws_cdk as cdk
-from aws_cdk.assertions import Template
 from cdk.stacks.storage_stack import StorageStack
 
 
-def test_storage_stack_s3_buckets_created():
-    app = cdk.App()
-    stack = StorageStack(app, "TestStorageStack")
-    template = Template.from_stack(stack)
+def test_storage_stack_s3_buckets_created(template_cache):
+    template = template_cache.get(StorageStack)
 
     template.resource_count_is("AWS::S3::Bucket", 3)
 
 
-def test_storage_stack_knowledge_base_bucket():
-    app = cdk.App()
-    stack = StorageStack(app, "TestStorageStack")
-    template = Template.from_stack(stack)
+def test_storage_stack_knowledge_base_bucket(template_cache):
+    template = template_cache.get(StorageStack)
 
     template.has_resource_properties(
         "AWS::S3::Bucket",
@@ -35,10 +29,8 @@ def test_storage_stack_knowledge_base_bucket():
     )
 
 
-def test_storage_stack_all_buckets_block_public_access():
-    app = cdk.App()
-    stack = StorageStack(app, "TestStorageStack")
-    template = Template.from_stack(stack)
+def test_storage_stack_all_buckets_block_public_access(template_cache):
+    template = template_cache.get(StorageStack)
 
     buckets = template.find_resources("AWS::S3::Bucket")
     assert len(buckets) == 3, "Expected 3 S3 buckets"
@@ -60,18 +52,14 @@ def test_storage_stack_all_buckets_block_public_access():
         ), f"Bucket {bucket_id} must restrict public buckets"
 
 
-def test_storage_stack_ecr_repositories_created():
-    app = cdk.App()
-    stack = StorageStack(app, "TestStorageStack")
-    template = Template.from_stack(stack)
+def test_storage_stack_ecr_repositories_created(template_cache):
+    template = template_cache.get(StorageStack)
 
     template.resource_count_is("AWS::ECR::Repository", 2)
 
 
-def test_storage_stack_app_ecr_repository():
-    app = cdk.App()
-    stack = StorageStack(app, "TestStorageStack")
-    template = Template.from_stack(stack)
+def test_storage_stack_app_ecr_repository(template_cache):
+    template = template_cache.get(StorageStack)
 
     template.has_resource_properties(
         "AWS::ECR::Repository",
@@ -83,10 +71,8 @@ def test_storage_stack_app_ecr_repository():
     )
 
 
-def test_storage_stack_agent_ecr_repository():
-    app = cdk.App()
-    stack = StorageStack(app, "TestStorageStack")
-    template = Template.from_stack(stack)
+def test_storage_stack_agent_ecr_repository(template_cache):
+    template = template_cache.get(StorageStack)
 
     template.has_resource_properties(
         "AWS::ECR::Repository",
@@ -98,10 +84,8 @@ def test_storage_stack_agent_ecr_repository():
     )
 
 
-def test_storage_stack_all_ecr_repos_have_scanning():
-    app = cdk.App()
-    stack = StorageStack(app, "TestStorageStack")
-    template = Template.from_stack(stack)
+def test_storage_stack_all_ecr_repos_have_scanning(template_cache):
+    template = template_cache.get(StorageStack)
 
     repos = template.find_resources("AWS::ECR::Repository")
     assert len(repos) == 2, "Expected 2 ECR repositories"
@@ -114,10 +98,8 @@ def test_storage_stack_all_ecr_repos_have_scanning():
         ), f"Repository {repo_id} must have scan on push enabled"
 
 
-def test_storage_stack_all_ecr_repos_are_immutable():
-    app = cdk.App()
-    stack = StorageStack(app, "TestStorageStack")
-    template = Template.from_stack(stack)
+def test_storage_stack_all_ecr_repos_are_immutable(template_cache):
+    template = template_cache.get(StorageStack)
 
     repos = template.find_resources("AWS::ECR::Repository")
     assert len(repos) == 2, "Expected 2 ECR repositories"
@@ -130,10 +112,8 @@ def test_storage_stack_all_ecr_repos_are_immutable():
         ), f"Repository {repo_id} must have IMMUTABLE tag mutability"
 
 
-def test_storage_stack_outputs():
-    app = cdk.App()
-    stack = StorageStack(app, "TestStorageStack")
-    template = Template.from_stack(stack)
+def test_storage_stack_outputs(template_cache):
+    template = template_cache.get(StorageStack)
 
     template.has_output("KnowledgeBaseBucketName", {"Export": {"Name": "KnowledgeBaseBucketName"}})
     template.has_output("LogsBucketName", {"Export": {"Name": "LogsBucketName"}})
@@ -0,0 +1,72 @@
+import pytest
+
+from scripts import teardown
+from scripts.stack_graph import reverse_graph, waves
+from tests.cdk_stub import APP_GRAPH, write_stub_cdk
+
+
+@pytest.fixture
+def stub_cdk(tmp_path):
+    return write_stub_cdk(tmp_path)
+
+
+def test_reverse_graph_destroys_consumers_first():
+    reversed_graph = reverse_graph(APP_GRAPH)
+
+    assert reversed_graph["StorageStack"] == ["MonitoringStack"]
+    assert waves(reversed_graph) == [
+        ["ComputeStack", "DatabaseStack", "MonitoringStack", "SecurityStack"],
+        ["StorageStack"],
+        ["NetworkStack"],
+    ]
+
+
+def test_teardown_graph_includes_dependents():
+    assert set(teardown.teardown_graph(APP_GRAPH, ["StorageStack"])) == {
+        "StorageStack",
+        "MonitoringStack",
+    }
+    assert set(teardown.teardown_graph(APP_GRAPH, None)) == set(APP_GRAPH)
+
+
+def test_teardown_dry_run_prints_plan(stub_cdk, tmp_path, capsys):
+    cdk, log = stub_cdk
+
+    assert (
+        teardown.main(["--dry-run", "--app-dir", str(tmp_path), "--cdk", str(cdk)]) == 0
+    )
+
+    out = capsys.readouterr().out
+    assert "Wave 1: ComputeStack, DatabaseStack, MonitoringStack, SecurityStack" in out
+    assert "Wave 2: StorageStack" in out
+    assert "Wave 3: NetworkStack" in out
+    assert "destroy SecurityStack --app cdk.out --exclusively --force" in out
+    assert not log.exists()
+
+
+def test_teardown_destroys_leaves_in_parallel(stub_cdk, tmp_path, capsys):
+    cdk, log = stub_cdk
+
+    assert teardown.main(["--app-dir", str(tmp_path), "--cdk", str(cdk)]) == 0
+
+    order = log.read_text().splitlines()
+    # All four leaves start before any of them finishes
+    assert all(line.startswith("start") for line in order[:4])
+    for stack, deps in APP_GRAPH.items():
+        for dep in deps:
+            assert order.index(f"end {stack}") < order.index(f"start {dep}")
+    out = capsys.readouterr().out
+    assert "SecurityStack destroy succeeded" in out
+    assert "Total wall time" in out
+
+
+def test_teardown_failure_keeps_producers(stub_cdk, tmp_path, monkeypatch, capsys):
+    cdk, log = stub_cdk
+    monkeypatch.setenv("STUB_CDK_FAIL", "DatabaseStack")
+
+    assert teardown.main(["--app-dir", str(tmp_path), "--cdk", str(cdk)]) == 1
+
+    started = {line.split()[1] for line in log.read_text().splitlines()}
+    assert "NetworkStack" not in started
+    assert "StorageStack" in started
+    assert "NetworkStack destroy skipped" in capsys.readouterr().out
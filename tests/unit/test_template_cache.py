@@ -0,0 +1,44 @@
+from cdk.stacks.database_stack import DatabaseStack
+from cdk.stacks.monitoring_stack import MonitoringStack
+from cdk.stacks.network_stack import NetworkStack
+from cdk.stacks.storage_stack import StorageStack
+from cdk.stacks.security_stack import SecurityStack
+
+
+def test_template_cache_reuses_identical_configuration(template_cache):
+    first = template_cache.get(NetworkStack)
+    count = template_cache.synth_count
+
+    assert template_cache.get(NetworkStack) is first
+    assert template_cache.synth_count == count
+
+
+def test_template_cache_keys_on_kwargs(template_cache):
+    dev = template_cache.get(SecurityStack, environment="dev")
+    prod = template_cache.get(SecurityStack, environment="prod")
+
+    assert dev is not prod
+    dev.has_resource_properties(
+        "AWS::Cognito::UserPool", {"UserPoolName": "hackathon-users-dev"}
+    )
+    prod.has_resource_properties(
+        "AWS::Cognito::UserPool", {"UserPoolName": "hackathon-users-prod"}
+    )
+
+
+def test_template_cache_keys_on_context(template_cache):
+    default = template_cache.get(StorageStack)
+    with_context = template_cache.get(StorageStack, context={"environment": "test"})
+
+    assert default is not with_context
+
+
+def test_template_cache_builds_sibling_stacks(template_cache):
+    database = template_cache.get(DatabaseStack, network_stack=NetworkStack)
+    monitoring = template_cache.get(
+        MonitoringStack, logs_bucket=template_cache.ref(StorageStack, "logs_bucket")
+    )
+
+    # The VPC lives in the sibling NetworkStack, not in DatabaseStack
+    database.resource_count_is("AWS::EC2::VPC", 0)
+    monitoring.resource_count_is("AWS::CloudTrail::Trail", 1)
@@ -0,0 +1,129 @@
+import json
+
+from scripts.template_hash import (
+    detect_changes,
+    diff_values,
+    fingerprint_assembly,
+    load_snapshot,
+    normalize_template,
+    save_snapshot,
+)
+
+TEMPLATE = {
+    "Resources": {
+        "Bucket": {
+            "Type": "AWS::S3::Bucket",
+            "Properties": {"BucketName": "logs"},
+            "Metadata": {"aws:cdk:path": "StorageStack/Bucket/Resource"},
+        },
+        "CDKMetadata": {
+            "Type": "AWS::CDK::Metadata",
+            "Properties": {"Analytics": "v2:deflate64:abc"},
+            "Condition": "CDKMetadataAvailable",
+        },
+    },
+    "Conditions": {"CDKMetadataAvailable": {"Fn::Equals": ["a", "a"]}},
+}
+
+
+def write_assembly(directory, template, asset_hash="asset1"):
+    directory.mkdir(exist_ok=True)
+    (directory / "StorageStack.template.json").write_text(json.dumps(template))
+    (directory / "StorageStack.assets.json").write_text(
+        json.dumps(
+            {
+                "files": {
+                    "templatehash": {"source": {"path": "StorageStack.template.json"}},
+                    asset_hash: {"source": {"path": f"asset.{asset_hash}"}},
+                }
+            }
+        )
+    )
+    manifest = {
+        "artifacts": {
+            "StorageStack.assets": {
+                "type": "cdk:asset-manifest",
+                "properties": {"file": "StorageStack.assets.json"},
+            },
+            "StorageStack": {
+                "type": "aws:cloudformation:stack",
+                "environment": "aws://123456789012/us-east-1",
+                "properties": {
+                    "templateFile": "StorageStack.template.json",
+                    "tags": {"Environment": "dev"},
+                    "validateOnSynth": False,
+                },
+                "dependencies": ["StorageStack.assets"],
+            },
+        }
+    }
+    (directory / "manifest.json").write_text(json.dumps(manifest))
+    return directory
+
+
+def test_normalize_template_drops_synth_noise():
+    normalized = normalize_template(TEMPLATE)
+
+    assert normalized == {
+        "Resources": {
+            "Bucket": {
+                "Type": "AWS::S3::Bucket",
+                "Properties": {"BucketName": "logs"},
+            }
+        }
+    }
+    # The input is left untouched
+    assert "CDKMetadata" in TEMPLATE["Resources"]
+
+
+def test_diff_values_reports_structural_changes():
+    old = {"Resources": {"A": {"Properties": {"Size": 1, "Tags": [1, 2]}}, "B": {}}}
+    new = {"Resources": {"A": {"Properties": {"Size": 2, "Tags": [1, 3]}}, "C": {}}}
+
+    assert diff_values(old, new) == [
+        "~ Resources.A.Properties.Size: 1 -> 2",
+        "~ Resources.A.Properties.Tags[1]: 2 -> 3",
+        "- Resources.B",
+        "+ Resources.C: {}",
+    ]
+    assert diff_values(old, old) == []
+
+
+def test_fingerprint_ignores_metadata_but_not_assets(tmp_path):
+    base = fingerprint_assembly(write_assembly(tmp_path / "a", TEMPLATE))
+    moved = json.loads(json.dumps(TEMPLATE))
+    moved["Resources"]["Bucket"]["Metadata"]["aws:cdk:path"] = "Other/Path"
+    same = fingerprint_assembly(write_assembly(tmp_path / "b", moved))
+    new_asset = fingerprint_assembly(write_assembly(tmp_path / "c", TEMPLATE, "asset2"))
+
+    assert base["StorageStack"].assets == ["asset1"]
+    assert base["StorageStack"].properties == {"tags": {"Environment": "dev"}}
+    assert base["StorageStack"].hash == same["StorageStack"].hash
+    assert base["StorageStack"].hash != new_asset["StorageStack"].hash
+
+
+def test_detect_changes_against_snapshot(tmp_path):
+    fingerprints = fingerprint_assembly(write_assembly(tmp_path / "a", TEMPLATE))
+    assert detect_changes(fingerprints, {})["StorageStack"].status == "new"
+
+    snapshot_file = tmp_path / "snapshot.json"
+    save_snapshot(
+        snapshot_file, {"StorageStack": fingerprints["StorageStack"].to_snapshot()}
+    )
+    snapshot = load_snapshot(snapshot_file)
+    assert detect_changes(fingerprints, snapshot)["StorageStack"].status == "unchanged"
+
+    changed = json.loads(json.dumps(TEMPLATE))
+    changed["Resources"]["Bucket"]["Properties"]["BucketName"] = "audit"
+    fingerprints = fingerprint_assembly(
+        write_assembly(tmp_path / "b", changed, "asset2")
+    )
+    change = detect_changes(fingerprints, snapshot)["StorageStack"]
+
+    assert change.status == "changed"
+    assert change.diff == [
+        '~ Resources.Bucket.Properties.BucketName: "logs" -> "audit"',
+        "+ asset asset2",
+        "- asset asset1",
+    ]
+    assert load_snapshot(tmp_path / "missing.json") == {}
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+
+from tests.template_query import Match, TemplateQuery
+
+TEMPLATE = {
+    "Resources": {
+        "Vpc": {
+            "Type": "AWS::EC2::VPC",
+            "Properties": {"CidrBlock": "10.0.0.0/16", "EnableDnsSupport": True},
+        },
+        "Bucket1": {
+            "Type": "AWS::S3::Bucket",
+            "Properties": {"VersioningConfiguration": {"Status": "Enabled"}},
+            "DeletionPolicy": "Delete",
+        },
+        "Bucket2": {"Type": "AWS::S3::Bucket"},
+        "WebAcl": {
+            "Type": "AWS::WAFv2::WebACL",
+            "Properties": {
+                "Rules": [
+                    {"Name": "First", "Priority": 1},
+                    {"Name": "Second", "Priority": 2},
+                ]
+            },
+        },
+    },
+    "Outputs": {
+        "VpcId": {"Value": {"Ref": "Vpc"}, "Export": {"Name": "VpcId"}},
+        "Port": {"Value": "5432"},
+    },
+}
+
+
+@pytest.fixture
+def query():
+    return TemplateQuery(TEMPLATE)
+
+
+def test_template_query_indexes_by_type(query):
+    assert set(query.resources_by_type["AWS::S3::Bucket"]) == {"Bucket1", "Bucket2"}
+    assert query.resource("Vpc")["Type"] == "AWS::EC2::VPC"
+    query.resource_count_is("AWS::S3::Bucket", 2)
+    query.resource_count_is("AWS::RDS::DBCluster", 0)
+
+    with pytest.raises(AssertionError, match="Expected 3 resources"):
+        query.resource_count_is("AWS::S3::Bucket", 3)
+
+
+def test_template_query_partial_property_match(query):
+    query.has_resource_properties("AWS::EC2::VPC", {"CidrBlock": "10.0.0.0/16"})
+    query.has_resource_properties(
+        "AWS::WAFv2::WebACL", {"Rules": [{"Name": "First"}, {"Priority": 2}]}
+    )
+
+    with pytest.raises(AssertionError, match="closest is Vpc"):
+        query.has_resource_properties("AWS::EC2::VPC", {"CidrBlock": "10.1.0.0/16"})
+    with pytest.raises(AssertionError, match="length 1"):
+        query.has_resource_properties("AWS::WAFv2::WebACL", {"Rules": [{}]})
+
+
+def test_template_query_bool_is_not_int(query):
+    with pytest.raises(AssertionError):
+        query.has_resource_properties("AWS::EC2::VPC", {"EnableDnsSupport": 1})
+
+
+def test_template_query_matchers(query):
+    query.has_resource_properties(
+        "AWS::WAFv2::WebACL",
+        {"Rules": Match.array_with([Match.object_like({"Name": "Second"})])},
+    )
+    query.has_resource_properties(
+        "AWS::EC2::VPC",
+        {"CidrBlock": Match.string_like_regexp(r"^10\."), "Tags": Match.absent()},
+    )
+    query.has_resource_properties(
+        "AWS::S3::Bucket",
+        {"VersioningConfiguration": Match.object_equals({"Status": "Enabled"})},
+    )
+
+    with pytest.raises(AssertionError):
+        query.has_resource_properties(
+            "AWS::EC2::VPC", {"CidrBlock": Match.exact({"Status": "Enabled"})}
+        )
+    with pytest.raises(AssertionError):
+        query.has_resource_properties("AWS::EC2::VPC", {"Tags": Match.any_value()})
+
+
+def test_template_query_array_with_matches_plain_elements_exactly(query):
+    query.has_resource_properties(
+        "AWS::WAFv2::WebACL",
+        {"Rules": Match.array_with([{"Name": "Second", "Priority": 2}])},
+    )
+
+    # Same as aws_cdk.assertions: only object_like elements match partially
+    with pytest.raises(AssertionError, match="could not find element 0"):
+        query.has_resource_properties(
+            "AWS::WAFv2::WebACL", {"Rules": Match.array_with([{"Name": "Second"}])}
+        )
+
+
+def test_template_query_find_resources(query):
+    assert set(query.find_resources("AWS::S3::Bucket")) == {"Bucket1", "Bucket2"}
+    assert set(
+        query.find_resources("AWS::S3::Bucket", {"DeletionPolicy": "Delete"})
+    ) == {"Bucket1"}
+    query.has_resource("AWS::S3::Bucket", {"DeletionPolicy": "Delete"})
+
+
+def test_template_query_outputs(query):
+    query.has_output("VpcId", {"Export": {"Name": "VpcId"}})
+    query.has_output("*", {"Value": "5432"})
+    assert set(query.find_outputs()) == {"VpcId", "Port"}
+    assert query.find_outputs("Missing") == {}
+
+    with pytest.raises(AssertionError, match="no output named"):
+        query.has_output("Missing", {})
+
+
+def test_template_query_from_cloud_assembly(tmp_path):
+    (tmp_path / "NetworkStack.template.json").write_text(json.dumps(TEMPLATE))
+
+    query = TemplateQuery.from_cloud_assembly("NetworkStack", tmp_path)
+
+    query.resource_count_is("AWS::EC2::VPC", 1)
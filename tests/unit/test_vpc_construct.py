@@ -1,16 +1,9 @@
-import uuid
-from aws_cdk.assertions import Template
 from cdk.stacks.network_stack import NetworkStack
-import aws_cdk as cdk
 
 
-def test_vpc_construct():
+def test_vpc_construct(template_cache):
     """Test VPC construct creation"""
-    unique_id = str(uuid.uuid4())[:8]
-    app = cdk.App()
-    stack = NetworkStack(app, f"TestNetworkStack{unique_id}")
-
-    template = Template.from_stack(stack)
+    template = template_cache.get(NetworkStack)
 
     # Check VPC exists
     template.resource_count_is("AWS::EC2::VPC", 1)